@@ -7,6 +7,8 @@
 
 #define DEFAULT_NOTIFY_URL "http://dashboard:8080/event/chart-updated"
 #define DEFAULT_NOTIFY_URL_ALT "http://host.docker.internal:8080/event/chart-updated"
+#define DEFAULT_CONNINFO "host=db dbname=metrics user=admin password=admin"
+#define DEFAULT_OUTPUT_DIR "/output"
 
 #define MAX_POINTS          5000
 #define MAX_NODES           16
@@ -20,9 +22,21 @@ typedef struct {
     double jitter[MAX_POINTS];
     double packet_loss[MAX_POINTS];
     double bandwidth[MAX_POINTS];
+    int x_index[MAX_POINTS];    // position of each sample on the shared timeline
     int count;
 } NodeSeries;
 
+// One raw row kept in the sliding window of the newest MAX_POINTS rows
+typedef struct {
+    long long id;
+    char node_id[64];
+    long long timestamp;
+    double latency;
+    double jitter;
+    double packet_loss;
+    double bandwidth;
+} Sample;
+
 typedef enum {
     METRIC_LATENCY = 0,
     METRIC_JITTER,
@@ -36,6 +50,26 @@ static const char *COLOR_PALETTE[] = {
 };
 static const int COLOR_COUNT = sizeof(COLOR_PALETTE) / sizeof(COLOR_PALETTE[0]);
 
+static const char *output_dir = DEFAULT_OUTPUT_DIR;
+
+// Ring buffer of the newest rows, oldest at window_head once full
+static Sample window_rows[MAX_POINTS];
+static int window_head = 0;
+static int window_count = 0;
+
+// Highest id already in the window, and the highest id seen on the previous poll.
+// Rows are only taken once they are at or below the previous poll's max, which
+// gives concurrent ingest transactions that commit out of id order one poll
+// interval to become visible before we move past their ids.
+static long long last_id = 0;
+static long long settled_id = 0;
+
+// Series rebuilt from the window after each change (static: several MB)
+static NodeSeries nodes[MAX_NODES];
+static int node_count = 0;
+static long long timeline[MAX_POINTS];
+static int timeline_count = 0;
+
 // ======================================================
 // Helpers and SVG rendering (multi-node, per metric)
 // ======================================================
@@ -64,21 +98,14 @@ double get_metric_value(const NodeSeries *node, int idx, MetricType metric) {
     }
 }
 
-static int cmp_ll(const void *a, const void *b) {
-    long long x = *(const long long *)a;
-    long long y = *(const long long *)b;
-    if (x < y) return -1;
-    if (x > y) return 1;
+static int cmp_sample_ts(const void *a, const void *b) {
+    const Sample *x = *(const Sample *const *)a;
+    const Sample *y = *(const Sample *const *)b;
+    if (x->timestamp != y->timestamp) return x->timestamp < y->timestamp ? -1 : 1;
+    if (x->id != y->id) return x->id < y->id ? -1 : 1;
     return 0;
 }
 
-int find_ts_index(const long long *timeline, int timeline_count, long long ts) {
-    for (int i = 0; i < timeline_count; i++) {
-        if (timeline[i] == ts) return i;
-    }
-    return -1;
-}
-
 void save_svg(const char *filename, NodeSeries *nodes, int node_count, MetricType metric, const char *title, const char *unit, long long *timeline, int timeline_count) {
     if (node_count == 0 || timeline_count < 2) return;
 
@@ -115,9 +142,12 @@ void save_svg(const char *filename, NodeSeries *nodes, int node_count, MetricTyp
     int width      = left_pad + plot_width + right_pad;
     int height     = 520;
 
+    // Write to a temp file and rename over the target so readers never see a partial SVG
     char path[256];
-    snprintf(path, sizeof(path), "/output/%s", filename);
-    FILE *f = fopen(path, "w");
+    char tmp_path[272];
+    snprintf(path, sizeof(path), "%s/%s", output_dir, filename);
+    snprintf(tmp_path, sizeof(tmp_path), "%s/.%s.tmp", output_dir, filename);
+    FILE *f = fopen(tmp_path, "w");
     if (!f) { perror("SVG write failed"); return; }
 
     fprintf(f,
@@ -163,8 +193,7 @@ void save_svg(const char *filename, NodeSeries *nodes, int node_count, MetricTyp
         const char *color = COLOR_PALETTE[n % COLOR_COUNT];
         fprintf(f, "<polyline fill=\"none\" stroke=\"%s\" stroke-width=\"2\" points=\"", color);
         for (int i = 0; i < nodes[n].count; i++) {
-            int idx = find_ts_index(timeline, timeline_count, nodes[n].timestamps[i]);
-            if (idx < 0) continue;
+            int idx = nodes[n].x_index[i];
             double x = left_pad + idx * PX_PER_POINT;
             double norm = (get_metric_value(&nodes[n], i, metric) - minVal) / range;
             double y = top_pad + (1.0 - norm) * (height - top_pad - bottom_pad);
@@ -211,84 +240,129 @@ void save_svg(const char *filename, NodeSeries *nodes, int node_count, MetricTyp
     }
 
     fprintf(f, "</svg>\n");
-    fclose(f);
+    if (fclose(f) != 0 || rename(tmp_path, path) != 0) {
+        perror("SVG write failed");
+        unlink(tmp_path);
+        return;
+    }
 
     printf("Generated %s (nodes=%d, max_points=%d, width=%d)\n", filename, node_count, max_points, width);
 }
 
 // ======================================================
-// Fetch + render charts once
+// Incremental fetch into the sliding window
 // ======================================================
-void generate_charts_once(void) {
-
-    PGconn *conn = PQconnectdb("host=db dbname=metrics user=admin password=admin");
-    if (PQstatus(conn) != CONNECTION_OK) {
-        fprintf(stderr, "DB connect error: %s\n", PQerrorMessage(conn));
-        PQfinish(conn);
-        return;
+static void window_push(const Sample *sample) {
+    int pos = (window_head + window_count) % MAX_POINTS;
+    if (window_count == MAX_POINTS) {
+        // Full: overwrite the oldest row
+        pos = window_head;
+        window_head = (window_head + 1) % MAX_POINTS;
+    } else {
+        window_count++;
     }
+    window_rows[pos] = *sample;
+}
 
-    PGresult *res = PQexec(conn,
-        "SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth "
-        "FROM metrics ORDER BY timestamp ASC LIMIT 5000");
+// Returns the number of new rows added to the window, or -1 on a DB error.
+int fetch_new_rows(PGconn *conn) {
+    char last_id_str[32];
+    char settled_id_str[32];
+    snprintf(last_id_str, sizeof(last_id_str), "%lld", last_id);
+    snprintf(settled_id_str, sizeof(settled_id_str), "%lld", settled_id);
+    const char *params[2] = {last_id_str, settled_id_str};
+
+    // Only rows that had settled by the previous poll; newest first so a large
+    // backlog only costs the newest 5000, consumed oldest first below
+    PGresult *res = PQexecParams(conn,
+        "SELECT id, node_id, timestamp, latency, jitter, packet_loss, bandwidth "
+        "FROM metrics WHERE id > $1::bigint AND id <= $2::bigint ORDER BY id DESC LIMIT 5000",
+        2, NULL, params, NULL, NULL, 0);
 
     if (PQresultStatus(res) != PGRES_TUPLES_OK) {
         fprintf(stderr, "Query fail: %s\n", PQerrorMessage(conn));
         PQclear(res);
-        PQfinish(conn);
-        return;
+        return -1;
     }
 
     int rows = PQntuples(res);
+    for (int i = rows - 1; i >= 0; i--) {
+        Sample sample;
+        sample.id = atoll(PQgetvalue(res, i, 0));
+        snprintf(sample.node_id, sizeof(sample.node_id), "%s", PQgetvalue(res, i, 1));
+        sample.timestamp   = atoll(PQgetvalue(res, i, 2));
+        sample.latency     = atof(PQgetvalue(res, i, 3));
+        sample.jitter      = atof(PQgetvalue(res, i, 4));
+        sample.packet_loss = atof(PQgetvalue(res, i, 5));
+        sample.bandwidth   = atof(PQgetvalue(res, i, 6));
+        window_push(&sample);
+        last_id = sample.id;
+    }
+    PQclear(res);
+
+    // What is visible now settles for the next poll, however many rows arrived
+    res = PQexecParams(conn,
+        "SELECT max(id) FROM metrics WHERE id > $1::bigint",
+        1, NULL, params + 1, NULL, NULL, 0);
+    if (PQresultStatus(res) != PGRES_TUPLES_OK) {
+        // Rows taken above still get drawn; settled_id just moves on next poll
+        fprintf(stderr, "Query fail: %s\n", PQerrorMessage(conn));
+    } else if (!PQgetisnull(res, 0, 0)) {
+        settled_id = atoll(PQgetvalue(res, 0, 0));
+    }
+    PQclear(res);
+    return rows;
+}
 
-    NodeSeries nodes[MAX_NODES];
-    int node_count = 0;
-    long long timeline[MAX_POINTS];
-    int timeline_count = 0;
+// Rebuild per-node series and the shared timeline from the window, ordered by timestamp.
+void build_series(void) {
+    static const Sample *sorted[MAX_POINTS];
+    for (int i = 0; i < window_count; i++) {
+        sorted[i] = &window_rows[(window_head + i) % MAX_POINTS];
+    }
+    qsort(sorted, window_count, sizeof(sorted[0]), cmp_sample_ts);
 
-    for (int i = 0; i < rows && i < MAX_POINTS; i++) {
-        const char *node_id = PQgetvalue(res, i, 0);
-        long long ts = atoll(PQgetvalue(res, i, 1));
-        int idx = find_or_create_node(nodes, &node_count, node_id);
+    node_count = 0;
+    timeline_count = 0;
+    for (int i = 0; i < window_count; i++) {
+        const Sample *sample = sorted[i];
+        int idx = find_or_create_node(nodes, &node_count, sample->node_id);
         if (idx < 0) {
             continue;
         }
-        NodeSeries *node = &nodes[idx];
-        if (node->count >= MAX_POINTS) continue;
+        // Timestamps arrive sorted, so the timeline is built (and deduped) in one pass
+        if (timeline_count == 0 || timeline[timeline_count - 1] != sample->timestamp) {
+            timeline[timeline_count++] = sample->timestamp;
+        }
 
+        NodeSeries *node = &nodes[idx];
         int pos = node->count;
-        node->timestamps[pos]   = ts;
-        node->latency[pos]      = atof(PQgetvalue(res, i, 2));
-        node->jitter[pos]       = atof(PQgetvalue(res, i, 3));
-        node->packet_loss[pos]  = atof(PQgetvalue(res, i, 4));
-        node->bandwidth[pos]    = atof(PQgetvalue(res, i, 5));
+        node->timestamps[pos]   = sample->timestamp;
+        node->latency[pos]      = sample->latency;
+        node->jitter[pos]       = sample->jitter;
+        node->packet_loss[pos]  = sample->packet_loss;
+        node->bandwidth[pos]    = sample->bandwidth;
+        node->x_index[pos]      = timeline_count - 1;
         node->count++;
-
-        // build global timeline (unique timestamps)
-        if (timeline_count < MAX_POINTS) {
-            timeline[timeline_count++] = ts;
-        }
     }
+}
 
-    if (timeline_count > 1) {
-        qsort(timeline, timeline_count, sizeof(long long), cmp_ll);
-        // dedupe
-        int unique = 1;
-        for (int i = 1; i < timeline_count; i++) {
-            if (timeline[i] != timeline[unique - 1]) {
-                timeline[unique++] = timeline[i];
-            }
-        }
-        timeline_count = unique;
+// ======================================================
+// Fetch new rows and render charts if anything changed
+// ======================================================
+int generate_charts_once(PGconn *conn) {
+    int added = fetch_new_rows(conn);
+    if (added <= 0) {
+        return 0;
     }
 
-    PQclear(res);
-    PQfinish(conn);
+    build_series();
 
     save_svg("latency.svg",      nodes, node_count, METRIC_LATENCY, "Latency", "ms", timeline, timeline_count);
     save_svg("jitter.svg",       nodes, node_count, METRIC_JITTER, "Jitter", "ms", timeline, timeline_count);
     save_svg("packet_loss.svg",  nodes, node_count, METRIC_PACKET_LOSS, "Packet Loss", "%%", timeline, timeline_count);
     save_svg("bandwidth.svg",    nodes, node_count, METRIC_BANDWIDTH, "Bandwidth", "Mbps", timeline, timeline_count);
+    return added;
 }
 
 // ======================================================
@@ -303,24 +377,46 @@ int main(void) {
     if (!notify_url_alt || strlen(notify_url_alt) == 0) {
         notify_url_alt = DEFAULT_NOTIFY_URL_ALT;
     }
+    const char *conninfo = getenv("CHARTGEN_DB_CONNINFO");
+    if (!conninfo || strlen(conninfo) == 0) {
+        conninfo = DEFAULT_CONNINFO;
+    }
+    const char *dir = getenv("CHARTGEN_OUTPUT_DIR");
+    if (dir && strlen(dir) > 0) {
+        output_dir = dir;
+    }
+
+    // One connection for the life of the process; reset (reconnect) when it drops
+    PGconn *conn = PQconnectdb(conninfo);
 
     while (1) {
-        generate_charts_once();
-
-        // Notify dashboard (SSE)
-        const char *urls[2] = {notify_url, notify_url_alt};
-        for (int i = 0; i < 2; i++) {
-            if (!urls[i] || strlen(urls[i]) == 0) continue;
-            char cmd[512];
-            snprintf(cmd, sizeof(cmd), "curl -sS %s >/dev/null 2>&1", urls[i]);
-            int rc = system(cmd);
-            if (rc != 0) {
-                fprintf(stderr, "Warning: SSE notify fail rc=%d url=%s\n", rc, urls[i]);
+        if (PQstatus(conn) != CONNECTION_OK) {
+            PQreset(conn);
+            if (PQstatus(conn) != CONNECTION_OK) {
+                fprintf(stderr, "DB connect error: %s\n", PQerrorMessage(conn));
+                sleep(1);
+                continue;
+            }
+        }
+
+        // Nothing new: no render, no notification
+        if (generate_charts_once(conn) > 0) {
+            // Notify dashboard (SSE)
+            const char *urls[2] = {notify_url, notify_url_alt};
+            for (int i = 0; i < 2; i++) {
+                if (!urls[i] || strlen(urls[i]) == 0) continue;
+                char cmd[512];
+                snprintf(cmd, sizeof(cmd), "curl -sS %s >/dev/null 2>&1", urls[i]);
+                int rc = system(cmd);
+                if (rc != 0) {
+                    fprintf(stderr, "Warning: SSE notify fail rc=%d url=%s\n", rc, urls[i]);
+                }
             }
         }
 
         usleep(200 * 1000);  // 200 ms
     }
 
+    PQfinish(conn);
     return 0;
 }
@@ -0,0 +1,84 @@
+import math
+from array import array
+from typing import Any, Dict, Optional
+
+from . import metrics_pb2
+
+METRICS = ("latency", "jitter", "packet_loss", "bandwidth")
+
+
+class WindowAggregator:
+    """
+    Reduces the samples of one fixed window to a MetricsSummary on the Pi.
+
+    Windows are aligned to multiples of ``window_seconds`` of wall-clock time,
+    so every pod's windows line up. Values are kept in preallocated float
+    arrays (8 bytes per value, nothing allocated per sample); if a window gets
+    more than ``capacity`` samples the extra ones only count toward
+    ``samples`` and ``lost_samples``. A metric missing from a sample (bandwidth
+    before the first iperf3 run) is left out of that metric's statistics, and a
+    window that never saw it leaves its MetricStats unset.
+    """
+
+    def __init__(self, node_id: str, window_seconds: float = 10.0, capacity: int = 1024):
+        self.node_id = node_id
+        self.window_ms = int(window_seconds * 1000)
+        self.capacity = capacity
+        self._values = {m: array("d", bytes(8 * capacity)) for m in METRICS}
+        self._reset()
+
+    def _reset(self):
+        self._start_ms: Optional[int] = None
+        self._end_ms = 0
+        self._stored = dict.fromkeys(METRICS, 0)
+        self._samples = 0
+        self._lost = 0
+
+    def due(self, ts_ms: int) -> bool:
+        """True if a sample at ts_ms belongs to a later window than the open one."""
+        return self._start_ms is not None and ts_ms >= self._start_ms + self.window_ms
+
+    def add(self, ts_ms: int, sample: Dict[str, Any]):
+        if self._start_ms is None:
+            self._start_ms = ts_ms - ts_ms % self.window_ms
+        self._end_ms = max(self._end_ms, ts_ms)
+        self._samples += 1
+        if float(sample.get("packet_loss", 0.0)) >= 100.0:
+            self._lost += 1
+        for m in METRICS:
+            value = sample.get(m)
+            if value is not None and self._stored[m] < self.capacity:
+                self._values[m][self._stored[m]] = float(value)
+                self._stored[m] += 1
+
+    def _stats(self, metric: str) -> Optional[metrics_pb2.MetricStats]:
+        n = self._stored[metric]
+        if not n:
+            return None
+        values = sorted(self._values[metric][:n])
+        return metrics_pb2.MetricStats(
+            count=n,
+            min=values[0],
+            max=values[-1],
+            mean=math.fsum(values) / n,
+            p95=values[max(0, math.ceil(0.95 * n) - 1)],
+        )
+
+    def flush(self) -> Optional[metrics_pb2.MetricsSummary]:
+        """Closes the open window; None if it had no samples."""
+        if not self._samples:
+            self._reset()
+            return None
+        summary = metrics_pb2.MetricsSummary(
+            node_id=self.node_id,
+            window_start=self._start_ms,
+            window_end=self._end_ms,
+            samples=self._samples,
+            lost_samples=self._lost,
+            latency=self._stats("latency"),
+            jitter=self._stats("jitter"),
+            packet_loss=self._stats("packet_loss"),
+            bandwidth=self._stats("bandwidth"),
+        )
+        self._reset()
+        return summary
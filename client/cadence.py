@@ -0,0 +1,192 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Smallest deviation that can count as a change, per metric: absolute floor and
+# fraction of the recent mean. Keeps a perfectly flat link from bursting on noise.
+CHANGE_FLOORS = {
+    "latency": (1.0, 0.10),       # ms
+    "jitter": (0.5, 0.25),        # ms
+    "packet_loss": (1.0, 0.0),    # %
+    "bandwidth": (1.0, 0.15),     # Mbps
+}
+
+# Bytes on the wire for one ICMP echo + reply (IP + ICMP headers + 48 byte payload)
+PING_BYTES_PER_ECHO = 2 * (20 + 8 + 48)
+
+
+def threshold_breach(thresholds: Dict[str, float], sample: Dict[str, Any]) -> Optional[str]:
+    """
+    Describes the first metric of sample outside the fixed thresholds
+    (``<metric>_max``, ``bandwidth_min_mbps``), or None if all are within.
+    """
+    for metric in CHANGE_FLOORS:
+        value = sample.get(metric)
+        if value is None:
+            continue
+        value = float(value)
+        if metric == "bandwidth":
+            floor = thresholds.get("bandwidth_min_mbps")
+            # A failed iperf3 run reports 0 Mbps; that is not a measurement
+            if floor is not None and 0 < value < floor:
+                return f"bandwidth {value:.2f} under threshold"
+            continue
+        limit = thresholds.get(f"{metric}_max")
+        if limit is not None and value > limit:
+            return f"{metric} {value:.2f} over threshold"
+    return None
+
+
+class AdaptiveCadence:
+    """
+    Decides how often each probe runs. Every result is compared with a rolling
+    window of recent values; a jump of more than ``change_sigma`` standard
+    deviations, or a breach of one of the fixed thresholds, starts a burst in
+    which every probe runs at its minimum period for ``burst_seconds``. After
+    ``calm_seconds`` without a change, periods grow by ``backoff_factor`` per
+    run up to each probe's maximum. With ``enabled`` false every probe keeps
+    its configured period.
+    """
+
+    def __init__(self, enabled: bool = True, window: int = 30, min_samples: int = 5,
+                 change_sigma: float = 3.0, burst_seconds: float = 60.0, calm_seconds: float = 300.0,
+                 backoff_factor: float = 1.5, thresholds: Optional[Dict[str, float]] = None):
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.change_sigma = change_sigma
+        self.burst_seconds = burst_seconds
+        self.calm_seconds = calm_seconds
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.thresholds = thresholds or {}
+        self.bursts = 0
+        self._windows: Dict[str, Deque[float]] = {m: deque(maxlen=window) for m in CHANGE_FLOORS}
+        self._periods: Dict[str, float] = {}
+        self._burst_until = 0.0
+        self._last_change = time.monotonic()
+        self._wake: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AdaptiveCadence":
+        cfg = config.get("adaptive", {})
+        thresholds = cfg.get("thresholds", {})
+        return cls(
+            enabled=bool(cfg.get("enabled", False)),
+            window=int(cfg.get("window", 30)),
+            min_samples=int(cfg.get("min_samples", 5)),
+            change_sigma=float(cfg.get("change_sigma", 3.0)),
+            burst_seconds=float(cfg.get("burst_seconds", 60)),
+            calm_seconds=float(cfg.get("calm_seconds", 300)),
+            backoff_factor=float(cfg.get("backoff_factor", 1.5)),
+            thresholds={k: float(v) for k, v in thresholds.items()},
+        )
+
+    @property
+    def bursting(self) -> bool:
+        return time.monotonic() < self._burst_until
+
+    def period(self, probe) -> float:
+        """Current period of probe (a scheduler.Probe)."""
+        if not self.enabled:
+            return probe.period
+        if self.bursting:
+            return probe.min_period
+        return self._periods.get(probe.name, probe.period)
+
+    def advance(self, probe) -> float:
+        """Period until probe's next run, called once per run."""
+        if not self.enabled:
+            return probe.period
+        if self.bursting:
+            period = probe.min_period
+        elif time.monotonic() - self._last_change >= self.calm_seconds:
+            period = min(self._periods.get(probe.name, probe.period) * self.backoff_factor, probe.max_period)
+        else:
+            period = probe.period
+        self._periods[probe.name] = period
+        return period
+
+    def _changed(self, metric: str, value: float) -> bool:
+        window = self._windows[metric]
+        if len(window) < self.min_samples:
+            return False
+        mean = statistics.fmean(window)
+        abs_floor, rel_floor = CHANGE_FLOORS[metric]
+        spread = max(statistics.pstdev(window, mean), abs_floor, rel_floor * abs(mean))
+        return abs(value - mean) > self.change_sigma * spread
+
+    def observe(self, result: Dict[str, Any]) -> Optional[str]:
+        """Folds one probe result in; returns why a burst started, if one did."""
+        reason = threshold_breach(self.thresholds, result)
+        for metric in CHANGE_FLOORS:
+            value = result.get(metric)
+            if value is None:
+                continue
+            value = float(value)
+            if metric == "bandwidth" and value <= 0:  # failed iperf3 run
+                continue
+            if reason is None and self._changed(metric, value):
+                reason = f"{metric} changed to {value:.2f}"
+            self._windows[metric].append(value)
+
+        if reason is not None and self.enabled:
+            now = time.monotonic()
+            self._last_change = now
+            started = now >= self._burst_until
+            self._burst_until = now + self.burst_seconds
+            self._periods.clear()
+            if started:
+                self.bursts += 1
+                if self._wake is not None:
+                    self._wake.set()
+                    self._wake = None
+                return reason
+        return None
+
+    async def sleep(self, delay: float) -> bool:
+        """Sleeps up to delay seconds; True if cut short because a burst started."""
+        if not self.enabled:
+            await asyncio.sleep(delay)
+            return False
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class ProbeBudget:
+    """
+    Hard cap on the bytes probes may put on the link in any rolling hour.
+    A run reserves its worst-case cost up front and is refused if that would
+    exceed the cap; 0 disables the cap.
+    """
+
+    def __init__(self, bytes_per_hour: int = 0):
+        self.bytes_per_hour = bytes_per_hour
+        self.denied = 0
+        self._spent: Deque[Tuple[float, int]] = deque()
+        self._total = 0
+
+    def _expire(self, now: float):
+        while self._spent and self._spent[0][0] <= now - 3600:
+            self._total -= self._spent.popleft()[1]
+
+    def reserve(self, cost: int) -> bool:
+        if not self.bytes_per_hour:
+            return True
+        now = time.monotonic()
+        self._expire(now)
+        if self._total + cost > self.bytes_per_hour:
+            self.denied += 1
+            return False
+        self._spent.append((now, cost))
+        self._total += cost
+        return True
+
+    def used(self) -> int:
+        self._expire(time.monotonic())
+        return self._total
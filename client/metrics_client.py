@@ -1,8 +1,23 @@
 import grpc
 import json
-from typing import Dict, Any
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional
 
 from . import metrics_pb2, metrics_pb2_grpc
+from .spool import Spool
+from .telemetry import REGISTRY
+
+SUBMIT_SECONDS = REGISTRY.histogram(
+    "agent_submit_seconds", "Time submit_metrics blocks the scheduler (spool append)")
+SEND_SECONDS = REGISTRY.histogram(
+    "agent_send_batch_seconds", "Time to deliver one batch to the server", ("transport",))
+SAMPLES_SENT = REGISTRY.counter(
+    "agent_samples_sent_total", "Samples accepted by the server", ("transport",))
+SEND_FAILURES = REGISTRY.counter(
+    "agent_send_failures_total", "Batches that were not fully accepted", ("transport",))
 
 
 def load_config(path: str = "client/config.json") -> Dict[str, Any]:
@@ -11,33 +26,308 @@ def load_config(path: str = "client/config.json") -> Dict[str, Any]:
         return json.load(f)
 
 
+def build_request(node_id: str, latency: float, jitter: float, packet_loss: float,
+                  bandwidth: float, timestamp: int) -> metrics_pb2.MetricsRequest:
+    """Builds a MetricsRequest message from one sample."""
+    return metrics_pb2.MetricsRequest(
+        node_id=node_id,
+        latency=latency,
+        jitter=jitter,
+        packet_loss=packet_loss,
+        bandwidth=bandwidth,
+        timestamp=timestamp
+    )
+
+
+class _MetricsStream:
+    """One long-lived SubmitMetricsStream call. Batches are acked in the order they are sent."""
+    _CLOSE = object()
+
+    def __init__(self, stub: metrics_pb2_grpc.MetricsServiceStub):
+        self._requests: "queue.Queue" = queue.Queue()
+        self._acks: "queue.Queue" = queue.Queue()
+        self._call = stub.SubmitMetricsStream(self._request_iter())
+        threading.Thread(target=self._read_acks, name="metrics-stream-acks", daemon=True).start()
+
+    def _request_iter(self):
+        while True:
+            batch = self._requests.get()
+            if batch is self._CLOSE:
+                return
+            yield batch
+
+    def _read_acks(self):
+        try:
+            for ack in self._call:
+                self._acks.put(ack)
+            self._acks.put(None)
+        except grpc.RpcError as e:
+            self._acks.put(e)
+
+    def send(self, batch: metrics_pb2.MetricsBatch, timeout: float) -> metrics_pb2.BatchAck:
+        """Sends one batch and waits for its ack. Raises on stream failure or timeout."""
+        self._requests.put(batch)
+        try:
+            ack = self._acks.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no ack for batch {batch.seq} within {timeout}s")
+        if isinstance(ack, grpc.RpcError):
+            raise ack
+        if ack is None:
+            raise ConnectionError("server closed the metrics stream")
+        if ack.seq != batch.seq:
+            raise ConnectionError(f"ack out of order: sent {batch.seq}, got {ack.seq}")
+        return ack
+
+    def close(self):
+        self._requests.put(self._CLOSE)
+        self._call.cancel()
+
+
 class MetricsGRPCClient:
     """
     gRPC client that sends metrics from Raspberry Pi 3 -> Raspberry Pi 4.
     Uses the generated metrics_pb2 and metrics_pb2_grpc classes.
+
+    Batches go over one long-lived SubmitMetricsStream call; servers that do not
+    implement it are detected once and the client falls back to unary SubmitMetrics.
     """
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.rpc_timeout = float(config.get("rpc_timeout_seconds", 5))
+        self.use_stream = bool(config.get("use_stream", True))
+        self._stream = None
+        self._seq = 0
         target = f"{config['grpc_server_host']}:{config['grpc_server_port']}"
         print(f"[gRPC] Connecting to server at {target} ...")
         self.channel = grpc.insecure_channel(target)
         self.stub = metrics_pb2_grpc.MetricsServiceStub(self.channel)
 
+    def send(self, request: metrics_pb2.MetricsRequest) -> bool:
+        """Sends one MetricsRequest message."""
+        try:
+            response: metrics_pb2.MetricsResponse = self.stub.SubmitMetrics(
+                request, timeout=self.rpc_timeout)
+            return response.success
+        except grpc.RpcError as e:
+            print(f"[gRPC ERROR] {e.code()}: {e.details()}")
+            return False
+
+    def _send_stream(self, requests: List[metrics_pb2.MetricsRequest]) -> int:
+        if self._stream is None:
+            self._stream = _MetricsStream(self.stub)
+        self._seq += 1
+        batch = metrics_pb2.MetricsBatch(seq=self._seq, entries=requests)
+        ack = self._stream.send(batch, self.rpc_timeout)
+        return ack.stored if ack.success else 0
+
+    def _reset_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def send_batch(self, requests: List[metrics_pb2.MetricsRequest]) -> int:
+        """Sends requests in order; returns how many were accepted before the first failure."""
+        transport = "stream" if self.use_stream else "unary"
+        started = time.perf_counter()
+        sent = self._send_batch(requests)
+        SEND_SECONDS.observe(time.perf_counter() - started, transport)
+        SAMPLES_SENT.inc(transport, amount=sent)
+        if sent < len(requests):
+            SEND_FAILURES.inc(transport)
+        return sent
+
+    def _send_batch(self, requests: List[metrics_pb2.MetricsRequest]) -> int:
+        if self.use_stream:
+            try:
+                return self._send_stream(requests)
+            except grpc.RpcError as e:
+                self._reset_stream()
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                    print(f"[gRPC ERROR] {e.code()}: {e.details()}")
+                    return 0
+                print("[gRPC] Server has no SubmitMetricsStream; falling back to unary calls")
+                self.use_stream = False
+            except (TimeoutError, ConnectionError) as e:
+                print(f"[gRPC ERROR] stream: {e}")
+                self._reset_stream()
+                return 0
+
+        for i, request in enumerate(requests):
+            if not self.send(request):
+                return i
+        return len(requests)
+
+    def send_summaries(self, summaries: List[metrics_pb2.MetricsSummary]) -> int:
+        """Sends window summaries in one SubmitSummaries call; returns how many were accepted."""
+        started = time.perf_counter()
+        self._seq += 1
+        try:
+            ack = self.stub.SubmitSummaries(
+                metrics_pb2.SummaryBatch(seq=self._seq, summaries=summaries), timeout=self.rpc_timeout)
+            sent = len(summaries) if ack.success else 0
+        except grpc.RpcError as e:
+            print(f"[gRPC ERROR] {e.code()}: {e.details()}")
+            sent = 0
+        SEND_SECONDS.observe(time.perf_counter() - started, "summary")
+        SAMPLES_SENT.inc("summary", amount=sent)
+        if sent < len(summaries):
+            SEND_FAILURES.inc("summary")
+        return sent
+
     def submit_metrics(self, node_id: str, latency: float, jitter: float,
                        packet_loss: float, bandwidth: float, timestamp: int) -> bool:
         """Builds and sends a MetricsRequest message."""
-        request = metrics_pb2.MetricsRequest(
-            node_id=node_id,
-            latency=latency,
-            jitter=jitter,
-            packet_loss=packet_loss,
-            bandwidth=bandwidth,
-            timestamp=timestamp
+        return self.send(build_request(node_id, latency, jitter, packet_loss, bandwidth, timestamp))
+
+    def fetch_metrics(self, from_ms: int = 0, to_ms: int = 0, nodes: Optional[List[str]] = None,
+                      page_size: int = 0, bucket_ms: int = 0, resume_token: str = "",
+                      retries: int = 3) -> Iterator[metrics_pb2.MetricsList]:
+        """
+        Yields pages (MetricsList) of stored metrics in [from_ms, to_ms] as the
+        server streams them, ordered by node and time. Pages are read off the
+        stream only when the caller asks for the next one, so a large history
+        never sits in memory on either end. bucket_ms > 0 asks for per-node
+        means of each interval instead of raw rows. A dropped stream is reopened
+        from the last page's next_token, up to retries times in a row.
+        """
+        request = metrics_pb2.FetchRequest(
+            node_ids=nodes or [], from_ms=from_ms, to_ms=to_ms,
+            page_size=page_size, bucket_ms=bucket_ms, resume_token=resume_token)
+        failures = 0
+        while True:
+            call = self.stub.FetchMetrics(request)
+            try:
+                for page in call:
+                    failures = 0
+                    yield page
+                    if not page.next_token:
+                        return
+                    request.resume_token = page.next_token
+                reason = "stream ended before the last page"
+            except grpc.RpcError as e:
+                if e.code() not in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.INTERNAL):
+                    raise
+                reason = str(e.code())
+            finally:
+                call.cancel()
+            failures += 1
+            if failures > retries:
+                raise ConnectionError(f"fetch failed {failures} times in a row: {reason}")
+            print(f"[gRPC] fetch interrupted ({reason}), resuming")
+            time.sleep(min(2 ** failures, 10))
+
+    def close(self):
+        self._reset_stream()
+        self.channel.close()
+
+
+class SpooledMetricsClient:
+    """
+    Store-and-forward wrapper around MetricsGRPCClient.
+
+    submit_metrics() only appends to the on-disk spool and returns; a background
+    thread drains the spool in order, replaying in batches after the link comes back.
+    Window summaries (summary mode) get a spool of their own under spool_dir/summary.
+    """
+    def __init__(self, config: Dict[str, Any], grpc_client: MetricsGRPCClient = None):
+        self.client = grpc_client or MetricsGRPCClient(config)
+        self.spool = Spool(
+            config.get("spool_dir", "client/spool"),
+            segment_bytes=int(config.get("spool_segment_bytes", 1 << 20)),
+            max_segments=int(config.get("spool_max_segments", 16)),
+        )
+        self.summary_spool: Optional[Spool] = None
+        if config.get("summary", {}).get("enabled"):
+            self.summary_spool = Spool(
+                os.path.join(config.get("spool_dir", "client/spool"), "summary"),
+                segment_bytes=int(config.get("spool_segment_bytes", 1 << 20)),
+                max_segments=int(config.get("spool_max_segments", 16)),
+            )
+        self.batch_size = int(config.get("replay_batch_size", 100))
+        self.linger = float(config.get("batch_linger_seconds", 2))
+        self.backoff_max = float(config.get("retry_backoff_max_seconds", 30))
+        self._queued = 0  # records appended since the sender last woke; shared with it
+        self._queued_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._full = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain_loop, name="spool-sender", daemon=True)
+        self._thread.start()
+        REGISTRY.gauge(
+            "agent_spool_dropped_segments", "Spool segments discarded because the spool was full", (),
+            lambda: {(): self.spool.dropped_segments},
         )
 
+    def submit_metrics(self, node_id: str, latency: float, jitter: float,
+                       packet_loss: float, bandwidth: float, timestamp: int, urgent: bool = False) -> bool:
+        """Queues a sample on disk; True once it is durably spooled. Urgent samples skip the linger."""
+        request = build_request(node_id, latency, jitter, packet_loss, bandwidth, timestamp)
+        return self._append(self.spool, request.SerializeToString(), urgent)
+
+    def submit_summary(self, summary: metrics_pb2.MetricsSummary) -> bool:
+        """Queues a window summary on disk; True once it is durably spooled."""
+        if self.summary_spool is None:
+            raise RuntimeError("summary mode is not enabled in the config")
+        return self._append(self.summary_spool, summary.SerializeToString(), False)
+
+    def _append(self, spool: Spool, payload: bytes, urgent: bool) -> bool:
         try:
-            response: metrics_pb2.MetricsResponse = self.stub.SubmitMetrics(request)
-            return response.success
-        except grpc.RpcError as e:
-            print(f"[gRPC ERROR] {e.code()}: {e.details()}")
+            with SUBMIT_SECONDS.time():
+                spool.append(payload)
+        except (OSError, ValueError) as e:
+            print(f"[spool ERROR] {e}")
             return False
+        with self._queued_lock:
+            self._queued += 1
+            full = self._queued >= self.batch_size
+        self._wake.set()
+        if urgent or full:
+            self._full.set()
+        return True
+
+    def _drain(self, spool: Spool, parse: Callable[[bytes], Any],
+               send: Callable[[List[Any]], int], kind: str) -> Optional[bool]:
+        """Sends one batch from spool; None if it was empty, else whether all of it went through."""
+        batch = spool.read_batch(self.batch_size)
+        if not batch:
+            return None
+        sent = send([parse(payload) for payload, _ in batch])
+        if sent:
+            spool.commit(batch[sent - 1][1])
+        if sent == self.batch_size:
+            print(f"[spool] replayed a full batch of {sent} buffered {kind}")
+        return sent == len(batch)
+
+    def _drain_loop(self):
+        lanes = [(self.spool, metrics_pb2.MetricsRequest.FromString, self.client.send_batch, "samples")]
+        if self.summary_spool is not None:
+            lanes.append((self.summary_spool, metrics_pb2.MetricsSummary.FromString,
+                          self.client.send_summaries, "summaries"))
+        backoff = 1.0
+        while not self._stop.is_set():
+            results = [self._drain(*lane) for lane in lanes]
+            if all(r is None for r in results):
+                self._wake.wait()
+                self._wake.clear()
+                # Coalesce: send once batch_size records are queued or `linger` seconds pass
+                self._full.wait(self.linger)
+                self._full.clear()
+                with self._queued_lock:
+                    self._queued = 0
+            elif False in results:
+                # Link is down; keep everything on disk and retry later
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.backoff_max)
+            else:
+                backoff = 1.0
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._full.set()
+        self._thread.join(timeout=5)
+        self.spool.close()
+        if self.summary_spool is not None:
+            self.summary_spool.close()
+        self.client.close()
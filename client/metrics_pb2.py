@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rmetrics.proto\x12\x07metrics\"}\n\x0eMetricsRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0f\n\x07latency\x18\x02 \x01(\x01\x12\x0e\n\x06jitter\x18\x03 \x01(\x01\x12\x13\n\x0bpacket_loss\x18\x04 \x01(\x01\x12\x11\n\tbandwidth\x18\x05 \x01(\x01\x12\x11\n\ttimestamp\x18\x06 \x01(\x03\"\"\n\x0fMetricsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"\x1f\n\x0c\x46\x65tchRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\"v\n\x07Metrics\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0f\n\x07latency\x18\x02 \x01(\x01\x12\x0e\n\x06jitter\x18\x03 \x01(\x01\x12\x13\n\x0bpacket_loss\x18\x04 \x01(\x01\x12\x11\n\tbandwidth\x18\x05 \x01(\x01\x12\x11\n\ttimestamp\x18\x06 \x01(\x03\"0\n\x0bMetricsList\x12!\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x10.metrics.Metrics2\x91\x01\n\x0eMetricsService\x12\x42\n\rSubmitMetrics\x12\x17.metrics.MetricsRequest\x1a\x18.metrics.MetricsResponse\x12;\n\x0c\x46\x65tchMetrics\x12\x15.metrics.FetchRequest\x1a\x14.metrics.MetricsListB\x15Z\x13pkg/api/proto;protob\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rmetrics.proto\x12\x07metrics\"}\n\x0eMetricsRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0f\n\x07latency\x18\x02 \x01(\x01\x12\x0e\n\x06jitter\x18\x03 \x01(\x01\x12\x13\n\x0bpacket_loss\x18\x04 \x01(\x01\x12\x11\n\tbandwidth\x18\x05 \x01(\x01\x12\x11\n\ttimestamp\x18\x06 \x01(\x03\"\"\n\x0fMetricsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"\x8d\x01\n\x0c\x46\x65tchRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x10\n\x08node_ids\x18\x02 \x03(\t\x12\x0f\n\x07\x66rom_ms\x18\x03 \x01(\x03\x12\r\n\x05to_ms\x18\x04 \x01(\x03\x12\x11\n\tpage_size\x18\x05 \x01(\r\x12\x14\n\x0cresume_token\x18\x06 \x01(\t\x12\x11\n\tbucket_ms\x18\x07 \x01(\x03\"v\n\x07Metrics\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0f\n\x07latency\x18\x02 \x01(\x01\x12\x0e\n\x06jitter\x18\x03 \x01(\x01\x12\x13\n\x0bpacket_loss\x18\x04 \x01(\x01\x12\x11\n\tbandwidth\x18\x05 \x01(\x01\x12\x11\n\ttimestamp\x18\x06 \x01(\x03\"D\n\x0bMetricsList\x12!\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x10.metrics.Metrics\x12\x12\n\nnext_token\x18\x02 \x01(\t\"E\n\x0cMetricsBatch\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12(\n\x07\x65ntries\x18\x02 \x03(\x0b\x32\x17.metrics.MetricsRequest\"8\n\x08\x42\x61tchAck\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0e\n\x06stored\x18\x03 \x01(\x05\"Q\n\x0bMetricStats\x12\r\n\x05\x63ount\x18\x01 \x01(\r\x12\x0b\n\x03min\x18\x02 \x01(\x01\x12\x0b\n\x03max\x18\x03 \x01(\x01\x12\x0c\n\x04mean\x18\x04 \x01(\x01\x12\x0b\n\x03p95\x18\x05 \x01(\x01\"\x93\x02\n\x0eMetricsSummary\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x14\n\x0cwindow_start\x18\x02 \x01(\x03\x12\x12\n\nwindow_end\x18\x03 \x01(\x03\x12\x0f\n\x07samples\x18\x04 \x01(\r\x12\x14\n\x0clost_samples\x18\x05 \x01(\r\x12%\n\x07latency\x18\x06 \x01(\x0b\x32\x14.metrics.MetricStats\x12$\n\x06jitter\x18\x07 \x01(\x0b\x32\x14.metrics.MetricStats\x12)\n\x0bpacket_loss\x18\x08 \x01(\x0b\x32\x14.metrics.MetricStats\x12\'\n\tbandwidth\x18\t \x01(\x0b\x32\x14.metrics.MetricStats\"G\n\x0cSummaryBatch\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12*\n\tsummaries\x18\x02 \x03(\x0b\x32\x17.metrics.MetricsSummary2\x95\x02\n\x0eMetricsService\x12\x42\n\rSubmitMetrics\x12\x17.metrics.MetricsRequest\x1a\x18.metrics.MetricsResponse\x12=\n\x0c\x46\x65tchMetrics\x12\x15.metrics.FetchRequest\x1a\x14.metrics.MetricsList0\x01\x12\x43\n\x13SubmitMetricsStream\x12\x15.metrics.MetricsBatch\x1a\x11.metrics.BatchAck(\x01\x30\x01\x12;\n\x0fSubmitSummaries\x12\x15.metrics.SummaryBatch\x1a\x11.metrics.BatchAckB\x15Z\x13pkg/api/proto;protob\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -36,12 +36,22 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_METRICSREQUEST']._serialized_end=151
   _globals['_METRICSRESPONSE']._serialized_start=153
   _globals['_METRICSRESPONSE']._serialized_end=187
-  _globals['_FETCHREQUEST']._serialized_start=189
-  _globals['_FETCHREQUEST']._serialized_end=220
-  _globals['_METRICS']._serialized_start=222
-  _globals['_METRICS']._serialized_end=340
-  _globals['_METRICSLIST']._serialized_start=342
-  _globals['_METRICSLIST']._serialized_end=390
-  _globals['_METRICSSERVICE']._serialized_start=393
-  _globals['_METRICSSERVICE']._serialized_end=538
+  _globals['_FETCHREQUEST']._serialized_start=190
+  _globals['_FETCHREQUEST']._serialized_end=331
+  _globals['_METRICS']._serialized_start=333
+  _globals['_METRICS']._serialized_end=451
+  _globals['_METRICSLIST']._serialized_start=453
+  _globals['_METRICSLIST']._serialized_end=521
+  _globals['_METRICSBATCH']._serialized_start=523
+  _globals['_METRICSBATCH']._serialized_end=592
+  _globals['_BATCHACK']._serialized_start=594
+  _globals['_BATCHACK']._serialized_end=650
+  _globals['_METRICSTATS']._serialized_start=652
+  _globals['_METRICSTATS']._serialized_end=733
+  _globals['_METRICSSUMMARY']._serialized_start=736
+  _globals['_METRICSSUMMARY']._serialized_end=1011
+  _globals['_SUMMARYBATCH']._serialized_start=1013
+  _globals['_SUMMARYBATCH']._serialized_end=1084
+  _globals['_METRICSSERVICE']._serialized_start=1087
+  _globals['_METRICSSERVICE']._serialized_end=1364
 # @@protoc_insertion_point(module_scope)
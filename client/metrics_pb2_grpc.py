@@ -39,11 +39,21 @@ class MetricsServiceStub(object):
                 request_serializer=metrics__pb2.MetricsRequest.SerializeToString,
                 response_deserializer=metrics__pb2.MetricsResponse.FromString,
                 _registered_method=True)
-        self.FetchMetrics = channel.unary_unary(
+        self.FetchMetrics = channel.unary_stream(
                 '/metrics.MetricsService/FetchMetrics',
                 request_serializer=metrics__pb2.FetchRequest.SerializeToString,
                 response_deserializer=metrics__pb2.MetricsList.FromString,
                 _registered_method=True)
+        self.SubmitMetricsStream = channel.stream_stream(
+                '/metrics.MetricsService/SubmitMetricsStream',
+                request_serializer=metrics__pb2.MetricsBatch.SerializeToString,
+                response_deserializer=metrics__pb2.BatchAck.FromString,
+                _registered_method=True)
+        self.SubmitSummaries = channel.unary_unary(
+                '/metrics.MetricsService/SubmitSummaries',
+                request_serializer=metrics__pb2.SummaryBatch.SerializeToString,
+                response_deserializer=metrics__pb2.BatchAck.FromString,
+                _registered_method=True)
 
 
 class MetricsServiceServicer(object):
@@ -56,7 +66,22 @@ class MetricsServiceServicer(object):
         raise NotImplementedError('Method not implemented!')
 
     def FetchMetrics(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Stored metrics in the requested range, ordered by node and time, one page per message.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitMetricsStream(self, request_iterator, context):
+        """Long-lived stream of batches; every batch is stored atomically and acked in order.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitSummaries(self, request, context):
+        """Per-window aggregates from agents in summary mode; each batch is stored atomically.
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
@@ -69,11 +94,21 @@ def add_MetricsServiceServicer_to_server(servicer, server):
                     request_deserializer=metrics__pb2.MetricsRequest.FromString,
                     response_serializer=metrics__pb2.MetricsResponse.SerializeToString,
             ),
-            'FetchMetrics': grpc.unary_unary_rpc_method_handler(
+            'FetchMetrics': grpc.unary_stream_rpc_method_handler(
                     servicer.FetchMetrics,
                     request_deserializer=metrics__pb2.FetchRequest.FromString,
                     response_serializer=metrics__pb2.MetricsList.SerializeToString,
             ),
+            'SubmitMetricsStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.SubmitMetricsStream,
+                    request_deserializer=metrics__pb2.MetricsBatch.FromString,
+                    response_serializer=metrics__pb2.BatchAck.SerializeToString,
+            ),
+            'SubmitSummaries': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitSummaries,
+                    request_deserializer=metrics__pb2.SummaryBatch.FromString,
+                    response_serializer=metrics__pb2.BatchAck.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'metrics.MetricsService', rpc_method_handlers)
@@ -123,7 +158,7 @@ class MetricsService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(
+        return grpc.experimental.unary_stream(
             request,
             target,
             '/metrics.MetricsService/FetchMetrics',
@@ -138,3 +173,57 @@ class MetricsService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SubmitMetricsStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/metrics.MetricsService/SubmitMetricsStream',
+            metrics__pb2.MetricsBatch.SerializeToString,
+            metrics__pb2.BatchAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitSummaries(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/metrics.MetricsService/SubmitSummaries',
+            metrics__pb2.SummaryBatch.SerializeToString,
+            metrics__pb2.BatchAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
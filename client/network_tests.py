@@ -1,8 +1,18 @@
+import asyncio
 import subprocess
 import re
 import json
+import socket
 import statistics
-from typing import Dict, Any
+import struct
+import time
+from typing import Dict, Any, Iterable, List
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# Flipped off the first time the kernel refuses an unprivileged ICMP socket
+_icmp_socket_allowed = True
 
 
 def run_ping(target: str = "8.8.8.8", count: int = 2, timeout: int = 2) -> Dict[str, float]:
@@ -42,6 +52,108 @@ def run_ping(target: str = "8.8.8.8", count: int = 2, timeout: int = 2) -> Dict[
         }
 
 
+def _summarize(rtts: List[float], sent: int) -> Dict[str, float]:
+    """Same latency/jitter/loss shape that run_ping returns."""
+    return {
+        "latency": statistics.mean(rtts) if rtts else 0.0,
+        "jitter": statistics.pstdev(rtts) if rtts else 0.0,
+        "packet_loss": 100.0 * (sent - len(rtts)) / sent if sent else 100.0,
+    }
+
+
+def _icmp_checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class _EchoProtocol(asyncio.DatagramProtocol):
+    """Resolves one future per echo sequence number with the receive time."""
+
+    def __init__(self):
+        self.waiters: Dict[int, asyncio.Future] = {}
+
+    def datagram_received(self, data, addr):
+        # ICMP datagram sockets deliver the ICMP header without the IP header
+        if len(data) < 8:
+            return
+        icmp_type, _, _, _, seq = struct.unpack("!BBHHH", data[:8])
+        fut = self.waiters.get(seq)
+        if icmp_type == ICMP_ECHO_REPLY and fut is not None and not fut.done():
+            fut.set_result(time.perf_counter())
+
+    def error_received(self, exc):
+        pass
+
+
+async def async_ping(target: str, count: int = 2, timeout: float = 2.0,
+                     interval: float = 0.2) -> Dict[str, float]:
+    """
+    In-process ICMP echo using an unprivileged datagram socket (no fork, no root).
+    Needs net.ipv4.ping_group_range to include the agent's group; raises
+    PermissionError otherwise so the caller can fall back to run_ping.
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    sock.setblocking(False)
+    transport, proto = await loop.create_datagram_endpoint(_EchoProtocol, sock=sock)
+    try:
+        infos = await loop.getaddrinfo(target, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        addr = infos[0][4][0]
+
+        payload = b"ecnet-probe".ljust(48, b"\x00")
+        sent_at: Dict[int, float] = {}
+        for seq in range(1, count + 1):
+            proto.waiters[seq] = loop.create_future()
+            # The kernel rewrites the identifier to the socket's port and demuxes replies for us
+            header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, 0, seq)
+            checksum = _icmp_checksum(header + payload)
+            packet = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, 0, seq) + payload
+            sent_at[seq] = time.perf_counter()
+            transport.sendto(packet, (addr, 0))
+            if seq < count:
+                await asyncio.sleep(interval)
+
+        await asyncio.wait(list(proto.waiters.values()), timeout=timeout)
+        rtts = [
+            (fut.result() - sent_at[seq]) * 1000.0
+            for seq, fut in proto.waiters.items()
+            if fut.done() and not fut.cancelled()
+        ]
+        return _summarize(rtts, count)
+    finally:
+        for fut in proto.waiters.values():
+            fut.cancel()
+        transport.close()
+
+
+async def probe_target(target: str, count: int = 2, timeout: float = 2.0) -> Dict[str, float]:
+    """Pings target in-process, falling back to the forked ping binary when ICMP sockets are not permitted."""
+    global _icmp_socket_allowed
+    if _icmp_socket_allowed:
+        try:
+            return await async_ping(target, count=count, timeout=timeout)
+        except PermissionError:
+            _icmp_socket_allowed = False
+            print("[probe] unprivileged ICMP sockets disabled (net.ipv4.ping_group_range); "
+                  "using the ping binary instead")
+        except OSError as e:
+            print(f"[probe] {target}: {e}")
+            return _summarize([], count)
+    return await asyncio.to_thread(run_ping, target, count, int(timeout))
+
+
+async def probe_targets(targets: Iterable[str], count: int = 2,
+                        timeout: float = 2.0) -> Dict[str, Dict[str, float]]:
+    """Probes all targets concurrently; returns {target: latency/jitter/loss dict}."""
+    unique = list(dict.fromkeys(t for t in targets if t))
+    results = await asyncio.gather(*(probe_target(t, count, timeout) for t in unique))
+    return dict(zip(unique, results))
+
+
 def run_iperf3(server_host: str, duration: int = 1, port: int = 5201) -> float:
     try:
         result = subprocess.run(
@@ -66,6 +178,42 @@ def run_iperf3(server_host: str, duration: int = 1, port: int = 5201) -> float:
         return 0.0
 
 
+async def run_iperf3_async(server_host: str, duration: int = 1, port: int = 5201,
+                           max_bytes: int = 0) -> float:
+    """
+    run_iperf3 on an asyncio subprocess, so a caller's timeout can kill the test.
+    With max_bytes set the test sends exactly that many bytes instead of running
+    for `duration` seconds, which bounds what one measurement costs the link.
+    """
+    length = ["-n", str(max_bytes)] if max_bytes > 0 else ["-t", str(duration)]
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "iperf3", "-c", server_host, "-p", str(port), *length, "-J",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        print("[iperf3] iperf3 binary not found; install iperf3 on this pod.")
+        return 0.0
+
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+    if proc.returncode != 0:
+        print(f"[iperf3] error rc={proc.returncode} stderr={stderr.decode().strip()}")
+        return 0.0
+    try:
+        data = json.loads(stdout)
+        return data["end"]["sum_received"]["bits_per_second"] / 1_000_000.0
+    except (ValueError, KeyError) as e:
+        print(f"[iperf3] unexpected output: {e}")
+        return 0.0
+
+
 def collect_metrics(ping_target: str, iperf_server_host: str, iperf_port: int = 5201) -> Dict[str, Any]:
     ping_results = run_ping(ping_target)
     bandwidth_mbps = run_iperf3(iperf_server_host, port=iperf_port)
@@ -76,3 +224,23 @@ def collect_metrics(ping_target: str, iperf_server_host: str, iperf_port: int =
         "packet_loss": ping_results["packet_loss"],
         "bandwidth": bandwidth_mbps
     }
+
+
+async def collect_metrics_async(ping_target: str, iperf_server_host: str, iperf_port: int = 5201,
+                                extra_targets: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Same result as collect_metrics, but pings run in-process and concurrently across
+    ping_target and extra_targets. Per-target results are returned under "targets".
+    """
+    targets = await probe_targets([ping_target, *extra_targets])
+    # iperf3 saturates the link, so it runs after the latency probes rather than alongside them
+    bandwidth_mbps = await asyncio.to_thread(run_iperf3, iperf_server_host, port=iperf_port)
+
+    primary = targets[ping_target]
+    return {
+        "latency": primary["latency"],
+        "jitter": primary["jitter"],
+        "packet_loss": primary["packet_loss"],
+        "bandwidth": bandwidth_mbps,
+        "targets": targets,
+    }
@@ -1,58 +1,302 @@
+import asyncio
+import random
+import signal
 import time
 import socket
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict
 
-from .network_tests import collect_metrics
-from .metrics_client import MetricsGRPCClient, load_config
+from .aggregate import WindowAggregator
+from .cadence import PING_BYTES_PER_ECHO, AdaptiveCadence, ProbeBudget, threshold_breach
+from .network_tests import probe_targets, run_iperf3_async, run_ping
+from .metrics_client import SpooledMetricsClient, load_config
+from .telemetry import REGISTRY, start_http_server
 
+PROBE_SECONDS = REGISTRY.histogram(
+    "agent_probe_seconds", "Wall time of one probe run", ("probe", "outcome"))
+SCHEDULE_LATENESS = REGISTRY.histogram(
+    "agent_schedule_lateness_seconds", "How late a probe started versus its deadline", ("probe",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+PROBES_SKIPPED = REGISTRY.counter(
+    "agent_probe_skipped_total", "Probe runs skipped because the previous run overran", ("probe",))
+PROBES_DENIED = REGISTRY.counter(
+    "agent_probe_budget_denied_total", "Probe runs refused by the bandwidth budget", ("probe",))
 
-def main():
-    # Load config from client/config.json
-    config = load_config("client/config.json")
 
-    node_id = config.get("node_id") or socket.gethostname()
+@dataclass
+class Probe:
+    """
+    One measurement with its own cadence. Runs of the same probe never overlap.
+    `period` is the normal cadence; adaptive scheduling moves it between
+    min_period and max_period. `cost` is the worst-case bytes one run sends.
+    """
+    name: str
+    run: Callable[[], Awaitable[Dict[str, Any]]]
+    period: float
+    jitter: float = 0.0
+    timeout: float = 10.0
+    min_period: float = 0.0
+    max_period: float = 0.0
+    cost: Callable[[], int] = lambda: 0
+
+    def __post_init__(self):
+        self.min_period = min(self.min_period or self.period, self.period)
+        self.max_period = max(self.max_period or self.period, self.period)
+
+
+def build_probes(config: Dict[str, Any]) -> Dict[str, Probe]:
+    """Builds the ping and bandwidth probes from client/config.json."""
     ping_target = config["ping_target"]
     iperf_server_host = config["iperf_server_host"]
     iperf_server_port = int(config.get("iperf_server_port", 5201))
-    interval = int(config["interval_seconds"])
+    extra_targets = [config["grpc_server_host"], *config.get("extra_ping_targets", [])]
+    probe_cfg = config.get("probes", {})
+    ping_cfg = probe_cfg.get("ping", {})
+    bw_cfg = probe_cfg.get("bandwidth", {})
+    ping_count = 2
+    bw_duration = int(bw_cfg.get("duration_seconds", 1))
+    bw_max_bytes = int(bw_cfg.get("max_bytes", 0))
+    # Last measured throughput, used to estimate an uncapped iperf3 run
+    last_mbps = [float(bw_cfg.get("expected_mbps", 100))]
 
-    grpc_client = MetricsGRPCClient(config)
+    async def ping():
+        if config.get("probe_engine", "async") != "async":
+            result = await asyncio.to_thread(run_ping, ping_target)
+            return dict(result, targets={ping_target: result})
+        targets = await probe_targets([ping_target, *extra_targets], count=ping_count)
+        return dict(targets[ping_target], targets=targets)
 
-    print(f"\n=== Network Scheduler Started for Node: {node_id} ===")
-    print(f"Ping target: {ping_target}")
-    print(f"iPerf3 server: {iperf_server_host}")
-    print(f"Send interval: {interval} seconds\n")
+    async def bandwidth():
+        mbps = await run_iperf3_async(iperf_server_host, duration=bw_duration,
+                                      port=iperf_server_port, max_bytes=bw_max_bytes)
+        if mbps > 0:
+            last_mbps[0] = mbps
+        return {"bandwidth": mbps}
+
+    def ping_cost() -> int:
+        return len(set([ping_target, *extra_targets])) * ping_count * PING_BYTES_PER_ECHO
 
+    def bandwidth_cost() -> int:
+        return bw_max_bytes or int(last_mbps[0] * 125_000 * bw_duration)
+
+    return {
+        "ping": Probe(
+            "ping", ping,
+            period=float(ping_cfg.get("period_seconds", config.get("interval_seconds", 1))),
+            jitter=float(ping_cfg.get("jitter_seconds", 0.0)),
+            timeout=float(ping_cfg.get("timeout_seconds", 2.5)),
+            min_period=float(ping_cfg.get("min_period_seconds", 0)),
+            max_period=float(ping_cfg.get("max_period_seconds", 0)),
+            cost=ping_cost,
+        ),
+        "bandwidth": Probe(
+            "bandwidth", bandwidth,
+            period=float(bw_cfg.get("period_seconds", 300)),
+            jitter=float(bw_cfg.get("jitter_seconds", 15)),
+            timeout=float(bw_cfg.get("timeout_seconds", 10)),
+            min_period=float(bw_cfg.get("min_period_seconds", 0)),
+            max_period=float(bw_cfg.get("max_period_seconds", 0)),
+            cost=bandwidth_cost,
+        ),
+    }
+
+
+async def run_probe(probe: Probe, on_result: Callable[[str, Dict[str, Any], float], None],
+                    on_timeout: Callable[[str, float], None],
+                    cadence: AdaptiveCadence, budget: ProbeBudget):
+    """
+    Runs probe forever on monotonic deadlines, each one period (as chosen by
+    cadence) after the previous. Jitter is added to each firing without
+    accumulating, and deadlines missed by a slow run are skipped instead of
+    being run back to back. A burst cuts the current wait short; runs the
+    bandwidth budget refuses are skipped.
+    """
+    deadline = last_run = time.monotonic()
     while True:
-        loop_start = time.time()
-        timestamp = int(loop_start)
+        fire_at = deadline + random.uniform(0, probe.jitter)
+        delay = fire_at - time.monotonic()
+        if delay > 0 and await cadence.sleep(delay):
+            # A burst started while waiting: re-plan from the last run at the burst period
+            deadline = max(min(deadline, last_run + cadence.period(probe)), time.monotonic())
+            continue
+
+        started = time.monotonic()
+        SCHEDULE_LATENESS.observe(max(started - fire_at, 0.0), probe.name)
+        if budget.reserve(probe.cost()):
+            last_run = started
+            started_wall = time.time()
+            outcome = "ok"
+            try:
+                result = await asyncio.wait_for(probe.run(), probe.timeout)
+                on_result(probe.name, result, started_wall)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                print(f"[{probe.name}] timed out after {probe.timeout:.1f}s")
+                on_timeout(probe.name, started_wall)
+            except Exception as e:
+                outcome = "error"
+                print(f"[{probe.name}] probe failed: {e}")
+            PROBE_SECONDS.observe(time.monotonic() - started, probe.name, outcome)
+        else:
+            PROBES_DENIED.inc(probe.name)
+            print(f"[{probe.name}] skipped: probe budget of {budget.bytes_per_hour} bytes/hour used up")
+
+        period = cadence.advance(probe)
+        deadline += period
+        now = time.monotonic()
+        if deadline < now:
+            skipped = int((now - deadline) // period) + 1
+            deadline += skipped * period
+            PROBES_SKIPPED.inc(probe.name, amount=skipped)
+            print(f"[{probe.name}] running late; skipped {skipped} run(s)")
+
+
+async def run_agent(config: Dict[str, Any]):
+    node_id = config.get("node_id") or socket.gethostname()
+    probes = build_probes(config)
+    cadence = AdaptiveCadence.from_config(config)
+    budget = ProbeBudget(int(config.get("probe_budget_bytes_per_hour", 0)))
+    REGISTRY.gauge(
+        "agent_probe_period_seconds", "Current period of each probe", ("probe",),
+        lambda: {(p.name,): cadence.period(p) for p in probes.values()},
+    )
+    REGISTRY.gauge(
+        "agent_probe_budget_used_bytes", "Probe traffic in the last hour", (),
+        lambda: {(): budget.used()},
+    )
+
+    # Samples go to the local spool first; a background thread forwards them
+    grpc_client = SpooledMetricsClient(config)
+
+    # Summary mode: one MetricsSummary per window, raw samples only on a threshold breach
+    summary_cfg = config.get("summary", {})
+    aggregator = None
+    if summary_cfg.get("enabled"):
+        aggregator = WindowAggregator(node_id, float(summary_cfg.get("window_seconds", 10)),
+                                      int(summary_cfg.get("capacity", 1024)))
+        raw_thresholds = summary_cfg.get("thresholds") or config.get("adaptive", {}).get("thresholds", {})
+
+    # Local Prometheus-style scrape endpoint for the agent's own timings
+    metrics_port = int(config.get("metrics_port", 0))
+    if metrics_port:
+        start_http_server(metrics_port, config.get("metrics_host", "127.0.0.1"))
+        print(f"Agent metrics on :{metrics_port}/metrics")
+
+    print(f"\n=== Network Scheduler Started for Node: {node_id} ===")
+    print(f"Ping target: {config['ping_target']}")
+    print(f"iPerf3 server: {config['iperf_server_host']}")
+    for probe in probes.values():
+        print(f"Probe {probe.name:<9}: every {probe.period:g}s "
+              f"(+{probe.jitter:g}s jitter, {probe.timeout:g}s timeout)")
+        if cadence.enabled:
+            print(f"  adaptive between {probe.min_period:g}s and {probe.max_period:g}s")
+    if budget.bytes_per_hour:
+        print(f"Probe budget: {budget.bytes_per_hour} bytes/hour")
+    if aggregator is not None:
+        print(f"Summary mode: one upload per {aggregator.window_ms / 1000:g}s window")
+    print()
+
+    # Latest result of every probe; each ping result is merged with the rest into one sample.
+    # No bandwidth until iperf3 has run once, so summary windows don't average in a 0.
+    latest: Dict[str, Any] = {"latency": 0.0, "jitter": 0.0, "packet_loss": 100.0}
+
+    def flush_summary():
+        summary = aggregator.flush()
+        if summary is not None and grpc_client.submit_summary(summary):
+            print(f"  [OK] Queued summary of {summary.samples} samples")
+
+    async def flush_idle_windows():
+        # A window otherwise only closes when the next sample arrives, so a pod that
+        # stopped probing would never upload it. Wait out a ping still in flight first.
+        grace_ms = int(probes["ping"].timeout * 1000) if "ping" in probes else 0
+        while True:
+            await asyncio.sleep(aggregator.window_ms / 1000)
+            if aggregator.due(int(time.time() * 1000) - grace_ms):
+                print("[summary] closing idle window")
+                flush_summary()
 
-        # Run tests
-        metrics = collect_metrics(ping_target, iperf_server_host, iperf_port=iperf_server_port)
+    def submit(timestamp: float):
+        print(f"[{int(timestamp)}] Metrics collected:")
+        print(f"  Latency:      {latest['latency']:.2f} ms")
+        print(f"  Jitter:       {latest['jitter']:.2f} ms")
+        print(f"  Packet Loss:  {latest['packet_loss']:.2f} %")
+        if "bandwidth" in latest:
+            print(f"  Bandwidth:    {latest['bandwidth']:.2f} Mbps")
+        for target, result in latest.get("targets", {}).items():
+            if target != config["ping_target"]:
+                print(f"  -> {target}: {result['latency']:.2f} ms, loss {result['packet_loss']:.0f} %")
 
-        print(f"[{timestamp}] Metrics collected:")
-        print(f"  Latency:      {metrics['latency']:.2f} ms")
-        print(f"  Jitter:       {metrics['jitter']:.2f} ms")
-        print(f"  Packet Loss:  {metrics['packet_loss']:.2f} %")
-        print(f"  Bandwidth:    {metrics['bandwidth']:.2f} Mbps")
+        ts_ms = int(timestamp * 1000)
+        if aggregator is not None:
+            if aggregator.due(ts_ms):
+                flush_summary()
+            # A breach goes out raw instead of into the window: the server stores the
+            # window's means as a metrics row too, so both would count it twice
+            breach = threshold_breach(raw_thresholds, latest)
+            if breach is None:
+                aggregator.add(ts_ms, latest)
+                print("  [OK] Added to window\n")
+                return
+            print(f"  [!] {breach}; sending the raw sample now")
 
-        # Send to gRPC server
+        # Spool for delivery to the gRPC server (never blocks on the network)
         success = grpc_client.submit_metrics(
             node_id=node_id,
-            latency=metrics["latency"],
-            jitter=metrics["jitter"],
-            packet_loss=metrics["packet_loss"],
-            bandwidth=metrics["bandwidth"],
-            timestamp=timestamp
+            latency=latest["latency"],
+            jitter=latest["jitter"],
+            packet_loss=latest["packet_loss"],
+            bandwidth=latest.get("bandwidth", 0.0),
+            # ms: burst probes run faster than once a second
+            timestamp=ts_ms,
+            urgent=aggregator is not None,
         )
 
         if success:
-            print("  [OK] Submitted successfully\n")
+            print("  [OK] Queued for submission\n")
         else:
-            print("  [X] Submission failed\n")
+            print("  [X] Could not spool sample\n")
 
-        elapsed = time.time() - loop_start
-        sleep_for = max(0, interval - elapsed)
-        time.sleep(sleep_for)
+    def observe(result: Dict[str, Any]):
+        reason = cadence.observe(result)
+        if reason:
+            print(f"[cadence] burst for {cadence.burst_seconds:g}s: {reason}")
+
+    def on_result(name: str, result: Dict[str, Any], started_wall: float):
+        latest.update(result)
+        observe(result)
+        if name == "ping":
+            submit(started_wall)
+
+    def on_timeout(name: str, started_wall: float):
+        # A ping that never came back within its budget is a lost probe
+        if name == "ping":
+            lost = {"latency": 0.0, "jitter": 0.0, "packet_loss": 100.0}
+            latest.update(lost, targets={})
+            # Only the ping's own fields: the last bandwidth result is not a new measurement
+            observe(lost)
+            submit(started_wall)
+
+    tasks = [run_probe(p, on_result, on_timeout, cadence, budget) for p in probes.values()]
+    if aggregator is not None:
+        tasks.append(flush_idle_windows())
+    # SIGTERM (systemd, docker stop) ends the agent like Ctrl-C, through the finally below
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        if aggregator is not None:
+            # The open window goes to the spool and is sent on the next start if not before
+            flush_summary()
+        grpc_client.close()
+
+
+def main():
+    # Load config from client/config.json
+    config = load_config("client/config.json")
+    try:
+        asyncio.run(run_agent(config))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+# Record header: magic, payload length, crc32(payload)
+_HEADER = struct.Struct("<HHI")
+_MAGIC = 0x5350
+_SEGMENT_RE = re.compile(r"^seg-(\d{12})\.log$")
+
+Cursor = Tuple[int, int]  # (segment sequence, byte offset)
+
+
+class Spool:
+    """
+    Append-only, crash-safe on-disk queue made of fixed-size memory-mapped segments.
+
+    Records are framed as <magic, length, crc32> + payload. The payload is written
+    before its header, so a torn write is never mistaken for a valid record, and
+    recovery simply stops at the first header that does not check out. Once more
+    than ``max_segments`` segments exist the oldest one is dropped, which bounds
+    disk use at roughly ``segment_bytes * max_segments``.
+    """
+
+    def __init__(self, path: str, segment_bytes: int = 1 << 20, max_segments: int = 16,
+                 sync: bool = True):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.max_segments = max(2, max_segments)
+        self.sync = sync
+        self.dropped_segments = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        self._segments = self._list_segments()
+        self._cursor = self._load_cursor()
+        if not self._segments:
+            self._segments = [self._cursor[0]]
+        self._active_seq = self._segments[-1]
+        self._active_file, self._active_map = self._open_segment(self._active_seq)
+        self._write_offset = self._recover(self._active_map)
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"seg-{seq:012d}.log")
+
+    def _list_segments(self) -> List[int]:
+        seqs = []
+        for name in os.listdir(self.path):
+            m = _SEGMENT_RE.match(name)
+            if m:
+                seqs.append(int(m.group(1)))
+        return sorted(seqs)
+
+    def _open_segment(self, seq: int):
+        fd = os.open(self._segment_path(seq), os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size < self.segment_bytes:
+            os.ftruncate(fd, self.segment_bytes)
+        f = os.fdopen(fd, "r+b")
+        return f, mmap.mmap(f.fileno(), self.segment_bytes)
+
+    def _load_cursor(self) -> Cursor:
+        try:
+            with open(os.path.join(self.path, "cursor"), "r") as f:
+                data = json.load(f)
+            cursor = (int(data["segment"]), int(data["offset"]))
+        except (OSError, ValueError, KeyError):
+            cursor = (self._segments[0] if self._segments else 0, 0)
+        # The segment the cursor points at may have been dropped while we were down
+        if self._segments and cursor[0] < self._segments[0]:
+            cursor = (self._segments[0], 0)
+        return cursor
+
+    def _store_cursor(self, cursor: Cursor) -> None:
+        tmp = os.path.join(self.path, "cursor.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"segment": cursor[0], "offset": cursor[1]}, f)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, "cursor"))
+
+    @staticmethod
+    def _parse(buf, offset: int, limit: int) -> Optional[bytes]:
+        """Return the payload stored at offset, or None at end-of-data / torn record."""
+        if offset + _HEADER.size > limit:
+            return None
+        magic, length, crc = _HEADER.unpack_from(buf, offset)
+        if magic != _MAGIC or length == 0:
+            return None
+        end = offset + _HEADER.size + length
+        if end > limit:
+            return None
+        payload = bytes(buf[offset + _HEADER.size:end])
+        if zlib.crc32(payload) != crc:
+            return None
+        return payload
+
+    def _recover(self, mm: mmap.mmap) -> int:
+        """Find the end of valid data in the active segment and zero anything after it."""
+        offset = 0
+        while True:
+            payload = self._parse(mm, offset, self.segment_bytes)
+            if payload is None:
+                break
+            offset += _HEADER.size + len(payload)
+        tail = mm[offset:]
+        if tail.strip(b"\x00"):
+            mm[offset:] = b"\x00" * len(tail)
+            mm.flush()
+        return offset
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+    def _roll(self) -> None:
+        self._active_map.flush()
+        self._active_map.close()
+        self._active_file.close()
+
+        self._active_seq += 1
+        self._segments.append(self._active_seq)
+        self._active_file, self._active_map = self._open_segment(self._active_seq)
+        self._write_offset = 0
+
+        while len(self._segments) > self.max_segments:
+            oldest = self._segments.pop(0)
+            self._remove_segment(oldest)
+            self.dropped_segments += 1
+            print(f"[spool] disk budget reached; dropped unsent segment {oldest}")
+            if self._cursor[0] <= oldest:
+                self._cursor = (self._segments[0], 0)
+                self._store_cursor(self._cursor)
+
+    def append(self, payload: bytes) -> None:
+        """Durably append one record. Never touches the network."""
+        if not payload or len(payload) > 0xFFFF:
+            raise ValueError("spool records must be 1..65535 bytes")
+        size = _HEADER.size + len(payload)
+        if size > self.segment_bytes:
+            raise ValueError("record larger than spool segment")
+
+        with self._lock:
+            if self._write_offset + size > self.segment_bytes:
+                self._roll()
+            off = self._write_offset
+            mm = self._active_map
+            mm[off + _HEADER.size:off + size] = payload
+            mm[off:off + _HEADER.size] = _HEADER.pack(_MAGIC, len(payload), zlib.crc32(payload))
+            if self.sync:
+                # msync only the pages we touched
+                start = off - off % mmap.ALLOCATIONGRANULARITY
+                mm.flush(start, off + size - start)
+            self._write_offset = off + size
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+    def read_batch(self, max_records: int) -> List[Tuple[bytes, Cursor]]:
+        """
+        Return up to max_records unacknowledged records in append order.
+        Each record is paired with the cursor to commit once it has been delivered.
+        """
+        out: List[Tuple[bytes, Cursor]] = []
+        with self._lock:
+            seq, offset = self._cursor
+            while len(out) < max_records:
+                if seq == self._active_seq:
+                    if offset >= self._write_offset:
+                        break
+                    payload = self._parse(self._active_map, offset, self._write_offset)
+                else:
+                    payload = self._read_sealed(seq, offset)
+                if payload is None:
+                    nxt = [s for s in self._segments if s > seq]
+                    if not nxt:
+                        break
+                    seq, offset = nxt[0], 0
+                    continue
+                offset += _HEADER.size + len(payload)
+                out.append((payload, (seq, offset)))
+        return out
+
+    def _read_sealed(self, seq: int, offset: int) -> Optional[bytes]:
+        try:
+            with open(self._segment_path(seq), "rb") as f:
+                header = os.pread(f.fileno(), _HEADER.size, offset)
+                if len(header) < _HEADER.size:
+                    return None
+                _, length, _ = _HEADER.unpack(header)
+                buf = os.pread(f.fileno(), _HEADER.size + length, offset)
+        except OSError:
+            return None
+        return self._parse(buf, 0, len(buf))
+
+    def commit(self, cursor: Cursor) -> None:
+        """Mark everything before cursor as delivered and reclaim finished segments."""
+        with self._lock:
+            if cursor <= self._cursor:
+                return
+            self._cursor = cursor
+            self._store_cursor(cursor)
+            while self._segments and self._segments[0] < cursor[0]:
+                self._remove_segment(self._segments.pop(0))
+
+    def _remove_segment(self, seq: int) -> None:
+        # Already gone (removed by hand, or reclaimed on the other path) is fine
+        try:
+            os.remove(self._segment_path(seq))
+        except FileNotFoundError:
+            pass
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            seq, offset = self._cursor
+            if seq == self._active_seq:
+                return offset < self._write_offset
+            # Every segment after the cursor's holds at least the record that rolled into it
+            if self._write_offset > 0 or any(seq < s < self._active_seq for s in self._segments):
+                return True
+            # The cursor may sit at the end of a sealed segment
+            return self._read_sealed(seq, offset) is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._active_map.flush()
+            self._active_map.close()
+            self._active_file.close()
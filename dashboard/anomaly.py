@@ -0,0 +1,173 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Direction that counts as "bad" for each metric, and a floor for its standard
+# deviation so a perfectly flat series does not turn every wiggle into z = inf.
+METRICS = {
+    "latency": (1, 1.0),       # ms
+    "jitter": (1, 0.5),        # ms
+    "packet_loss": (1, 0.5),   # %
+    "bandwidth": (-1, 1.0),    # Mbps
+}
+
+
+class Welford:
+    """Running mean/variance in O(1) per sample."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class MetricState:
+    """EWMA level/variance plus one Welford baseline per hour of day."""
+
+    __slots__ = ("n", "ewma_mean", "ewma_var", "hours", "active", "normal_streak")
+
+    def __init__(self):
+        self.n = 0
+        self.ewma_mean = 0.0
+        self.ewma_var = 0.0
+        self.hours = [Welford() for _ in range(24)]
+        self.active = False
+        self.normal_streak = 0
+
+    def update(self, x: float, hour: int, alpha: float):
+        if self.n == 0:
+            self.ewma_mean = x
+        else:
+            diff = x - self.ewma_mean
+            incr = alpha * diff
+            self.ewma_mean += incr
+            self.ewma_var = (1 - alpha) * (self.ewma_var + diff * incr)
+        self.n += 1
+        self.hours[hour].update(x)
+
+
+class AnomalyDetector:
+    """
+    Online per-node, per-metric anomaly scoring. Each sample is scored against
+    its hour-of-day baseline once that hour has enough history, otherwise
+    against the EWMA, and then folded into both, so cost per sample is constant
+    no matter how much history there is. A metric raises one anomaly when it
+    goes out of bounds and clears after `clear_after` normal samples.
+    """
+
+    def __init__(self, alpha: float = 0.05, threshold: float = 4.0, warmup: int = 30,
+                 hour_min_samples: int = 120, clear_after: int = 5, history: int = 500,
+                 on_anomaly: Optional[Callable[[dict], None]] = None):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.hour_min_samples = hour_min_samples
+        self.clear_after = clear_after
+        self.on_anomaly = on_anomaly
+        self.samples = 0
+        self.raised = 0
+        self._state: Dict[Tuple[str, str], MetricState] = {}
+        self._last_ts: Dict[str, int] = {}
+        self._recent: Deque[dict] = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def _score(self, state: MetricState, x: float, hour: int, floor: float):
+        baseline = state.hours[hour]
+        if baseline.n >= self.hour_min_samples:
+            expected, std, source = baseline.mean, baseline.std, "hour_of_day"
+        elif state.n >= self.warmup:
+            expected, std, source = state.ewma_mean, math.sqrt(state.ewma_var), "ewma"
+        else:
+            return None
+        return (x - expected) / max(std, floor), expected, source
+
+    def observe(self, node_id: str, ts_ms: int, row: dict, emit: bool = True) -> List[dict]:
+        """Score one sample and update state. Samples older than the node's newest are ignored."""
+        found = []
+        with self._lock:
+            if ts_ms <= self._last_ts.get(node_id, -1):
+                return found
+            self._last_ts[node_id] = ts_ms
+            self.samples += 1
+            hour = time.localtime(ts_ms / 1000).tm_hour
+
+            for metric, (direction, floor) in METRICS.items():
+                value = row.get(metric)
+                if value is None:
+                    continue
+                x = float(value)
+                key = (node_id, metric)
+                state = self._state.get(key)
+                if state is None:
+                    state = self._state[key] = MetricState()
+
+                scored = self._score(state, x, hour, floor)
+                if scored is not None and scored[0] * direction > self.threshold:
+                    state.normal_streak = 0
+                    if not state.active:
+                        state.active = True
+                        z, expected, source = scored
+                        found.append({
+                            "node_id": node_id,
+                            "metric": metric,
+                            "value": round(x, 3),
+                            "expected": round(expected, 3),
+                            "z": round(z, 2),
+                            "baseline": source,
+                            "hour": hour,
+                            "ts": ts_ms,
+                        })
+                elif state.active:
+                    state.normal_streak += 1
+                    if state.normal_streak >= self.clear_after:
+                        state.active = False
+                state.update(x, hour, self.alpha)
+
+            if emit:
+                self._recent.extend(found)
+                self.raised += len(found)
+
+        if emit and self.on_anomaly:
+            for anomaly in found:
+                self.on_anomaly(anomaly)
+        return found
+
+    def recent(self, node_id: Optional[str] = None, since: Optional[int] = None,
+               limit: int = 100) -> List[dict]:
+        with self._lock:
+            items = [
+                a for a in self._recent
+                if (node_id is None or a["node_id"] == node_id) and (since is None or a["ts"] >= since)
+            ]
+        return items[-limit:]
+
+    def active(self, node_id: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(node_id, metric) pairs currently out of bounds."""
+        with self._lock:
+            return [
+                key for key, state in self._state.items()
+                if state.active and (node_id is None or key[0] == node_id)
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "samples": self.samples,
+                "anomalies": self.raised,
+                "tracked_series": len(self._state),
+                "active": len([s for s in self._state.values() if s.active]),
+            }
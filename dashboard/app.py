@@ -1,22 +1,45 @@
+import itertools
 import json
 import os
-import queue
-import socket
 import subprocess
 import threading
 import time
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import psycopg2
-from flask import Flask, render_template, Response, stream_with_context, jsonify
+from flask import Flask, g, redirect, render_template, Response, stream_with_context, jsonify, request
 from psycopg2.extras import RealDictCursor
 
+from anomaly import AnomalyDetector
+from broadcaster import Broadcaster
+from bus import EventBus
+from compare import ComparisonCache, _clean, load_buckets
+from compare import RESOLUTIONS as COMPARE_RESOLUTIONS, WINDOWS as COMPARE_WINDOWS
+from db import ConnectionPool, TTLCache
+from downsample import downsample
+from export import FORMATS, as_csv, as_ndjson, gzipped, iter_rows
+from health import HealthProber
+from hottier import HotTier
+from podstatus import PodStatusTracker
+from respcache import IMMUTABLE, ResponseCache
+from rollup import RollupWorker, STATS, fetch_rollup_range, pick_resolution
+from telemetry import CONTENT_TYPE, REGISTRY
+
 app = Flask(__name__)
 
-# Simple in-process queues for SSE
-chart_event_queue = queue.Queue()
-log_queue = queue.Queue()
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))
+SSE_REPLAY_SIZE = int(os.getenv("SSE_REPLAY_SIZE", "128"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Per-worker fan-out for SSE: every browser connected to this worker gets every event
+chart_events = Broadcaster("charts", SSE_QUEUE_SIZE, SSE_REPLAY_SIZE, SSE_HEARTBEAT_SECONDS)
+log_events = Broadcaster("logs", SSE_QUEUE_SIZE, SSE_REPLAY_SIZE, SSE_HEARTBEAT_SECONDS)
+# Pod status diffs; every stream starts from a fresh snapshot, so nothing to replay
+pod_events = Broadcaster("pods", SSE_QUEUE_SIZE, 0, SSE_HEARTBEAT_SECONDS)
 DB_DSN = os.getenv("DATABASE_URL", "postgresql://admin:admin@db:5432/metrics")
+EVENT_BUS_ENABLED = os.getenv("EVENT_BUS_ENABLED", "1") == "1"
 AP_SETUP_SCRIPT = os.getenv("AP_SETUP_SCRIPT", "/app/server/setup_wifi_ap.sh")
 AP_TEARDOWN_SCRIPT = os.getenv("AP_TEARDOWN_SCRIPT", "/app/server/teardown_wifi_ap.sh")
 AP_USE_SUDO = os.getenv("AP_USE_SUDO", "0") == "1"
@@ -31,24 +54,210 @@ ONLINE_THRESHOLD_SECONDS = int(os.getenv("POD_ONLINE_THRESHOLD_SECONDS", "120"))
 PODSERVER_HEALTH_HOST = os.getenv("PODSERVER_HEALTH_HOST", "server")
 PODSERVER_HEALTH_PORT = int(os.getenv("PODSERVER_HEALTH_PORT", "50051"))
 PODSERVER_HEALTH_TIMEOUT = float(os.getenv("PODSERVER_HEALTH_TIMEOUT", "1.0"))
+PODSERVER_HEALTH_INTERVAL = float(os.getenv("PODSERVER_HEALTH_INTERVAL", "5"))
 THRESH_LATENCY_MS = float(os.getenv("ALERT_LATENCY_MS", "150"))
 THRESH_JITTER_MS = float(os.getenv("ALERT_JITTER_MS", "40"))
 THRESH_LOSS_PCT = float(os.getenv("ALERT_PACKET_LOSS_PCT", "5"))
 THRESH_BANDWIDTH_MBPS = float(os.getenv("ALERT_MIN_BANDWIDTH_MBPS", "5"))
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+POD_SNAPSHOT_TTL_SECONDS = float(os.getenv("POD_SNAPSHOT_TTL_SECONDS", "2"))
+POD_STATUS_MIN_INTERVAL = float(os.getenv("POD_STATUS_MIN_INTERVAL", "0.5"))
+POD_STATUS_TICK_SECONDS = float(os.getenv("POD_STATUS_TICK_SECONDS", "5"))
+HOT_TIER_ENABLED = os.getenv("HOT_TIER_ENABLED", "1") == "1"
+HOT_TIER_CAPACITY = int(os.getenv("HOT_TIER_CAPACITY", "3600"))
+API_DEFAULT_POINTS = int(os.getenv("API_DEFAULT_POINTS", "1000"))
+API_MAX_POINTS = int(os.getenv("API_MAX_POINTS", "5000"))
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "1") == "1"
+ROLLUP_INTERVAL_SECONDS = float(os.getenv("ROLLUP_INTERVAL_SECONDS", "10"))
+RETENTION_RAW_DAYS = int(os.getenv("RETENTION_RAW_DAYS", "30"))
+RETENTION_MINUTE_DAYS = int(os.getenv("RETENTION_MINUTE_DAYS", "90"))
+METRIC_FIELDS = ("latency", "jitter", "packet_loss", "bandwidth")
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "4"))
+ANOMALY_EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", "0.05"))
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+COMPARE_MIN_INTERVAL = float(os.getenv("COMPARE_MIN_INTERVAL", "2"))
+CHART_NAMES = ("latency", "jitter", "packet_loss", "bandwidth")
+CHART_DIR = os.getenv("CHART_DIR", app.static_folder)
+
+db_pool = ConnectionPool(DB_DSN, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT)
+# Exports hold their own connection for as long as the download runs, outside the pool
+export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+# Hashed, precompressed chart SVGs and JSON bodies, each compressed once per version
+response_cache = ResponseCache()
+
+HTTP_SECONDS = REGISTRY.histogram(
+    "dashboard_http_request_seconds", "Time to produce a response (SSE: until the stream starts)",
+    ("endpoint", "status"))
+QUERY_SECONDS = REGISTRY.histogram(
+    "dashboard_db_query_seconds", "Database time per query, including the pool wait", ("query",))
+SNAPSHOT_SECONDS = REGISTRY.histogram(
+    "dashboard_pod_snapshot_seconds", "fetch_pod_snapshot time split by phase", ("phase",))
+EXPORT_ROWS = REGISTRY.counter(
+    "dashboard_export_rows_total", "Rows streamed by /api/export", ("format",))
+
+
+def _publish_anomaly(anomaly: dict):
+    # Every worker scores the same samples; the key lets the bus deliver this once
+    push_log(
+        f"anomaly: {anomaly['metric']}={anomaly['value']} (expected ~{anomaly['expected']}, "
+        f"z={anomaly['z']}, {anomaly['baseline']})",
+        level="warn",
+        source=anomaly["node_id"],
+        key=f"anomaly:{anomaly['node_id']}:{anomaly['metric']}:{anomaly['ts']}",
+        anomaly=anomaly,
+    )
+
+
+# Scores every sample the hot tier sees; new anomalies go out on the /logs stream
+anomaly_detector = AnomalyDetector(
+    alpha=ANOMALY_EWMA_ALPHA, threshold=ANOMALY_Z_THRESHOLD, on_anomaly=_publish_anomaly
+)
+
+
+def _on_hot_sample(node_id: str, ts: int, row: dict, live: bool):
+    # Live samples can change a pod's status or alerts; reloads only rebuild state
+    ts_ms = int(ts if ts > 1_000_000_000_000 else ts * 1000)
+    anomaly_detector.observe(node_id, ts_ms, row, emit=live)
+    comparison_cache.invalidate(ts_ms)
+    if live:
+        pod_tracker.poke()
+
+
+# Last HOT_TIER_CAPACITY samples per node, kept current via LISTEN/NOTIFY
+hot_tier = HotTier(
+    DB_DSN,
+    HOT_TIER_CAPACITY,
+    logger=app.logger,
+    on_sample=_on_hot_sample,
+)
+# Folds raw rows into 1 min / 1 h aggregates and applies retention; an advisory lock keeps
+# one writer across workers
+rollup_worker = RollupWorker(
+    DB_DSN,
+    ROLLUP_INTERVAL_SECONDS,
+    logger=app.logger,
+    raw_retention_days=RETENTION_RAW_DAYS,
+    minute_retention_days=RETENTION_MINUTE_DAYS,
+)
+# Reachability of the AP/server, used when podServer has not reported metrics yet
+health_prober = HealthProber(
+    {
+        "podServer": [
+            (h, PODSERVER_HEALTH_PORT)
+            for h in (PODSERVER_HEALTH_HOST, "localhost", "127.0.0.1", "server")
+            if h
+        ]
+    },
+    interval=PODSERVER_HEALTH_INTERVAL,
+    timeout=PODSERVER_HEALTH_TIMEOUT,
+    logger=app.logger,
+)
+# Carries /events and /logs between gunicorn workers over LISTEN/NOTIFY, so a publish
+# on any worker reaches every browser
+event_bus = EventBus(DB_DSN, enabled=EVENT_BUS_ENABLED, logger=app.logger)
+event_bus.attach(chart_events, on_event=lambda data: _on_chart_update())
+event_bus.attach(log_events)
+
+
+@app.before_request
+def _start_background_workers():
+    g.request_started = time.perf_counter()
+    health_prober.start()
+    if ROLLUP_ENABLED:
+        rollup_worker.start()
+    event_bus.start()
+
+
+@app.after_request
+def _record_request_time(response):
+    started = g.get("request_started")
+    if started is not None:
+        HTTP_SECONDS.observe(
+            time.perf_counter() - started, request.endpoint or "unmatched", str(response.status_code)
+        )
+    return response
+
+
+def _register_gauges():
+    REGISTRY.gauge(
+        "dashboard_db_pool", "Connection pool counters", ("stat",),
+        lambda: {(k,): v for k, v in db_pool.stats().items()},
+    )
+    REGISTRY.gauge(
+        "dashboard_sse_subscribers", "Connected SSE clients", ("stream",),
+        lambda: {("charts",): chart_events.stats()["subscribers"],
+                 ("logs",): log_events.stats()["subscribers"],
+                 ("pods",): pod_events.stats()["subscribers"]},
+    )
+    REGISTRY.gauge(
+        "dashboard_hot_tier_samples", "Samples held in memory per node", ("node_id",),
+        lambda: {(node,): n for node, n in hot_tier.stats()["samples"].items()},
+    )
+    REGISTRY.gauge(
+        "dashboard_pod_snapshot_cache", "Pod snapshot cache counters", ("stat",),
+        lambda: {(k,): v for k, v in pod_snapshot_cache.stats().items() if v is not None},
+    )
+
+
+def _load_chart(name: str):
+    return response_cache.load_file(f"chart:{name}", os.path.join(CHART_DIR, f"{name}.svg"), "image/svg+xml")
+
+
+def chart_urls() -> dict:
+    """Content-addressed URL of every chart chartgen has written so far."""
+    urls = {}
+    for name in CHART_NAMES:
+        entry = _load_chart(name)
+        if entry is not None:
+            urls[name] = f"/charts/{name}.{entry.digest}.svg"
+    return urls
+
+
+def cached_json(key: str, payload: dict) -> Response:
+    """JSON with an ETag; identical bodies share one cached, precompressed version."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return response_cache.respond(response_cache.put(key, body, "application/json"))
 
 
 @app.route("/")
 def index():
-    # Pass an initial cache-buster so first load gets the latest charts
-    return render_template("index.html", ts=int(time.time() * 1000))
+    # Charts that have not been rendered yet fall back to the static path
+    charts = {name: f"/static/{name}.svg" for name in CHART_NAMES}
+    charts.update(chart_urls())
+    return render_template("index.html", charts=charts)
 
 
-def event_stream():
-    """Generator that yields SSE events as they arrive."""
-    while True:
-        event = chart_event_queue.get()  # blocks until something is put()
-        app.logger.info("Sending SSE event: %s", event)
-        yield f"data: {event}\n\n"
+@app.route("/charts/<filename>")
+def chart_file(filename: str):
+    """
+    /charts/<name>.<hash>.svg is one version of a chart and never changes, so
+    browsers keep it for good; an unchanged chart keeps its URL and is not
+    fetched again. /charts/<name>.svg is whatever chartgen wrote last, with an
+    ETag to revalidate against. A hash that has already aged out redirects to
+    the current version.
+    """
+    parts = filename.split(".")
+    if len(parts) not in (2, 3) or parts[0] not in CHART_NAMES or parts[-1] != "svg":
+        return jsonify({"error": "not_found"}), 404
+    name = parts[0]
+    current = _load_chart(name)
+    if current is None:
+        return jsonify({"error": "not_rendered"}), 404
+    if len(parts) == 2:
+        return response_cache.respond(current)
+    entry = response_cache.version(f"chart:{name}", parts[1])
+    if entry is None:
+        return redirect(f"/charts/{name}.{current.digest}.svg", code=307)
+    return response_cache.respond(entry, IMMUTABLE)
+
+
+@app.route("/api/charts")
+def chart_manifest():
+    """Current chart URLs; polled by the page only while /events is down."""
+    return cached_json("charts", {"charts": chart_urls()})
 
 
 @app.route("/events")
@@ -61,39 +270,34 @@ def events():
         # Useful when placed behind a proxy like nginx
         "X-Accel-Buffering": "no",
     }
-    return Response(stream_with_context(event_stream()), headers=headers)
+    stream = chart_events.stream(request.headers.get("Last-Event-ID"))
+    return Response(stream_with_context(stream), headers=headers)
 
 
 @app.route("/event/chart-updated")
 def chart_updated():
     """Called by chartgen (C program via curl) when SVGs are regenerated."""
-    app.logger.info("chart_updated endpoint hit, enqueueing event")
-    try:
-        chart_event_queue.put_nowait("chart_update")
-    except Exception as e:
-        app.logger.exception("Failed to enqueue chart_update: %s", e)
+    app.logger.debug("chart_updated endpoint hit, publishing event")
+    # Every worker drops its pod snapshot when the event reaches it (see event_bus).
+    # The event names the new chart URLs, so browsers only fetch charts that changed
+    event_bus.publish("charts", json.dumps({"type": "chart_update", "charts": chart_urls()}))
     return "ok"
 
 
-def push_log(message: str, level: str = "info", source: str = "dashboard"):
-    """Push a structured log message into the SSE log queue."""
+def push_log(message: str, level: str = "info", source: str = "dashboard", key: Optional[str] = None,
+             **extra):
+    """
+    Publish a structured log message to every /logs subscriber on every worker.
+    Messages with the same key are delivered once.
+    """
     payload = {
         "message": message,
         "level": level,
         "source": source,
         "ts": int(time.time() * 1000),
+        **extra,
     }
-    try:
-        log_queue.put_nowait(payload)
-    except Exception as exc:
-        app.logger.error("Failed to enqueue log message: %s", exc)
-
-
-def log_stream():
-    """Generator that yields log SSE events."""
-    while True:
-        payload = log_queue.get()
-        yield f"data: {json.dumps(payload)}\n\n"
+    event_bus.publish("logs", json.dumps(payload), key=key)
 
 
 @app.route("/logs")
@@ -105,8 +309,11 @@ def logs():
         "Connection": "keep-alive",
         "X-Accel-Buffering": "no",
     }
-    push_log("Log stream connected", source="logs")
-    return Response(stream_with_context(log_stream()), headers=headers)
+    last_event_id = request.headers.get("Last-Event-ID")
+    if not last_event_id:
+        push_log("Log stream connected", source="logs")
+    stream = log_events.stream(last_event_id)
+    return Response(stream_with_context(stream), headers=headers)
 
 
 def _build_cmd(script_path: str):
@@ -158,37 +365,44 @@ def _normalize_timestamp(raw_ts):
     return raw_ts / 1000 if raw_ts > 1_000_000_000_000 else raw_ts
 
 
-def fetch_pod_snapshot():
-    """Return latest metrics per node along with online/offline status."""
+def _latest_rows():
+    """Latest sample per node: from the hot tier when it is loaded, else from Postgres."""
+    if HOT_TIER_ENABLED:
+        hot_tier.start()
+        if hot_tier.ready:
+            with SNAPSHOT_SECONDS.time("hot_tier"):
+                return list(hot_tier.latest_by_node().values())
+
+    # Index skip-scan over distinct nodes, then the newest row of each
     query = """
-        WITH latest AS (
-            SELECT node_id, MAX(timestamp) AS ts
-            FROM metrics
-            GROUP BY node_id
+        WITH RECURSIVE nodes AS (
+            (SELECT node_id FROM metrics ORDER BY node_id LIMIT 1)
+            UNION ALL
+            SELECT (SELECT m.node_id FROM metrics m WHERE m.node_id > n.node_id
+                    ORDER BY m.node_id LIMIT 1)
+            FROM nodes n WHERE n.node_id IS NOT NULL
         )
-        SELECT m.node_id, m.latency, m.jitter, m.packet_loss, m.bandwidth, m.timestamp
-        FROM metrics m
-        INNER JOIN latest l ON m.node_id = l.node_id AND m.timestamp = l.ts;
+        SELECT l.* FROM nodes n CROSS JOIN LATERAL (
+            SELECT node_id, latency, jitter, packet_loss, bandwidth, timestamp
+            FROM metrics m WHERE m.node_id = n.node_id
+            ORDER BY m.timestamp DESC LIMIT 1
+        ) l
+        WHERE n.node_id IS NOT NULL;
     """
-    with psycopg2.connect(DB_DSN) as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
+    with SNAPSHOT_SECONDS.time("db"), QUERY_SECONDS.time("latest_rows"):
+        with db_pool.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query)
+                return cur.fetchall()
+
 
+def fetch_pod_snapshot():
+    """Return latest metrics per node along with online/offline status."""
+    rows = _latest_rows()
+    build_started = time.perf_counter()
     now_sec = time.time()
     by_node = {row["node_id"]: row for row in rows}
 
-    def _check_tcp(hosts, port: int, timeout: float) -> bool:
-        for h in hosts:
-            if not h:
-                continue
-            try:
-                with socket.create_connection((h, port), timeout=timeout):
-                    return True
-            except OSError:
-                continue
-        return False
-
     def build_entry(node_id: str, label: str):
         row = by_node.get(node_id)
         last_seen_ms = None
@@ -216,18 +430,17 @@ def fetch_pod_snapshot():
                 alerts.append(f"Loss {metrics['packet_loss']:.1f}% > {THRESH_LOSS_PCT}%")
             if metrics["bandwidth"] < THRESH_BANDWIDTH_MBPS:
                 alerts.append(f"Bandwidth {metrics['bandwidth']:.1f} Mbps < {THRESH_BANDWIDTH_MBPS} Mbps")
+            for _, metric in anomaly_detector.active(node_id):
+                alerts.append(f"Unusual {metric.replace('_', ' ')} for this node and hour")
 
-        # Special-case podServer: if no metrics yet, consider AP/server reachable via TCP
+        # Special-case podServer: if no metrics yet, use the background prober's last TCP check
+        health = None
         if row is None and node_id == "podServer":
-            candidates = [
-                PODSERVER_HEALTH_HOST,
-                "localhost",
-                "127.0.0.1",
-                "server",
-            ]
-            if _check_tcp(candidates, PODSERVER_HEALTH_PORT, PODSERVER_HEALTH_TIMEOUT):
-                last_seen_ms = int(time.time() * 1000)
-                age = 0
+            health = health_prober.status(node_id)
+            fresh = health and now_sec - health["checked_at_ms"] / 1000 <= 3 * PODSERVER_HEALTH_INTERVAL
+            if fresh and health["reachable"]:
+                last_seen_ms = health["checked_at_ms"]
+                age = max(now_sec - last_seen_ms / 1000, 0)
                 status = "online"
 
         return {
@@ -238,6 +451,7 @@ def fetch_pod_snapshot():
             "age_seconds": age,
             "metrics": metrics,
             "alerts": alerts,
+            "health": health,
         }
 
     snapshot = [build_entry(node_id, label) for node_id, label in POD_LABELS.items()]
@@ -248,26 +462,311 @@ def fetch_pod_snapshot():
             continue
         snapshot.append(build_entry(node_id, node_id))
 
+    SNAPSHOT_SECONDS.observe(time.perf_counter() - build_started, "build")
     return snapshot
 
 
+def fetch_metric_range(nodes, from_ms: int, to_ms: int):
+    """
+    Return {node_id: float array of [ts_ms, latency, jitter, packet_loss, bandwidth]}
+    for samples in [from_ms, to_ms]. Timestamps are stored in ms, so the range
+    prunes to the matching daily partitions and scans their (node_id, timestamp) index.
+    """
+    where = "timestamp BETWEEN %(from_ms)s AND %(to_ms)s"
+    params = {"from_ms": from_ms, "to_ms": to_ms}
+    if nodes:
+        where += " AND node_id = ANY(%(nodes)s)"
+        params["nodes"] = list(nodes)
+    query = f"""
+        SELECT node_id, timestamp, {", ".join(METRIC_FIELDS)}
+        FROM metrics
+        WHERE {where}
+        ORDER BY node_id, timestamp;
+    """
+    with QUERY_SECONDS.time("metric_range"):
+        with db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+
+    series = {}
+    for node_id, group in itertools.groupby(rows, key=lambda r: r[0]):
+        series[node_id] = np.array([r[1:] for r in group], dtype=np.float64)
+    return series
+
+
+# Shared by every viewer; refreshed at most once per TTL or chart update. The load
+# time is kept with it so /api/pods returns the same body, and ETag, until then
+pod_snapshot_cache = TTLCache(
+    lambda: (fetch_pod_snapshot(), int(time.time() * 1000)), POD_SNAPSHOT_TTL_SECONDS
+)
+# Recomputes the snapshot when samples arrive and pushes only changed pods to /events/pods
+pod_tracker = PodStatusTracker(
+    fetch_pod_snapshot,
+    pod_events,
+    min_interval=POD_STATUS_MIN_INTERVAL,
+    tick_seconds=POD_STATUS_TICK_SECONDS,
+    extra=lambda: {"online_threshold_seconds": ONLINE_THRESHOLD_SECONDS},
+    logger=app.logger,
+)
+
+
+def _fetch_buckets(resolution_s: int, from_ms: int, to_ms: int):
+    with QUERY_SECONDS.time("compare_buckets"), db_pool.connection() as conn:
+        return load_buckets(conn, resolution_s, from_ms, to_ms)
+
+
+# Aligned node x bucket grids per (window, resolution); new samples re-query only their buckets
+comparison_cache = ComparisonCache(_fetch_buckets, COMPARE_MIN_INTERVAL)
+_register_gauges()
+
+
+def _on_chart_update():
+    pod_snapshot_cache.invalidate()
+    pod_tracker.poke()
+    comparison_cache.invalidate()
+
+
 @app.route("/api/pods")
 def pod_status():
     try:
-        pods = fetch_pod_snapshot()
+        pods, generated_at_ms = pod_snapshot_cache.get()
     except Exception as exc:
         app.logger.exception("pod_status query failed: %s", exc)
         return jsonify({"error": "db_error"}), 500
 
-    return jsonify(
+    return cached_json(
+        "pods",
         {
             "pods": pods,
-            "generated_at_ms": int(time.time() * 1000),
+            "generated_at_ms": generated_at_ms,
             "online_threshold_seconds": ONLINE_THRESHOLD_SECONDS,
+        },
+    )
+
+
+@app.route("/events/pods")
+def pod_events_stream():
+    """SSE: the pod snapshot on connect, then only the pods that changed."""
+    headers = {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+    }
+    try:
+        stream = pod_tracker.stream()
+    except Exception as exc:
+        app.logger.exception("pod status snapshot failed: %s", exc)
+        return jsonify({"error": "db_error"}), 500
+    return Response(stream_with_context(stream), headers=headers)
+
+
+@app.route("/api/metrics")
+def metrics_range():
+    """
+    Time-range query downsampled to a pixel budget:
+    /api/metrics?node=podOne,podTwo&from=<ms>&to=<ms>&points=800&method=lttb|minmax
+        &stat=mean|min|max|p50|p95|p99&tier=auto|raw|60|3600
+    Wide ranges are answered from the coarsest rollup tier whose buckets are no
+    wider than one point (stat picks the aggregate); narrow ones from raw rows.
+    Response is columnar: nodes -> metric -> {"t": [...ms], "v": [...]}.
+    """
+    now_ms = int(time.time() * 1000)
+    to_ms = request.args.get("to", default=now_ms, type=int)
+    from_ms = request.args.get("from", default=to_ms - 3600 * 1000, type=int)
+    points = min(max(request.args.get("points", default=API_DEFAULT_POINTS, type=int), 3), API_MAX_POINTS)
+    method = request.args.get("method", "lttb")
+    stat = request.args.get("stat", "mean")
+    tier = request.args.get("tier", "auto")
+    nodes = [n for n in request.args.get("node", "").split(",") if n]
+    wanted = request.args.get("metrics")
+    metrics = [m for m in wanted.split(",") if m in METRIC_FIELDS] if wanted else list(METRIC_FIELDS)
+    if from_ms >= to_ms or method not in ("lttb", "minmax") or not metrics or stat not in STATS:
+        return jsonify({"error": "bad_request"}), 400
+    if tier == "auto":
+        resolution = pick_resolution(from_ms, to_ms, points) if ROLLUP_ENABLED else 0
+    elif tier == "raw":
+        resolution = 0
+    elif tier in ("60", "3600"):
+        resolution = int(tier)
+    else:
+        return jsonify({"error": "bad_request"}), 400
+
+    try:
+        if resolution:
+            with QUERY_SECONDS.time("rollup_range"), db_pool.connection() as conn:
+                columns = fetch_rollup_range(conn, resolution, nodes, metrics, from_ms, to_ms, stat)
+        else:
+            columns = {}
+            for node_id, arr in fetch_metric_range(nodes, from_ms, to_ms).items():
+                columns[node_id] = {
+                    m: (arr[:, 0], arr[:, 1 + METRIC_FIELDS.index(m)]) for m in metrics
+                }
+    except Exception as exc:
+        app.logger.exception("metrics range query failed: %s", exc)
+        return jsonify({"error": "db_error"}), 500
+
+    out = {}
+    for node_id, by_metric in columns.items():
+        entry = {"raw_points": max(len(t) for t, _ in by_metric.values())}
+        for m, (t, y) in by_metric.items():
+            idx = downsample(t, y, points, method)
+            # NULL columns load as NaN, which jsonify would emit as bare (invalid) NaN
+            entry[m] = {"t": t[idx].astype(np.int64).tolist(), "v": _clean(y[idx])}
+        out[node_id] = entry
+
+    return jsonify(
+        {
+            "from": from_ms,
+            "to": to_ms,
+            "points": points,
+            "method": method,
+            "tier": resolution or "raw",
+            "stat": stat if resolution else "raw",
+            "nodes": out,
+        }
+    )
+
+
+@app.route("/api/recent")
+def recent_metrics():
+    """Recent samples for one node straight from the hot tier, as columnar JSON."""
+    node_id = request.args.get("node")
+    if not node_id:
+        return jsonify({"error": "node is required"}), 400
+    hot_tier.start()
+    if not hot_tier.ready:
+        return jsonify({"error": "hot_tier_loading"}), 503
+    since = request.args.get("since", type=int)
+    series = hot_tier.series(node_id, since)
+    if series is None:
+        return jsonify({"error": "unknown_node"}), 404
+    return jsonify({"node_id": node_id, "series": series})
+
+
+@app.route("/api/anomalies")
+def anomalies():
+    """Recent anomalies (newest last) and the node/metric pairs still out of bounds."""
+    hot_tier.start()
+    if not hot_tier.ready:
+        return jsonify({"error": "hot_tier_loading"}), 503
+    node_id = request.args.get("node")
+    since = request.args.get("since", type=int)
+    limit = min(max(request.args.get("limit", default=100, type=int), 1), 500)
+    return jsonify(
+        {
+            "anomalies": anomaly_detector.recent(node_id, since, limit),
+            "active": [
+                {"node_id": n, "metric": m} for n, m in anomaly_detector.active(node_id)
+            ],
+            "threshold_z": ANOMALY_Z_THRESHOLD,
         }
     )
 
 
+@app.route("/api/compare")
+def compare_nodes():
+    """
+    Node comparison over the last window, on series aligned to one resolution:
+    /api/compare?window=1h|24h|7d&resolution=60|300|900|3600
+    Per node and metric: sample mean and percentiles of the bucket means.
+    Between nodes: correlation matrices of latency and of packet loss, plus each
+    node's own latency/loss correlation. heatmap holds hour of day (local) x node
+    means per metric, weighted by samples, for comparing rooms over the day.
+    """
+    window_s = COMPARE_WINDOWS.get(request.args.get("window", "24h"))
+    resolution_s = request.args.get("resolution", default=300, type=int)
+    if window_s is None or resolution_s not in COMPARE_RESOLUTIONS:
+        return jsonify({"error": "bad_request"}), 400
+    try:
+        result = comparison_cache.get(window_s, resolution_s)
+    except Exception as exc:
+        app.logger.exception("comparison query failed: %s", exc)
+        return jsonify({"error": "db_error"}), 500
+    labels = {node_id: POD_LABELS.get(node_id, node_id) for node_id in result["nodes"]}
+    return cached_json(f"compare:{window_s}:{resolution_s}", {**result, "labels": labels})
+
+
+@app.route("/api/export")
+def export_metrics():
+    """
+    Bulk download of raw samples for offline analysis:
+    /api/export?from=<ms>&to=<ms>&node=podOne,podTwo&format=csv|ndjson&gzip=1
+    Rows are read from a server-side cursor EXPORT_CHUNK_ROWS at a time and
+    streamed as they arrive, so memory stays flat however long the range is.
+    At most EXPORT_MAX_CONCURRENT exports run at once; more get a 429.
+    """
+    now_ms = int(time.time() * 1000)
+    to_ms = request.args.get("to", default=now_ms, type=int)
+    from_ms = request.args.get("from", default=to_ms - 24 * 3600 * 1000, type=int)
+    nodes = [n for n in request.args.get("node", "").split(",") if n]
+    fmt = request.args.get("format", "csv")
+    compress = request.args.get("gzip", "0") == "1"
+    if from_ms >= to_ms or fmt not in FORMATS:
+        return jsonify({"error": "bad_request"}), 400
+
+    if not export_slots.acquire(blocking=False):
+        return jsonify({"error": "export_busy"}), 429
+    try:
+        conn = psycopg2.connect(DB_DSN, application_name="dashboard-export")
+        conn.set_session(readonly=True)
+    except Exception as exc:
+        export_slots.release()
+        app.logger.exception("export connection failed: %s", exc)
+        return jsonify({"error": "db_error"}), 500
+
+    def counted():
+        for rows in iter_rows(conn, nodes, from_ms, to_ms, EXPORT_CHUNK_ROWS):
+            EXPORT_ROWS.inc(fmt, amount=len(rows))
+            yield rows
+
+    body = (as_csv if fmt == "csv" else as_ndjson)(counted())
+    filename = f"metrics-{from_ms}-{to_ms}.{fmt}"
+    if compress:
+        body = gzipped(body)
+        filename += ".gz"
+    response = Response(
+        body,
+        content_type="application/gzip" if compress else FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+    # Runs when the download finishes or the client goes away mid-stream
+    def release():
+        conn.close()
+        export_slots.release()
+
+    response.call_on_close(release)
+    return response
+
+
+@app.route("/api/stats")
+def dashboard_stats():
+    """Connection pool, snapshot cache and SSE counters for this worker."""
+    return jsonify(
+        {
+            "db_pool": db_pool.stats(),
+            "pod_snapshot_cache": pod_snapshot_cache.stats(),
+            "pod_status": pod_tracker.stats(),
+            "hot_tier": hot_tier.stats(),
+            "rollup": rollup_worker.stats(),
+            "health": health_prober.stats(),
+            "anomalies": anomaly_detector.stats(),
+            "responses": response_cache.stats(),
+            "compare": comparison_cache.stats(),
+            "sse": {"charts": chart_events.stats(), "logs": log_events.stats(), "pods": pod_events.stats(),
+                    "bus": event_bus.stats()},
+        }
+    )
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: request/DB/snapshot timings and live gauges for this worker."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
 @app.route("/api/ap/start", methods=["POST"])
 def ap_start():
     _run_script_async("ap_start", AP_SETUP_SCRIPT)
@@ -0,0 +1,136 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Set, Tuple
+
+Event = Tuple[int, str]  # (event id, data)
+
+
+def format_sse(event_id: Optional[int], data: str) -> str:
+    """Render one SSE frame; multi-line data becomes multiple data: lines."""
+    lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+    if event_id is None:
+        return f"{lines}\n"
+    return f"id: {event_id}\n{lines}\n"
+
+
+class Subscription:
+    """Bounded per-subscriber queue. When full, the oldest event is dropped."""
+
+    def __init__(self, maxlen: int):
+        self.queue: Deque[Event] = deque(maxlen=maxlen)
+        self.dropped = 0
+        self._ready = threading.Event()
+
+    def push(self, event: Event):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self._ready.set()
+
+    def drain(self, timeout: float) -> List[Event]:
+        """Wait up to timeout for events, then return everything queued."""
+        if not self.queue:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        items = []
+        while self.queue:
+            items.append(self.queue.popleft())
+        return items
+
+
+class Broadcaster:
+    """
+    Fan-out pub/sub for SSE endpoints. Every subscriber gets every event.
+    A small ring of recent events lets a reconnecting EventSource catch up from
+    its Last-Event-ID. Idle streams emit heartbeat comments; writing one to a
+    closed connection ends the generator, which unsubscribes it.
+    """
+
+    def __init__(self, name: str, queue_size: int = 256, replay_size: int = 128,
+                 heartbeat_seconds: float = 15.0):
+        self.name = name
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._history: Deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._dropped_closed = 0
+        self.published = 0
+
+    def publish(self, data: str, event_id: Optional[int] = None) -> int:
+        """
+        Queue data for every current subscriber; never blocks on slow clients.
+        event_id is given when ids are assigned elsewhere (see bus.EventBus);
+        locally numbered events then continue after the highest id seen.
+        """
+        with self._lock:
+            if event_id is None:
+                event_id = self._next_id
+            self._next_id = max(self._next_id, event_id + 1)
+            event = (event_id, data)
+            self.published += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.push(event)
+        return event[0]
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(self.queue_size)
+        with self._lock:
+            if last_event_id:
+                try:
+                    last = int(last_event_id)
+                except ValueError:
+                    last = None
+                if last is not None:
+                    for event in self._history:
+                        if event[0] > last:
+                            sub.push(event)
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.discard(sub)
+                self._dropped_closed += sub.dropped
+
+    def stream(self, last_event_id: Optional[str] = None, subscription: Optional[Subscription] = None,
+               first: Optional[str] = None, resync: Optional[Callable[[], str]] = None) -> Iterator[str]:
+        """
+        Generator of SSE frames for one client connection. A subscription taken
+        earlier can be passed in, with data to send (without an id) ahead of
+        anything it has queued. With resync, a client that fell behind far
+        enough to lose events gets resync() in place of what was left queued.
+        """
+        sub = subscription or self.subscribe(last_event_id)
+        dropped = sub.dropped
+        try:
+            yield "retry: 3000\n\n"
+            if first is not None:
+                yield format_sse(None, first)
+            while True:
+                events = sub.drain(self.heartbeat_seconds)
+                if not events:
+                    yield ": heartbeat\n\n"
+                    continue
+                if resync is not None and sub.dropped != dropped:
+                    dropped = sub.dropped
+                    yield format_sse(None, resync())
+                    continue
+                for event_id, data in events:
+                    yield format_sse(event_id, data)
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            return {
+                "subscribers": len(subscribers),
+                "published": self.published,
+                "dropped": self._dropped_closed + sum(s.dropped for s in subscribers),
+                "last_event_id": self._next_id - 1,
+            }
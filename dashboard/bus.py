@@ -0,0 +1,185 @@
+import json
+import select
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Set, Tuple
+
+import psycopg2
+
+from broadcaster import Broadcaster
+
+CHANNEL_PREFIX = "dashboard_"
+EVENT_ID_SEQUENCE = "dashboard_event_id"  # see migrations.sql
+# NOTIFY payloads must stay under 8000 bytes; bigger events are delivered locally only
+MAX_PAYLOAD_BYTES = 7000
+
+
+class EventBus:
+    """
+    Cross-worker fan-out for the SSE broadcasters over Postgres LISTEN/NOTIFY.
+    publish() turns an event into a NOTIFY on the stream's channel; every
+    dashboard worker LISTENs on all channels and hands what arrives to its own
+    Broadcaster, so a browser sees every event whichever worker chartgen's curl
+    or a log line landed on. Event ids come from one sequence, which keeps
+    Last-Event-ID replay meaningful when a reconnect lands on another worker.
+
+    Events carrying the same key are delivered once: every worker scores the
+    same samples, so each raises the same anomaly. While Postgres is
+    unreachable (or with enabled false) events reach this worker's subscribers
+    only, numbered locally.
+    """
+
+    def __init__(self, dsn: str, enabled: bool = True, logger=None, dedupe_size: int = 1024):
+        self.dsn = dsn
+        self.enabled = enabled
+        self.logger = logger
+        self.listening = False
+        self.published = 0
+        self.received = 0
+        self.duplicates = 0
+        self.local_only = 0
+        self.reconnects = 0
+        self._streams: Dict[str, Tuple[Broadcaster, Optional[Callable[[str], None]]]] = {}
+        self._seen: Deque[str] = deque(maxlen=dedupe_size)
+        self._seen_set: Set[str] = set()
+        self._seen_lock = threading.Lock()
+        self._pub_conn = None
+        self._pub_lock = threading.Lock()
+        self._pub_retry_at = 0.0
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def _log(self, msg: str, *args):
+        if self.logger:
+            self.logger.warning(msg, *args)
+
+    def attach(self, broadcaster: Broadcaster, on_event: Optional[Callable[[str], None]] = None):
+        """Route the stream named broadcaster.name to broadcaster; on_event(data) runs per delivery."""
+        self._streams[broadcaster.name] = (broadcaster, on_event)
+
+    def start(self):
+        """Start the listener once per process."""
+        if not self.enabled:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="event-bus-listener", daemon=True).start()
+
+    def publish(self, stream: str, data: str, key: Optional[str] = None) -> Optional[int]:
+        """Send data to every subscriber of stream on every worker; returns the event id if known."""
+        if (self.enabled and time.monotonic() >= self._pub_retry_at
+                and len(json.dumps({"key": key, "data": data}).encode()) <= MAX_PAYLOAD_BYTES):
+            try:
+                event_id = self._notify(stream, data, key)
+            except psycopg2.Error as exc:
+                # Don't stall every log line on a dead database; try again in a bit
+                self._pub_retry_at = time.monotonic() + 5.0
+                self._log("event bus publish failed, delivering locally: %s", exc)
+            else:
+                self.published += 1
+                if not self.listening:
+                    # Our own listener is (re)connecting and may miss the notification
+                    self._deliver(stream, data, event_id, key)
+                return event_id
+        self.local_only += 1
+        return self._deliver(stream, data, None, key)
+
+    def _notify(self, stream: str, data: str, key: Optional[str]) -> int:
+        with self._pub_lock:
+            if self._pub_conn is None or self._pub_conn.closed:
+                self._pub_conn = psycopg2.connect(self.dsn)
+                self._pub_conn.autocommit = True
+            try:
+                with self._pub_conn.cursor() as cur:
+                    cur.execute(
+                        f"""
+                        WITH e AS (SELECT nextval('{EVENT_ID_SEQUENCE}') AS id)
+                        SELECT e.id, pg_notify(%s, json_build_object(
+                            'id', e.id, 'key', %s::text, 'data', %s::text)::text)
+                        FROM e
+                        """,
+                        (CHANNEL_PREFIX + stream, key, data),
+                    )
+                    return cur.fetchone()[0]
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._pub_conn.close()
+                raise
+
+    def _deliver(self, stream: str, data: str, event_id: Optional[int], key: Optional[str]) -> Optional[int]:
+        target = self._streams.get(stream)
+        if target is None:
+            return None
+        mark = key if key is not None else f"#{event_id}" if event_id is not None else None
+        if mark is not None:
+            with self._seen_lock:
+                if mark in self._seen_set:
+                    self.duplicates += 1
+                    return None
+                if len(self._seen) == self._seen.maxlen:
+                    self._seen_set.discard(self._seen[0])
+                self._seen.append(mark)
+                self._seen_set.add(mark)
+        broadcaster, on_event = target
+        event_id = broadcaster.publish(data, event_id)
+        if on_event is not None:
+            try:
+                on_event(data)
+            except Exception as exc:
+                self._log("event bus on_event for %s failed: %s", stream, exc)
+        return event_id
+
+    def _apply(self, channel: str, payload: str):
+        stream = channel[len(CHANNEL_PREFIX):]
+        try:
+            event = json.loads(payload)
+            event_id = int(event["id"])
+            data = event["data"]
+        except (ValueError, KeyError, TypeError):
+            return
+        self.received += 1
+        self._deliver(stream, data, event_id, event.get("key"))
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    for stream in self._streams:
+                        cur.execute(f"LISTEN {CHANNEL_PREFIX}{stream};")
+                self.listening = True
+                backoff = 1.0
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        # Idle: make sure the connection is still there
+                        with conn.cursor() as cur:
+                            cur.execute("SELECT 1")
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        self._apply(note.channel, note.payload)
+            except Exception as exc:
+                self.listening = False
+                self.reconnects += 1
+                self._log("event bus listener error: %s (retrying in %.0fs)", exc, backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "listening": self.listening,
+            "published": self.published,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "local_only": self.local_only,
+            "reconnects": self.reconnects,
+        }
@@ -0,0 +1,262 @@
+import threading
+import time
+import warnings
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+METRIC_FIELDS = ("latency", "jitter", "packet_loss", "bandwidth")
+CORRELATED = ("latency", "packet_loss")
+PERCENTILES = (50, 95, 99)
+WINDOWS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+RESOLUTIONS = (60, 300, 900, 3600)  # all divide an hour, so a bucket never spans two
+MIN_OVERLAP = 3  # buckets both series need before a correlation means anything
+
+
+def load_buckets(conn, resolution_s: int, from_ms: int, to_ms: int) -> List[tuple]:
+    """
+    Per-node, per-bucket sample counts and sums for [from_ms, to_ms):
+    (node_id, bucket_start, count, sum, ...) with one count/sum pair per metric.
+    Postgres does the grouping, so a week of 1 Hz samples comes back as one row
+    per node and bucket.
+    """
+    columns = ", ".join(f"count({m}), sum({m})" for m in METRIC_FIELDS)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT node_id, timestamp - timestamp %% %(res)s AS bucket, {columns}
+            FROM metrics
+            WHERE timestamp >= %(lo)s AND timestamp < %(hi)s AND node_id IS NOT NULL
+            GROUP BY 1, 2
+            """,
+            {"res": resolution_s * 1000, "lo": from_ms, "hi": to_ms},
+        )
+        return cur.fetchall()
+
+
+def pairwise_corr(x: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation between every pair of rows of x (nodes x buckets, NaN
+    where a node has no data), each pair over the buckets both rows have.
+    Undefined pairs (too little overlap, a flat series) are NaN.
+    """
+    mask = np.isfinite(x).astype(np.float64)
+    x0 = np.where(mask > 0, x, 0.0)
+    n = mask @ mask.T
+    sx = x0 @ mask.T  # sum of row i over the buckets shared with row j
+    sy = sx.T
+    sxx = (x0 * x0) @ mask.T
+    syy = sxx.T
+    sxy = x0 @ x0.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        r = cov / np.sqrt(var)
+    r[(n < MIN_OVERLAP) | ~(var > 1e-12)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def rowwise_corr(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Pearson correlation of x[i] with y[i] for each row, over buckets where both are finite."""
+    mask = np.isfinite(x) & np.isfinite(y)
+    n = mask.sum(axis=1)
+    x0, y0 = np.where(mask, x, 0.0), np.where(mask, y, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx, my = x0.sum(axis=1) / n, y0.sum(axis=1) / n
+        dx, dy = np.where(mask, x0 - mx[:, None], 0.0), np.where(mask, y0 - my[:, None], 0.0)
+        var = (dx * dx).sum(axis=1) * (dy * dy).sum(axis=1)
+        r = (dx * dy).sum(axis=1) / np.sqrt(var)
+    r[(n < MIN_OVERLAP) | ~(var > 1e-12)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def _clean(values: np.ndarray, digits: int = 3):
+    """Rounded nested lists with None in place of NaN, ready for JSON."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isfinite(values), values.round(digits), None).tolist()
+
+
+class Grid:
+    """
+    Aligned per-node series for one (window, resolution): sample counts and sums
+    per node, bucket and metric, covering the buckets of the last window_s
+    seconds up to and including the current, still filling, one.
+    """
+
+    def __init__(self, window_s: int, resolution_s: int):
+        self.res_ms = resolution_s * 1000
+        self.buckets = window_s // resolution_s
+        self.start_ms: Optional[int] = None
+        self.nodes: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.counts = np.zeros((0, self.buckets, len(METRIC_FIELDS)))
+        self.sums = np.zeros((0, self.buckets, len(METRIC_FIELDS)))
+        self.hours = np.zeros(self.buckets, dtype=np.int64)
+        self.loaded_to_ms = 0
+        self.dirty_from: Optional[int] = None
+        self.refreshed = 0.0
+        self.result: Optional[dict] = None
+        self.lock = threading.Lock()
+
+    def slide(self, start_ms: int):
+        """Move the window to start at start_ms, dropping buckets that fell out of it."""
+        shift = (start_ms - self.start_ms) // self.res_ms if self.start_ms is not None else self.buckets
+        if shift <= 0:
+            return
+        if shift >= self.buckets:
+            self.counts[:] = 0
+            self.sums[:] = 0
+            self.loaded_to_ms = start_ms
+        else:
+            for arr in (self.counts, self.sums):
+                arr[:, :-shift] = arr[:, shift:]
+                arr[:, -shift:] = 0
+            self.hours[:-shift] = self.hours[shift:]
+        first_new = max(self.buckets - shift, 0)
+        # Local time like the anomaly baselines, one lookup per new bucket
+        self.hours[first_new:] = [
+            time.localtime((start_ms + i * self.res_ms) / 1000).tm_hour
+            for i in range(first_new, self.buckets)
+        ]
+        self.start_ms = start_ms
+
+    def fill(self, from_ms: int, rows: Sequence[tuple]):
+        """Replace every bucket from from_ms on with rows from load_buckets."""
+        first = max((from_ms - self.start_ms) // self.res_ms, 0)
+        self.counts[:, first:] = 0
+        self.sums[:, first:] = 0
+        if not rows:
+            return
+        for node_id in {r[0] for r in rows} - self.index.keys():
+            self.index[node_id] = len(self.nodes)
+            self.nodes.append(node_id)
+        grow = len(self.nodes) - self.counts.shape[0]
+        if grow:
+            pad = np.zeros((grow,) + self.counts.shape[1:])
+            self.counts = np.concatenate([self.counts, pad])
+            self.sums = np.concatenate([self.sums, pad])
+
+        node_idx = np.fromiter((self.index[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+        values = np.array([r[1:] for r in rows], dtype=np.float64)  # sum() of no values is NULL -> nan
+        bucket_idx = ((values[:, 0] - self.start_ms) // self.res_ms).astype(np.int64)
+        keep = (bucket_idx >= first) & (bucket_idx < self.buckets)
+        node_idx, bucket_idx, values = node_idx[keep], bucket_idx[keep], values[keep]
+        self.counts[node_idx, bucket_idx] = values[:, 1::2]
+        self.sums[node_idx, bucket_idx] = np.nan_to_num(values[:, 2::2])
+
+    def compute(self) -> dict:
+        """Every statistic of the response in one pass over the grid."""
+        # Nodes with data in the window, by name, so the body only changes with the data
+        order = [i for i in sorted(range(len(self.nodes)), key=self.nodes.__getitem__)
+                 if self.counts[i].any()]
+        counts, sums = self.counts[order], self.sums[order]
+        nodes = [self.nodes[i] for i in order]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)  # nodes x buckets x metrics
+            overall = sums.sum(axis=1) / counts.sum(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN series give NaN
+            pct = np.nanpercentile(means, PERCENTILES, axis=1)
+
+        # Hour of day x node: sample-weighted means, via a one-hot bucket -> hour map
+        hour_of = np.eye(24)[self.hours]
+        heat_counts = np.einsum("ntm,th->nhm", counts, hour_of)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            heat = np.einsum("ntm,th->nhm", sums, hour_of) / heat_counts
+
+        stats = {}
+        for i, node_id in enumerate(nodes):
+            entry = {"coverage": round(float((counts[i].sum(axis=1) > 0).mean()), 3)}
+            for j, m in enumerate(METRIC_FIELDS):
+                entry[m] = {"mean": _clean(overall[i, j]), "samples": int(counts[i, :, j].sum()),
+                            **{f"p{p}": _clean(pct[k, i, j]) for k, p in enumerate(PERCENTILES)}}
+            stats[node_id] = entry
+        lat, loss = METRIC_FIELDS.index("latency"), METRIC_FIELDS.index("packet_loss")
+        return {
+            "from": self.start_ms,
+            "to": self.start_ms + self.buckets * self.res_ms,
+            "resolution_s": self.res_ms // 1000,
+            "nodes": nodes,
+            "stats": stats,
+            "correlation": {
+                m: _clean(pairwise_corr(means[:, :, METRIC_FIELDS.index(m)])) for m in CORRELATED
+            },
+            "latency_loss": dict(zip(nodes, _clean(rowwise_corr(means[:, :, lat], means[:, :, loss])))),
+            "heatmap": {
+                "hours": list(range(24)),
+                "samples": heat_counts[:, :, 0].astype(np.int64).tolist(),
+                **{m: _clean(heat[:, :, j]) for j, m in enumerate(METRIC_FIELDS)},
+            },
+        }
+
+
+class ComparisonCache:
+    """
+    Cross-node comparison of one window at one resolution, kept per (window,
+    resolution). The first request loads the window's buckets; later ones slide
+    the grid forward and re-query only from the oldest bucket new data landed in
+    (invalidate(ts_ms)) or, for the bucket still filling, from where the last
+    load stopped. Results are recomputed at most every min_interval seconds.
+    """
+
+    def __init__(self, loader: Callable[[int, int, int], List[tuple]], min_interval: float = 2.0):
+        self.loader = loader
+        self.min_interval = min_interval
+        self._grids: Dict[tuple, Grid] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.full_loads = 0
+        self.partial_loads = 0
+        self.bucket_rows = 0
+
+    def invalidate(self, ts_ms: Optional[int] = None):
+        """New data at ts_ms (None: somewhere after the last load)."""
+        with self._lock:
+            grids = list(self._grids.values())
+        for grid in grids:
+            mark = ts_ms if ts_ms is not None else grid.loaded_to_ms
+            if grid.dirty_from is None or mark < grid.dirty_from:
+                grid.dirty_from = mark
+
+    def get(self, window_s: int, resolution_s: int) -> dict:
+        with self._lock:
+            grid = self._grids.get((window_s, resolution_s))
+            if grid is None:
+                grid = self._grids[(window_s, resolution_s)] = Grid(window_s, resolution_s)
+        with grid.lock:
+            now_ms = int(time.time() * 1000)
+            start_ms = now_ms - now_ms % grid.res_ms - (grid.buckets - 1) * grid.res_ms
+            slid = grid.start_ms != start_ms
+            fresh = time.monotonic() - grid.refreshed < self.min_interval
+            if grid.result is not None and not slid and (grid.dirty_from is None or fresh):
+                self.hits += 1
+                return grid.result
+
+            full = grid.start_ms is None or start_ms - grid.start_ms >= grid.buckets * grid.res_ms
+            grid.slide(start_ms)
+            # The bucket the last load ended in was still filling
+            reload_from = grid.loaded_to_ms - grid.loaded_to_ms % grid.res_ms
+            if grid.dirty_from is not None:
+                reload_from = min(reload_from, grid.dirty_from - grid.dirty_from % grid.res_ms)
+            reload_from = start_ms if full else max(reload_from, start_ms)
+            grid.dirty_from = None
+            rows = self.loader(resolution_s, reload_from, now_ms + 1)
+            grid.fill(reload_from, rows)
+            grid.loaded_to_ms = now_ms
+            grid.refreshed = time.monotonic()
+            self.bucket_rows += len(rows)
+            if full:
+                self.full_loads += 1
+            else:
+                self.partial_loads += 1
+            grid.result = {**grid.compute(), "window_s": window_s, "generated_at_ms": now_ms}
+            return grid.result
+
+    def stats(self) -> dict:
+        return {
+            "grids": len(self._grids),
+            "hits": self.hits,
+            "full_loads": self.full_loads,
+            "partial_loads": self.partial_loads,
+            "bucket_rows": self.bucket_rows,
+        }
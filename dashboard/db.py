@@ -0,0 +1,163 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from telemetry import REGISTRY
+
+ACQUIRE_SECONDS = REGISTRY.histogram(
+    "dashboard_db_acquire_seconds", "Time spent waiting for a pooled DB connection")
+
+
+def make_psycopg_green():
+    """
+    Make psycopg2 cooperative under gevent. psycopg2 is a C extension, so
+    monkey-patching sockets does not reach it and every query would block the
+    whole worker; with this wait callback libpq runs non-blocking and the
+    greenlet waits in the gevent hub until the socket is ready, so other
+    requests and SSE streams keep being served while a query is in flight.
+    Call once per worker, after gevent has patched the process.
+    """
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import extensions
+
+    def wait(conn, timeout=None):
+        while True:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                return
+            if state == extensions.POLL_READ:
+                wait_read(conn.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(conn.fileno(), timeout=timeout)
+            else:
+                raise psycopg2.OperationalError(f"bad state from poll: {state}")
+
+    extensions.set_wait_callback(wait)
+
+
+class ConnectionPool:
+    """
+    Shared psycopg2 pool for the dashboard. Callers wait (up to acquire_timeout)
+    for a free connection instead of failing when the pool is exhausted, and
+    connections that errored are discarded rather than handed out again.
+    """
+
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 8, acquire_timeout: float = 5.0):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self._pool = None
+        self._init_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._stats_lock = threading.Lock()
+        self._stats = {"acquired": 0, "waited": 0, "timeouts": 0, "discarded": 0, "in_use": 0}
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        # Created lazily so importing the app never needs a reachable database
+        if self._pool is None:
+            with self._init_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
+        return self._pool
+
+    def _count(self, key: str, delta: int = 1):
+        with self._stats_lock:
+            self._stats[key] += delta
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success, rolls back on error."""
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            self._count("waited")
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                self._count("timeouts")
+                raise psycopg2.OperationalError("timed out waiting for a pooled DB connection")
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        ACQUIRE_SECONDS.observe(time.perf_counter() - started)
+        self._count("acquired")
+        self._count("in_use")
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            broken = broken or bool(conn.closed)
+            if broken:
+                self._count("discarded")
+            pool.putconn(conn, close=broken)
+            self._count("in_use", -1)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._stats, max=self.maxconn)
+
+
+class TTLCache:
+    """
+    Caches a single computed value for ttl seconds. Concurrent misses share one
+    load (the first caller computes, the rest wait for it), so N viewers cost one
+    query per refresh period. invalidate() forces the next get() to reload.
+    """
+
+    def __init__(self, loader, ttl: float):
+        self.loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self):
+        now = time.monotonic()
+        if now < self._expires:
+            self.hits += 1
+            return self._value
+        with self._lock:
+            # Another caller may have refreshed it while we waited for the lock
+            if time.monotonic() < self._expires:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            generation = self._generation
+            value = self.loader()
+            self._value = value
+            # Do not mark fresh if an invalidation happened during the load
+            if generation == self._generation:
+                self._expires = time.monotonic() + self.ttl
+            return value
+
+    def invalidate(self):
+        self._generation += 1
+        self._expires = 0.0
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 3) if total else None,
+            "ttl_seconds": self.ttl,
+        }
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets. Returns the indices of the n_out points that
+    best preserve the visual shape of (x, y). Bucket edges and the next-bucket
+    averages are computed up front with NumPy; only the choice of one point per
+    bucket (which depends on the previous choice) is a Python-level loop.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 interior buckets over x[1:-1]; the endpoints are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    starts = edges[:-1]
+    nonempty = counts > 0
+    sum_x = np.add.reduceat(x[1:-1], starts - 1)[: len(starts)]
+    sum_y = np.add.reduceat(y[1:-1], starts - 1)[: len(starts)]
+    safe = np.where(nonempty, counts, 1)
+    avg_x = np.where(nonempty, sum_x / safe, x[-1])
+    avg_y = np.where(nonempty, sum_y / safe, y[-1])
+    # The "next bucket" of the last interior bucket is the final point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if hi <= lo:
+            out[b + 1] = a
+            continue
+        ax, ay = x[a], y[a]
+        xs, ys = x[lo:hi], y[lo:hi]
+        area = np.abs((ax - next_x[b]) * (ys - ay) - (ax - xs) * (next_y[b] - ay))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return np.unique(out)
+
+
+def minmax(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max bucketing: keeps the smallest and largest sample of each of n_out / 2
+    equal-width buckets, so spikes survive. Fully vectorized.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    buckets = n_out // 2
+    size = -(-n // buckets)  # ceil
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+    valid = ~np.all(np.isnan(grid), axis=1)
+    base = np.arange(buckets) * size
+    lo = base + np.nanargmin(np.where(valid[:, None], grid, 0.0), axis=1)
+    hi = base + np.nanargmax(np.where(valid[:, None], grid, 0.0), axis=1)
+    idx = np.concatenate([lo[valid], hi[valid]])
+    return np.unique(idx[idx < n])
+
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int, method: str = "lttb") -> np.ndarray:
+    """Indices of the points to keep for a budget of n_out points."""
+    if method == "minmax":
+        return minmax(y, n_out)
+    return lttb(x, y, n_out)
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import uuid
+import zlib
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+COLUMNS = ("node_id", "timestamp", "latency", "jitter", "packet_loss", "bandwidth")
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_rows(conn, nodes: Optional[Sequence[str]], from_ms: int, to_ms: int,
+              chunk_rows: int = 5000) -> Iterator[List[tuple]]:
+    """
+    Yield metrics rows in [from_ms, to_ms] as lists of at most chunk_rows,
+    ordered by node and time. Rows come from a named (server-side) cursor, so
+    only one chunk is ever held in memory. The (node_id, timestamp) index of
+    each daily partition already returns rows in that order, so Postgres merges
+    them without sorting the whole range either.
+    """
+    where = "timestamp BETWEEN %(from_ms)s AND %(to_ms)s"
+    params = {"from_ms": from_ms, "to_ms": to_ms}
+    if nodes:
+        where += " AND node_id = ANY(%(nodes)s)"
+        params["nodes"] = list(nodes)
+    query = f"""
+        SELECT {", ".join(COLUMNS)}
+        FROM metrics
+        WHERE {where}
+        ORDER BY node_id, timestamp;
+    """
+    with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+        cur.itersize = chunk_rows
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+    conn.rollback()
+
+
+def as_csv(chunks: Iterable[List[tuple]]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+
+def as_ndjson(chunks: Iterable[List[tuple]]) -> Iterator[str]:
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(COLUMNS, row)), separators=(",", ":")) + "\n" for row in rows)
+
+
+def gzipped(parts: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Compress a text stream into one gzip member, yielding compressed bytes as they fill up."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for part in parts:
+        data = compressor.compress(part.encode())
+        if data:
+            yield data
+    yield compressor.flush()
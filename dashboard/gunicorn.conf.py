@@ -0,0 +1,26 @@
+# gunicorn -c gunicorn.conf.py app:app
+#
+# gevent workers: every request, and every idle SSE subscriber, is a greenlet
+# rather than an OS thread, so hundreds of open /events and /logs tabs cost a
+# few KB each and never tie up a worker. DB calls yield to the hub too (see
+# db.make_psycopg_green), so /api/pods is not stuck behind a slow query.
+# One worker by default. Each worker process runs its own hot tier, anomaly
+# detector, rollups, compare cache and /metrics registry, so extra workers
+# (DASHBOARD_WORKERS) multiply that DB load and report per-process numbers.
+# SSE events still reach browsers on every worker through the LISTEN/NOTIFY
+# bus (bus.py).
+import os
+
+bind = os.getenv("DASHBOARD_BIND", "0.0.0.0:8080")
+worker_class = "gevent"
+workers = int(os.getenv("DASHBOARD_WORKERS", "1"))
+worker_connections = int(os.getenv("DASHBOARD_WORKER_CONNECTIONS", "1000"))
+timeout = 120
+# telemetry.py lives in client/; the image copies it next to app.py instead
+pythonpath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client")
+
+
+def post_worker_init(worker):
+    import db
+
+    db.make_psycopg_green()
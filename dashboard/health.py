@@ -0,0 +1,88 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Endpoint = Tuple[str, int]  # (host, port)
+
+
+def check_tcp(host: str, port: int, timeout: float) -> Optional[float]:
+    """Return the TCP connect time in ms, or None if the endpoint is unreachable."""
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return (time.perf_counter() - started) * 1000
+    except OSError:
+        return None
+
+
+class HealthProber:
+    """
+    Checks named targets on a background thread so request handlers never block on
+    the network. A target is a list of candidate endpoints; all candidates of all
+    targets are dialled concurrently each round, and the target counts as
+    reachable if any of them accepts a connection (the fastest one is reported).
+    """
+
+    def __init__(self, targets: Dict[str, Sequence[Endpoint]], interval: float = 5.0,
+                 timeout: float = 1.0, logger=None):
+        self.targets = {name: list(dict.fromkeys(eps)) for name, eps in targets.items()}
+        self.interval = interval
+        self.timeout = timeout
+        self.logger = logger
+        self.rounds = 0
+        self._results: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="health-prober", daemon=True).start()
+
+    def _run(self):
+        endpoints = sorted({ep for eps in self.targets.values() for ep in eps})
+        with ThreadPoolExecutor(max_workers=max(len(endpoints), 1),
+                                thread_name_prefix="health-check") as pool:
+            while True:
+                started = time.monotonic()
+                try:
+                    self.probe_once(pool, endpoints)
+                except Exception as exc:
+                    if self.logger:
+                        self.logger.warning("health prober error: %s", exc)
+                time.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    def probe_once(self, pool: ThreadPoolExecutor, endpoints: List[Endpoint]):
+        futures = {ep: pool.submit(check_tcp, ep[0], ep[1], self.timeout) for ep in endpoints}
+        rtts = {ep: f.result() for ep, f in futures.items()}
+        checked_at_ms = int(time.time() * 1000)
+
+        results = {}
+        for name, eps in self.targets.items():
+            up = [(rtts[ep], ep) for ep in eps if rtts[ep] is not None]
+            best = min(up) if up else None
+            results[name] = {
+                "reachable": best is not None,
+                "rtt_ms": round(best[0], 2) if best else None,
+                "endpoint": f"{best[1][0]}:{best[1][1]}" if best else None,
+                "checked_at_ms": checked_at_ms,
+            }
+        with self._lock:
+            self._results = results
+        self.rounds += 1
+
+    def status(self, name: str) -> Optional[dict]:
+        """Last result for name, or None before the first round has finished."""
+        with self._lock:
+            result = self._results.get(name)
+            return dict(result) if result else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            results = {name: dict(r) for name, r in self._results.items()}
+        return {"rounds": self.rounds, "interval_seconds": self.interval, "targets": results}
@@ -0,0 +1,223 @@
+import json
+import select
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+NOTIFY_CHANNEL = "metrics_insert"
+FIELDS = ("latency", "jitter", "packet_loss", "bandwidth")
+
+
+class NodeRing:
+    """Fixed-capacity, column-oriented ring of the newest samples for one node."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array("q", [0] * capacity)
+        self.columns = {f: array("d", [0.0] * capacity) for f in FIELDS}
+        self.count = 0
+        self.head = 0  # next write position
+        self.latest_index = -1
+
+    def append(self, ts: int, values: Dict[str, float]):
+        i = self.head
+        overwrote_latest = self.latest_index == i
+        self.timestamps[i] = ts
+        for f in FIELDS:
+            self.columns[f][i] = float(values[f] or 0.0)
+        # Replayed backlog can arrive out of order; "latest" follows the newest timestamp
+        if overwrote_latest:
+            self.latest_index = max(range(self.capacity), key=self.timestamps.__getitem__)
+        elif self.latest_index < 0 or ts >= self.timestamps[self.latest_index]:
+            self.latest_index = i
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> Optional[dict]:
+        if self.count == 0:
+            return None
+        i = self.latest_index
+        row = {f: self.columns[f][i] for f in FIELDS}
+        row["timestamp"] = self.timestamps[i]
+        return row
+
+    def _order(self) -> List[int]:
+        start = (self.head - self.count) % self.capacity
+        return [(start + k) % self.capacity for k in range(self.count)]
+
+    def series(self, since: Optional[int] = None) -> Dict[str, list]:
+        """Columnar copy of the ring in arrival order, optionally only ts >= since."""
+        idx = self._order()
+        if since is not None:
+            idx = [i for i in idx if self.timestamps[i] >= since]
+        out = {"timestamp": [self.timestamps[i] for i in idx]}
+        for f in FIELDS:
+            col = self.columns[f]
+            out[f] = [col[i] for i in idx]
+        return out
+
+
+class HotTier:
+    """
+    Keeps the last `capacity` samples per node in memory. Loaded once from Postgres,
+    then kept current by the metrics_insert NOTIFY trigger (see migrations.sql) on
+    a dedicated LISTEN connection. If the listener drops it reconnects and reloads,
+    so no inserts are missed across the gap.
+
+    on_sample(node_id, ts, row, live) is called for every row: live=False for
+    rows from a (re)load, True for rows that arrived by notification.
+    """
+
+    def __init__(self, dsn: str, capacity: int = 3600, logger=None,
+                 on_sample: Optional[Callable[[str, int, dict, bool], None]] = None):
+        self.dsn = dsn
+        self.capacity = capacity
+        self.logger = logger
+        self.on_sample = on_sample
+        self.ready = False
+        self.notifications = 0
+        self.reloads = 0
+        self._rings: Dict[str, NodeRing] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def _log(self, msg: str, *args):
+        if self.logger:
+            self.logger.warning(msg, *args)
+
+    def start(self):
+        """Start the background loader/listener once per process."""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="hot-tier-listener", daemon=True).start()
+
+    def _load(self, conn) -> Dict[str, int]:
+        """Replace the rings with each node's newest rows; returns the newest timestamp per node."""
+        # Skip-scan the distinct nodes, then read each node's newest rows off the
+        # (node_id, timestamp) index instead of ranking the whole table
+        query = """
+            WITH RECURSIVE nodes AS (
+                (SELECT node_id FROM metrics ORDER BY node_id LIMIT 1)
+                UNION ALL
+                SELECT (SELECT m.node_id FROM metrics m WHERE m.node_id > n.node_id
+                        ORDER BY m.node_id LIMIT 1)
+                FROM nodes n WHERE n.node_id IS NOT NULL
+            )
+            SELECT r.* FROM nodes n CROSS JOIN LATERAL (
+                SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth
+                FROM metrics m WHERE m.node_id = n.node_id
+                ORDER BY m.timestamp DESC LIMIT %s
+            ) r
+            WHERE n.node_id IS NOT NULL
+            ORDER BY r.timestamp ASC;
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (self.capacity,))
+            rows = cur.fetchall()
+        rings: Dict[str, NodeRing] = {}
+        for row in rows:
+            ring = rings.get(row["node_id"])
+            if ring is None:
+                ring = rings[row["node_id"]] = NodeRing(self.capacity)
+            ring.append(int(row["timestamp"]), row)
+        with self._lock:
+            self._rings = rings
+        self.reloads += 1
+        self.ready = True
+        for row in rows:
+            self._notify(row["node_id"], int(row["timestamp"]), row, False)
+        return {node_id: ring.latest()["timestamp"] for node_id, ring in rings.items()}
+
+    def _notify(self, node_id: str, ts: int, row: dict, live: bool):
+        if self.on_sample is None:
+            return
+        try:
+            self.on_sample(node_id, ts, row, live)
+        except Exception as exc:
+            self._log("hot tier on_sample failed: %s", exc)
+
+    def _apply(self, payload: str, skip_through: Optional[Dict[str, int]] = None):
+        try:
+            row = json.loads(payload)
+            node_id = row["node_id"]
+            ts = int(row["timestamp"])
+        except (ValueError, KeyError, TypeError):
+            return
+        if skip_through is not None and ts <= skip_through.get(node_id, -1):
+            return
+        with self._lock:
+            ring = self._rings.get(node_id)
+            if ring is None:
+                ring = self._rings[node_id] = NodeRing(self.capacity)
+            ring.append(ts, row)
+        self.notifications += 1
+        self._notify(node_id, ts, row, True)
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+                # LISTEN first, then load: nothing inserted in between is missed. Rows
+                # committed before the load's snapshot are in both, and their notifications
+                # are already queued on conn; skip those, the load has them.
+                newest = self._load(conn)
+                conn.poll()
+                while conn.notifies:
+                    self._apply(conn.notifies.pop(0).payload, skip_through=newest)
+                backoff = 1.0
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._apply(conn.notifies.pop(0).payload)
+            except Exception as exc:
+                self.ready = False
+                self._log("hot tier listener error: %s (retrying in %.0fs)", exc, backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def latest_by_node(self) -> Dict[str, dict]:
+        out = {}
+        with self._lock:
+            for node_id, ring in self._rings.items():
+                row = ring.latest()
+                if row is not None:
+                    row["node_id"] = node_id
+                    out[node_id] = row
+        return out
+
+    def series(self, node_id: str, since: Optional[int] = None) -> Optional[Dict[str, list]]:
+        with self._lock:
+            ring = self._rings.get(node_id)
+            return ring.series(since) if ring is not None else None
+
+    def nodes(self) -> List[str]:
+        with self._lock:
+            return list(self._rings)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = {node: ring.count for node, ring in self._rings.items()}
+        return {
+            "ready": self.ready,
+            "capacity_per_node": self.capacity,
+            "samples": sizes,
+            "notifications": self.notifications,
+            "reloads": self.reloads,
+        }
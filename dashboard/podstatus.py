@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from broadcaster import Broadcaster
+
+# Left out when deciding whether a pod changed: age grows every second (the
+# browser derives it from last_seen_ms), and a health probe's time and RTT change
+# every round even when the outcome does not
+VOLATILE_FIELDS = ("age_seconds",)
+VOLATILE_HEALTH_FIELDS = ("checked_at_ms", "rtt_ms")
+
+
+def _comparable(entry: dict) -> dict:
+    out = {k: v for k, v in entry.items() if k not in VOLATILE_FIELDS}
+    if out.get("health"):
+        out["health"] = {k: v for k, v in out["health"].items() if k not in VOLATILE_HEALTH_FIELDS}
+    return out
+
+
+class PodStatusTracker:
+    """
+    Computes the pod snapshot once per change instead of once per open tab, and
+    pushes only the pods whose entry changed (status transition, new sample,
+    alert raised or cleared) to the /events/pods SSE stream.
+
+    A refresh is requested with poke() when a sample or chart update arrives and
+    happens at most every min_interval seconds; the tick catches transitions that
+    need no new data, like online -> stale. Nothing is computed while no browser
+    is connected. Every stream starts with the full snapshot and its version;
+    diffs carry consecutive versions, so one taken before the snapshot is ignored
+    and a missing one shows. A stream whose queue overflowed gets a new snapshot.
+    """
+
+    def __init__(self, loader: Callable[[], List[dict]], events: Broadcaster,
+                 min_interval: float = 0.5, tick_seconds: float = 5.0,
+                 extra: Optional[Callable[[], dict]] = None, logger=None):
+        self.loader = loader
+        self.events = events
+        self.min_interval = min_interval
+        self.tick_seconds = tick_seconds
+        self.extra = extra
+        self.logger = logger
+        self.version = 0
+        self.refreshes = 0
+        self.diffs = 0
+        self._pods: Dict[str, dict] = {}
+        self._generated_at_ms: Optional[int] = None
+        self._refreshed = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # one load at a time, applied in order
+        self._dirty = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="pod-status", daemon=True).start()
+
+    def poke(self):
+        """Something changed; refresh soon if anyone is watching."""
+        self._dirty.set()
+
+    def _run(self):
+        while True:
+            self._dirty.wait(self.tick_seconds)
+            self._dirty.clear()
+            if self.events.stats()["subscribers"]:
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    if self.logger:
+                        self.logger.warning("pod status refresh failed: %s", exc)
+            time.sleep(self.min_interval)
+
+    def _message(self, kind: str, **fields) -> str:
+        payload = {"type": kind, "version": self.version, "generated_at_ms": self._generated_at_ms}
+        if self.extra is not None:
+            payload.update(self.extra())
+        payload.update(fields)
+        return json.dumps(payload)
+
+    def refresh(self) -> int:
+        """Reload the snapshot and publish what changed; returns the number of changed pods."""
+        with self._refresh_lock:
+            pods = self.loader()
+            return self._apply(pods)
+
+    def _apply(self, pods: List[dict]) -> int:
+        with self._lock:
+            self.refreshes += 1
+            self._refreshed = time.monotonic()
+            self._generated_at_ms = int(time.time() * 1000)
+            current = {p["node_id"]: p for p in pods}
+            changed = [p for node_id, p in current.items()
+                       if node_id not in self._pods or _comparable(self._pods[node_id]) != _comparable(p)]
+            removed = [node_id for node_id in self._pods if node_id not in current]
+            self._pods = current
+            if not changed and not removed:
+                return 0
+            self.version += 1
+            self.diffs += 1
+            # Published under the lock so a stream opening now sees either the
+            # old snapshot plus this diff, or the new snapshot without it
+            self.events.publish(self._message("diff", changed=changed, removed=removed))
+        return len(changed) + len(removed)
+
+    def stream(self) -> Iterator[str]:
+        """SSE frames for one browser: the current snapshot, then diffs."""
+        self.start()
+        if time.monotonic() - self._refreshed > self.tick_seconds:
+            # Nobody was watching, so the snapshot is old; bring it up to date first
+            self.refresh()
+        with self._lock:
+            sub = self.events.subscribe()
+            first = self._snapshot()
+        return self.events.stream(subscription=sub, first=first, resync=self._resync)
+
+    def _snapshot(self) -> str:
+        return self._message("snapshot", pods=list(self._pods.values()))
+
+    def _resync(self) -> str:
+        # Diffs still queued behind this are at most its version and get ignored
+        with self._lock:
+            return self._snapshot()
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "refreshes": self.refreshes,
+            "diffs": self.diffs,
+            "pods": len(self._pods),
+            "subscribers": self.events.stats()["subscribers"],
+        }
@@ -0,0 +1,148 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional: without it clients get gzip
+    brotli = None
+
+# Compressing a few hundred bytes saves nothing worth a header
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class CachedBody:
+    """
+    One version of a response body, named by its content hash. Each encoding is
+    compressed the first time a client asks for it and kept, so a body costs at
+    most one gzip and one brotli run however often it is served.
+    """
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self._encoded: Dict[str, bytes] = {"identity": body}
+        self._lock = threading.Lock()
+        self.compressions = 0
+
+    def encodings(self) -> Tuple[str, ...]:
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return ()
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def encoded(self, encoding: str) -> bytes:
+        data = self._encoded.get(encoding)
+        if data is not None:
+            return data
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == "br":
+                    self._encoded[encoding] = brotli.compress(self.body, quality=9)
+                else:
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=9, mtime=0)
+                self.compressions += 1
+            return self._encoded[encoding]
+
+
+class ResponseCache:
+    """
+    Content-addressed bodies for the chart SVGs and the polled JSON endpoints.
+    Every key keeps its last few versions, so a hashed chart URL handed out just
+    before chartgen rewrote the file still resolves. Putting bytes that match a
+    version already held reuses it, compressed encodings included.
+    """
+
+    def __init__(self, history: int = 3):
+        self.history = history
+        self._versions: Dict[str, Deque[CachedBody]] = {}
+        self._files: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.compressions = 0
+        self.served = 0
+        self.bytes_sent = 0
+        self.bytes_raw = 0
+
+    def put(self, key: str, body: bytes, content_type: str) -> CachedBody:
+        entry = CachedBody(body, content_type)
+        with self._lock:
+            versions = self._versions.setdefault(key, deque(maxlen=self.history))
+            for held in versions:
+                if held.digest == entry.digest:
+                    versions.remove(held)
+                    versions.append(held)
+                    return held
+            versions.append(entry)
+            return entry
+
+    def current(self, key: str) -> Optional[CachedBody]:
+        versions = self._versions.get(key)
+        return versions[-1] if versions else None
+
+    def version(self, key: str, digest: str) -> Optional[CachedBody]:
+        for held in list(self._versions.get(key, ())):
+            if held.digest == digest:
+                return held
+        return None
+
+    def load_file(self, key: str, path: str, content_type: str) -> Optional[CachedBody]:
+        """Current version of a file; only read again once its inode, size or mtime change."""
+        try:
+            with open(path, "rb") as fh:
+                st = os.fstat(fh.fileno())
+                signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+                if self._files.get(key) == signature:
+                    return self.current(key)
+                body = fh.read()
+        except FileNotFoundError:
+            return None
+        entry = self.put(key, body, content_type)
+        self._files[key] = signature
+        return entry
+
+    def respond(self, entry: CachedBody, cache_control: str = REVALIDATE) -> Response:
+        """
+        Serve entry for the current request: 304 when If-None-Match has its
+        hash, else the best encoding the client accepts. The ETag is weak
+        because every encoding of a version carries the same one.
+        """
+        if request.if_none_match.contains_weak(entry.digest):
+            self.not_modified += 1
+            response = Response(status=304)
+        else:
+            encoding = request.accept_encodings.best_match(entry.encodings(), default="identity")
+            before = entry.compressions
+            body = entry.encoded(encoding)
+            self.compressions += entry.compressions - before
+            self.served += 1
+            self.bytes_sent += len(body)
+            self.bytes_raw += len(entry.body)
+            response = Response(body, content_type=entry.content_type)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(entry.digest, weak=True)
+        response.headers["Cache-Control"] = cache_control
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = [e for versions in self._versions.values() for e in versions]
+        return {
+            "keys": len(self._versions),
+            "versions": len(entries),
+            "compressions": self.compressions,
+            "served": self.served,
+            "not_modified": self.not_modified,
+            "bytes_sent": self.bytes_sent,
+            "bytes_raw": self.bytes_raw,
+            "brotli": brotli is not None,
+        }
@@ -0,0 +1,372 @@
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+METRIC_FIELDS = ("latency", "jitter", "packet_loss", "bandwidth")
+RESOLUTIONS = (60, 3600)  # seconds: 1 minute and 1 hour tiers
+STATS = ("mean", "min", "max", "p50", "p95", "p99")
+ADVISORY_LOCK_KEY = 4377_0001  # one rollup writer across all dashboard workers
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style) for non-negative values with a
+    fixed relative accuracy. Two sketches merge by adding bucket counts, so
+    partial aggregates can be folded into existing buckets in any order.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.alpha = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.bins: Dict[int, int] = {}
+
+    def add_many(self, values: np.ndarray):
+        values = values[np.isfinite(values)]
+        positive = values[values > 0]
+        self.zero_count += int(len(values) - len(positive))
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                     return_counts=True)
+            for k, c in zip(keys.tolist(), counts.tolist()):
+                self.bins[k] = self.bins.get(k, 0) + c
+
+    def merge(self, other: "QuantileSketch"):
+        self.zero_count += other.zero_count
+        for k, c in other.bins.items():
+            self.bins[k] = self.bins.get(k, 0) + c
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if rank < seen:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_json(self) -> str:
+        return json.dumps({"a": self.alpha, "z": self.zero_count, "b": self.bins})
+
+    @classmethod
+    def from_json(cls, raw) -> "QuantileSketch":
+        data = json.loads(raw) if isinstance(raw, str) else raw
+        sketch = cls(data.get("a", 0.01))
+        sketch.zero_count = int(data.get("z", 0))
+        sketch.bins = {int(k): int(v) for k, v in data.get("b", {}).items()}
+        return sketch
+
+
+class Aggregate:
+    """count/min/max/sum plus a quantile sketch for one (resolution, node, metric, bucket)."""
+
+    def __init__(self):
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.sketch = QuantileSketch()
+
+    def add_many(self, values: np.ndarray):
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.count += int(len(values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sum += float(values.sum())
+        self.sketch.add_many(values)
+
+    def merge_row(self, count, vmin, vmax, vsum, sketch_json):
+        self.count += count
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+        self.sum += vsum
+        self.sketch.merge(QuantileSketch.from_json(sketch_json))
+
+    def row(self) -> tuple:
+        return (
+            self.count, self.min, self.max, self.sum, self.sum / self.count,
+            self.sketch.quantile(0.50), self.sketch.quantile(0.95), self.sketch.quantile(0.99),
+            self.sketch.to_json(),
+        )
+
+
+Key = Tuple[int, str, str, int]  # (resolution_s, node_id, metric, bucket_start_ms)
+
+
+class RollupWorker:
+    """
+    Incrementally folds new raw rows into metrics_rollup (1 min and 1 h buckets).
+
+    Progress is tracked by a watermark on metrics.id in rollup_state, advanced in
+    the same transaction as the rollup rows, so no row is ever folded twice. Each
+    pass only reads ids up to the highest id seen on the previous pass, which
+    gives in-flight ingest transactions (whose lower ids may commit late) one
+    full interval to land. Late-arriving samples (e.g. a pod replaying its spool)
+    are merged into existing buckets because every stored column is mergeable.
+    """
+
+    def __init__(self, dsn: str, interval: float = 10.0, batch_rows: int = 50000, logger=None,
+                 raw_retention_days: int = 30, minute_retention_days: int = 90,
+                 maintenance_interval: float = 600.0):
+        self.dsn = dsn
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self.logger = logger
+        self.raw_retention_days = raw_retention_days
+        self.minute_retention_days = minute_retention_days
+        self.maintenance_interval = maintenance_interval
+        self.dropped_partitions: List[str] = []
+        self._last_maintenance = 0.0
+        self.rows_folded = 0
+        self.passes = 0
+        self.last_pass_ms: Optional[float] = None
+        self._settled_id: Optional[int] = None
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="rollup-worker", daemon=True).start()
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                # Not `with connect()`: that only ends a transaction, and each pass has its own
+                conn = psycopg2.connect(self.dsn)
+                while True:
+                    # Drain a backlog in consecutive batches, then wait for new rows
+                    while self.run_once(conn) >= self.batch_rows:
+                        pass
+                    if time.monotonic() - self._last_maintenance >= self.maintenance_interval:
+                        self.maintain(conn)
+                    time.sleep(self.interval)
+            except Exception as exc:
+                if self.logger:
+                    self.logger.warning("rollup worker error: %s", exc)
+                time.sleep(self.interval)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def run_once(self, conn) -> int:
+        """One incremental pass. Returns the number of raw rows folded."""
+        started = time.perf_counter()
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (ADVISORY_LOCK_KEY,))
+                if not cur.fetchone()[0]:
+                    return 0
+                cur.execute("SELECT last_id FROM rollup_state WHERE name = 'metrics' FOR UPDATE")
+                row = cur.fetchone()
+                last_id = row[0] if row else 0
+
+                cur.execute("SELECT COALESCE(MAX(id), 0) FROM metrics")
+                max_id = cur.fetchone()[0]
+                settled = self._settled_id if self._settled_id is not None else last_id
+                self._settled_id = max_id
+                upper = min(settled, max_id)
+                if upper <= last_id:
+                    return 0
+
+                cur.execute(
+                    f"""
+                    SELECT id, node_id, timestamp, {", ".join(METRIC_FIELDS)}
+                    FROM metrics
+                    WHERE id > %s AND id <= %s
+                    ORDER BY id
+                    LIMIT %s
+                    """,
+                    (last_id, upper, self.batch_rows),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    return 0
+
+                aggregates = self._fold(rows)
+                self._merge_existing(cur, aggregates)
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO metrics_rollup
+                        (resolution_s, node_id, metric, bucket_start, count, min, max, sum,
+                         mean, p50, p95, p99, sketch)
+                    VALUES %s
+                    ON CONFLICT (resolution_s, node_id, metric, bucket_start) DO UPDATE SET
+                        count = EXCLUDED.count, min = EXCLUDED.min, max = EXCLUDED.max,
+                        sum = EXCLUDED.sum, mean = EXCLUDED.mean, p50 = EXCLUDED.p50,
+                        p95 = EXCLUDED.p95, p99 = EXCLUDED.p99, sketch = EXCLUDED.sketch
+                    """,
+                    [key + agg.row() for key, agg in aggregates.items()],
+                )
+                cur.execute(
+                    """
+                    INSERT INTO rollup_state (name, last_id) VALUES ('metrics', %s)
+                    ON CONFLICT (name) DO UPDATE SET last_id = EXCLUDED.last_id
+                    """,
+                    (rows[-1][0],),
+                )
+
+        self.rows_folded += len(rows)
+        self.passes += 1
+        self.last_pass_ms = (time.perf_counter() - started) * 1000
+        return len(rows)
+
+    def maintain(self, conn):
+        """
+        Keep daily partitions created ahead of time and apply retention: raw
+        partitions older than raw_retention_days are dropped once fully rolled
+        up, 1-minute rollups after minute_retention_days (see migrations.sql).
+        """
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (ADVISORY_LOCK_KEY,))
+                if not cur.fetchone()[0]:
+                    return
+                cur.execute("SELECT metrics_ensure_partitions(current_date - 1, current_date + 3)")
+                cur.execute(
+                    "SELECT metrics_apply_retention(%s, %s)",
+                    (self.raw_retention_days, self.minute_retention_days),
+                )
+                dropped = cur.fetchone()[0] or []
+        self._last_maintenance = time.monotonic()
+        self.dropped_partitions.extend(dropped)
+        if dropped and self.logger:
+            self.logger.warning("retention dropped partitions: %s", ", ".join(dropped))
+
+    @staticmethod
+    def _fold(rows: List[tuple]) -> Dict[Key, Aggregate]:
+        nodes = np.array([r[1] for r in rows], dtype=object)
+        ts = np.array([r[2] for r in rows], dtype=np.int64)
+        ts_ms = np.where(ts > 1_000_000_000_000, ts, ts * 1000)
+        values = np.array([r[3:] for r in rows], dtype=np.float64)
+
+        node_names, node_idx = np.unique(nodes, return_inverse=True)
+
+        aggregates: Dict[Key, Aggregate] = {}
+        for res in RESOLUTIONS:
+            buckets = ts_ms - ts_ms % (res * 1000)
+            # One sort makes every (node, bucket) a contiguous run of rows
+            order = np.lexsort((buckets, node_idx))
+            sorted_nodes, sorted_buckets = node_idx[order], buckets[order]
+            sorted_vals = values[order]
+            starts = np.flatnonzero(
+                np.r_[True, (np.diff(sorted_nodes) != 0) | (np.diff(sorted_buckets) != 0)])
+            ends = np.r_[starts[1:], len(order)]
+            for lo, hi in zip(starts.tolist(), ends.tolist()):
+                node_id = node_names[sorted_nodes[lo]]
+                bucket = int(sorted_buckets[lo])
+                for col, metric in enumerate(METRIC_FIELDS):
+                    agg = aggregates.setdefault((res, node_id, metric, bucket), Aggregate())
+                    agg.add_many(sorted_vals[lo:hi, col])
+        return {k: v for k, v in aggregates.items() if v.count}
+
+    @staticmethod
+    def _merge_existing(cur, aggregates: Dict[Key, Aggregate]):
+        """Fold already-stored buckets that this batch touches into the new partials."""
+        if not aggregates:
+            return
+        keys = list(aggregates)
+        cur.execute(
+            """
+            SELECT r.resolution_s, r.node_id, r.metric, r.bucket_start,
+                   r.count, r.min, r.max, r.sum, r.sketch
+            FROM metrics_rollup r
+            JOIN unnest(%s::int[], %s::text[], %s::text[], %s::bigint[])
+                 AS k(resolution_s, node_id, metric, bucket_start)
+              USING (resolution_s, node_id, metric, bucket_start)
+            FOR UPDATE OF r
+            """,
+            (
+                [k[0] for k in keys], [k[1] for k in keys],
+                [k[2] for k in keys], [k[3] for k in keys],
+            ),
+        )
+        for res, node_id, metric, bucket, count, vmin, vmax, vsum, sketch in cur.fetchall():
+            aggregates[(res, node_id, metric, bucket)].merge_row(count, vmin, vmax, vsum, sketch)
+
+    def stats(self) -> dict:
+        return {
+            "passes": self.passes,
+            "rows_folded": self.rows_folded,
+            "last_pass_ms": self.last_pass_ms,
+            "resolutions_s": list(RESOLUTIONS),
+            "dropped_partitions": self.dropped_partitions[-10:],
+        }
+
+
+def pick_resolution(from_ms: int, to_ms: int, points: int) -> int:
+    """Coarsest tier whose bucket is no wider than one output point (0 = raw rows)."""
+    per_point_s = (to_ms - from_ms) / 1000 / max(points, 1)
+    chosen = 0
+    for res in RESOLUTIONS:
+        if res <= per_point_s:
+            chosen = res
+    return chosen
+
+
+def fetch_rollup_range(conn, resolution_s: int, nodes: Iterable[str], metrics: Iterable[str],
+                       from_ms: int, to_ms: int, stat: str = "mean") -> Dict[str, Dict[str, tuple]]:
+    """Return {node_id: {metric: (t_ms array, value array)}} from one rollup tier."""
+    if stat not in STATS:
+        raise ValueError(f"unknown stat {stat}")
+    nodes = list(nodes)
+    where = "resolution_s = %(res)s AND metric = ANY(%(metrics)s) AND bucket_start BETWEEN %(lo)s AND %(hi)s"
+    params = {"res": resolution_s, "metrics": list(metrics),
+              "lo": from_ms - from_ms % (resolution_s * 1000), "hi": to_ms}
+    if nodes:
+        where += " AND node_id = ANY(%(nodes)s)"
+        params["nodes"] = nodes
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT node_id, metric, bucket_start, {stat}
+            FROM metrics_rollup
+            WHERE {where}
+            ORDER BY node_id, metric, bucket_start
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+
+    out: Dict[str, Dict[str, tuple]] = {}
+    grouped: Dict[Tuple[str, str], List[tuple]] = {}
+    for node_id, metric, bucket, value in rows:
+        grouped.setdefault((node_id, metric), []).append((bucket, value))
+    for (node_id, metric), pts in grouped.items():
+        arr = np.array(pts, dtype=np.float64)
+        out.setdefault(node_id, {})[metric] = (arr[:, 0], arr[:, 1])
+    return out
+
+
+if __name__ == "__main__":
+    # Standalone mode: run the rollup loop without the dashboard
+    worker = RollupWorker(
+        os.getenv("DATABASE_URL", "postgresql://admin:admin@db:5432/metrics"),
+        interval=float(os.getenv("ROLLUP_INTERVAL_SECONDS", "10")),
+        raw_retention_days=int(os.getenv("RETENTION_RAW_DAYS", "30")),
+        minute_retention_days=int(os.getenv("RETENTION_MINUTE_DAYS", "90")),
+    )
+    worker._run()
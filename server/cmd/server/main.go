@@ -3,24 +3,53 @@ package main
 import (
 	"log"
 	"net"
+	"os"
+	"os/signal"
+	"syscall"
 
 	"google.golang.org/grpc"
 
 	handler "ECNetworkProject/server/pkg/api"
 	pb "ECNetworkProject/server/pkg/api/proto"
+	"ECNetworkProject/server/pkg/db"
+	"ECNetworkProject/server/pkg/ingest"
 )
 
 func main() {
+	// One pool for the whole process; every RPC borrows from it
+	conn, err := db.Connect()
+	if err != nil {
+		log.Fatalf("failed to open database: %v", err)
+	}
+	defer conn.Close()
+	if err := conn.Ping(); err != nil {
+		log.Printf("database not reachable yet: %v", err)
+	}
+
+	batcher := ingest.NewBatcher(conn, ingest.DefaultBatcherConfig())
+
 	lis, err := net.Listen("tcp", ":50051")
 	if err != nil {
 		log.Fatalf("failed to listen: %v", err)
 	}
 
 	s := grpc.NewServer()
-	pb.RegisterMetricsServiceServer(s, &handler.MetricsHandler{})
+	pb.RegisterMetricsServiceServer(s, &handler.MetricsHandler{Batcher: batcher, DB: conn})
+
+	// On SIGTERM finish in-flight RPCs, then flush whatever is still queued
+	stop := make(chan os.Signal, 1)
+	signal.Notify(stop, syscall.SIGINT, syscall.SIGTERM)
+	go func() {
+		<-stop
+		log.Println("shutting down")
+		s.GracefulStop()
+	}()
 
 	log.Println("gRPC server running on :50051")
 	if err := s.Serve(lis); err != nil {
 		log.Fatalf("failed to serve: %v", err)
 	}
-}
\ No newline at end of file
+	batcher.Close()
+	st := batcher.Stats()
+	log.Printf("ingest: %d rows in %d flushes (%d failed, %d rejected)", st.Rows, st.Flushes, st.Failures, st.Rejected)
+}
@@ -2,19 +2,108 @@ package api
 
 import (
 	"context"
+	"database/sql"
+	"errors"
+	"io"
+	"log"
+
+	"google.golang.org/grpc/codes"
+	"google.golang.org/grpc/status"
 
 	pb "ECNetworkProject/server/pkg/api/proto"
 	"ECNetworkProject/server/pkg/ingest"
+	"ECNetworkProject/server/pkg/query"
 )
 
 type MetricsHandler struct {
 	pb.UnimplementedMetricsServiceServer
+	Batcher *ingest.Batcher
+	DB      *sql.DB
 }
 
 func (h *MetricsHandler) SubmitMetrics(ctx context.Context, req *pb.MetricsRequest) (*pb.MetricsResponse, error) {
-	err := ingest.StoreMetrics(req)
+	err := h.Batcher.Submit(ctx, []*pb.MetricsRequest{req})
 	if err != nil {
-		return &pb.MetricsResponse{Success: false}, err
+		return &pb.MetricsResponse{Success: false}, submitError(err)
 	}
 	return &pb.MetricsResponse{Success: true}, nil
-}
\ No newline at end of file
+}
+
+// SubmitMetricsStream stores each incoming batch with a single multi-row insert
+// and acks it on the same stream. A failed batch is nacked, not fatal, so the
+// client can retry it without reopening the stream.
+func (h *MetricsHandler) SubmitMetricsStream(stream pb.MetricsService_SubmitMetricsStreamServer) error {
+	for {
+		batch, err := stream.Recv()
+		if err == io.EOF {
+			return nil
+		}
+		if err != nil {
+			return err
+		}
+
+		ack := &pb.BatchAck{Seq: batch.Seq}
+		if err := h.Batcher.Submit(stream.Context(), batch.Entries); err != nil {
+			log.Printf("batch %d (%d rows) failed: %v", batch.Seq, len(batch.Entries), err)
+		} else {
+			ack.Success = true
+			ack.Stored = int32(len(batch.Entries))
+		}
+		if err := stream.Send(ack); err != nil {
+			return err
+		}
+	}
+}
+
+// SubmitSummaries stores window summaries directly rather than through the
+// batcher: agents in summary mode send one small batch every few seconds.
+func (h *MetricsHandler) SubmitSummaries(ctx context.Context, batch *pb.SummaryBatch) (*pb.BatchAck, error) {
+	stored, err := ingest.StoreSummaries(h.DB, batch.Summaries)
+	if err != nil {
+		log.Printf("summary batch %d (%d windows) failed: %v", batch.Seq, len(batch.Summaries), err)
+		return nil, status.Errorf(codes.Internal, "storing summaries: %v", err)
+	}
+	return &pb.BatchAck{Seq: batch.Seq, Success: true, Stored: int32(stored)}, nil
+}
+
+// FetchMetrics streams the requested range one page per message. Each page is
+// its own query and is sent before the next one is read, so gRPC flow control
+// keeps a slow reader from making the server buffer the range. The last page
+// has no next_token; a client that loses the stream resumes from the last
+// token it received.
+func (h *MetricsHandler) FetchMetrics(req *pb.FetchRequest, stream pb.MetricsService_FetchMetricsServer) error {
+	f, err := query.FromRequest(req)
+	if err != nil {
+		return status.Error(codes.InvalidArgument, err.Error())
+	}
+	cur, err := query.ParseToken(req.ResumeToken)
+	if err != nil {
+		return status.Error(codes.InvalidArgument, err.Error())
+	}
+	for {
+		entries, next, err := f.Page(stream.Context(), h.DB, cur)
+		if err != nil {
+			log.Printf("fetch after %q failed: %v", req.ResumeToken, err)
+			return err
+		}
+		page := &pb.MetricsList{Entries: entries}
+		if next != nil {
+			page.NextToken = next.Token()
+		}
+		if err := stream.Send(page); err != nil {
+			return err
+		}
+		if next == nil {
+			return nil
+		}
+		cur = next
+	}
+}
+
+// submitError tells clients to back off when the write path is saturated.
+func submitError(err error) error {
+	if errors.Is(err, ingest.ErrOverloaded) || errors.Is(err, ingest.ErrClosed) {
+		return status.Error(codes.ResourceExhausted, err.Error())
+	}
+	return err
+}
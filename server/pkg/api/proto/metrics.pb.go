@@ -151,7 +151,13 @@ func (x *MetricsResponse) GetSuccess() bool {
 
 type FetchRequest struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
-	NodeId        string                 `protobuf:"bytes,1,opt,name=node_id,json=nodeId,proto3" json:"node_id,omitempty"`
+	NodeId        string                 `protobuf:"bytes,1,opt,name=node_id,json=nodeId,proto3" json:"node_id,omitempty"`                // empty: every node (unless node_ids is set)
+	NodeIds       []string               `protobuf:"bytes,2,rep,name=node_ids,json=nodeIds,proto3" json:"node_ids,omitempty"`             // any of these nodes, in addition to node_id
+	FromMs        int64                  `protobuf:"varint,3,opt,name=from_ms,json=fromMs,proto3" json:"from_ms,omitempty"`               // ms since epoch, inclusive
+	ToMs          int64                  `protobuf:"varint,4,opt,name=to_ms,json=toMs,proto3" json:"to_ms,omitempty"`                     // ms since epoch, inclusive; 0: no upper bound
+	PageSize      uint32                 `protobuf:"varint,5,opt,name=page_size,json=pageSize,proto3" json:"page_size,omitempty"`         // entries per page; 0: server default
+	ResumeToken   string                 `protobuf:"bytes,6,opt,name=resume_token,json=resumeToken,proto3" json:"resume_token,omitempty"` // next_token of the last page received
+	BucketMs      int64                  `protobuf:"varint,7,opt,name=bucket_ms,json=bucketMs,proto3" json:"bucket_ms,omitempty"`         // > 0: per node, the means of each bucket_ms interval
 	unknownFields protoimpl.UnknownFields
 	sizeCache     protoimpl.SizeCache
 }
@@ -193,6 +199,48 @@ func (x *FetchRequest) GetNodeId() string {
 	return ""
 }
 
+func (x *FetchRequest) GetNodeIds() []string {
+	if x != nil {
+		return x.NodeIds
+	}
+	return nil
+}
+
+func (x *FetchRequest) GetFromMs() int64 {
+	if x != nil {
+		return x.FromMs
+	}
+	return 0
+}
+
+func (x *FetchRequest) GetToMs() int64 {
+	if x != nil {
+		return x.ToMs
+	}
+	return 0
+}
+
+func (x *FetchRequest) GetPageSize() uint32 {
+	if x != nil {
+		return x.PageSize
+	}
+	return 0
+}
+
+func (x *FetchRequest) GetResumeToken() string {
+	if x != nil {
+		return x.ResumeToken
+	}
+	return ""
+}
+
+func (x *FetchRequest) GetBucketMs() int64 {
+	if x != nil {
+		return x.BucketMs
+	}
+	return 0
+}
+
 type Metrics struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
 	NodeId        string                 `protobuf:"bytes,1,opt,name=node_id,json=nodeId,proto3" json:"node_id,omitempty"`
@@ -280,6 +328,7 @@ func (x *Metrics) GetTimestamp() int64 {
 type MetricsList struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
 	Entries       []*Metrics             `protobuf:"bytes,1,rep,name=entries,proto3" json:"entries,omitempty"`
+	NextToken     string                 `protobuf:"bytes,2,opt,name=next_token,json=nextToken,proto3" json:"next_token,omitempty"` // resumes after this page; empty on the last page
 	unknownFields protoimpl.UnknownFields
 	sizeCache     protoimpl.SizeCache
 }
@@ -321,6 +370,361 @@ func (x *MetricsList) GetEntries() []*Metrics {
 	return nil
 }
 
+func (x *MetricsList) GetNextToken() string {
+	if x != nil {
+		return x.NextToken
+	}
+	return ""
+}
+
+type MetricsBatch struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Seq           uint64                 `protobuf:"varint,1,opt,name=seq,proto3" json:"seq,omitempty"`
+	Entries       []*MetricsRequest      `protobuf:"bytes,2,rep,name=entries,proto3" json:"entries,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *MetricsBatch) Reset() {
+	*x = MetricsBatch{}
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[5]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *MetricsBatch) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*MetricsBatch) ProtoMessage() {}
+
+func (x *MetricsBatch) ProtoReflect() protoreflect.Message {
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[5]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use MetricsBatch.ProtoReflect.Descriptor instead.
+func (*MetricsBatch) Descriptor() ([]byte, []int) {
+	return file_pkg_api_proto_metrics_proto_rawDescGZIP(), []int{5}
+}
+
+func (x *MetricsBatch) GetSeq() uint64 {
+	if x != nil {
+		return x.Seq
+	}
+	return 0
+}
+
+func (x *MetricsBatch) GetEntries() []*MetricsRequest {
+	if x != nil {
+		return x.Entries
+	}
+	return nil
+}
+
+type BatchAck struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Seq           uint64                 `protobuf:"varint,1,opt,name=seq,proto3" json:"seq,omitempty"`
+	Success       bool                   `protobuf:"varint,2,opt,name=success,proto3" json:"success,omitempty"`
+	Stored        int32                  `protobuf:"varint,3,opt,name=stored,proto3" json:"stored,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *BatchAck) Reset() {
+	*x = BatchAck{}
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[6]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *BatchAck) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*BatchAck) ProtoMessage() {}
+
+func (x *BatchAck) ProtoReflect() protoreflect.Message {
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[6]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use BatchAck.ProtoReflect.Descriptor instead.
+func (*BatchAck) Descriptor() ([]byte, []int) {
+	return file_pkg_api_proto_metrics_proto_rawDescGZIP(), []int{6}
+}
+
+func (x *BatchAck) GetSeq() uint64 {
+	if x != nil {
+		return x.Seq
+	}
+	return 0
+}
+
+func (x *BatchAck) GetSuccess() bool {
+	if x != nil {
+		return x.Success
+	}
+	return false
+}
+
+func (x *BatchAck) GetStored() int32 {
+	if x != nil {
+		return x.Stored
+	}
+	return 0
+}
+
+type MetricStats struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Count         uint32                 `protobuf:"varint,1,opt,name=count,proto3" json:"count,omitempty"`
+	Min           float64                `protobuf:"fixed64,2,opt,name=min,proto3" json:"min,omitempty"`
+	Max           float64                `protobuf:"fixed64,3,opt,name=max,proto3" json:"max,omitempty"`
+	Mean          float64                `protobuf:"fixed64,4,opt,name=mean,proto3" json:"mean,omitempty"`
+	P95           float64                `protobuf:"fixed64,5,opt,name=p95,proto3" json:"p95,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *MetricStats) Reset() {
+	*x = MetricStats{}
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[7]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *MetricStats) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*MetricStats) ProtoMessage() {}
+
+func (x *MetricStats) ProtoReflect() protoreflect.Message {
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[7]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use MetricStats.ProtoReflect.Descriptor instead.
+func (*MetricStats) Descriptor() ([]byte, []int) {
+	return file_pkg_api_proto_metrics_proto_rawDescGZIP(), []int{7}
+}
+
+func (x *MetricStats) GetCount() uint32 {
+	if x != nil {
+		return x.Count
+	}
+	return 0
+}
+
+func (x *MetricStats) GetMin() float64 {
+	if x != nil {
+		return x.Min
+	}
+	return 0
+}
+
+func (x *MetricStats) GetMax() float64 {
+	if x != nil {
+		return x.Max
+	}
+	return 0
+}
+
+func (x *MetricStats) GetMean() float64 {
+	if x != nil {
+		return x.Mean
+	}
+	return 0
+}
+
+func (x *MetricStats) GetP95() float64 {
+	if x != nil {
+		return x.P95
+	}
+	return 0
+}
+
+type MetricsSummary struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	NodeId        string                 `protobuf:"bytes,1,opt,name=node_id,json=nodeId,proto3" json:"node_id,omitempty"`
+	WindowStart   int64                  `protobuf:"varint,2,opt,name=window_start,json=windowStart,proto3" json:"window_start,omitempty"` // ms since epoch
+	WindowEnd     int64                  `protobuf:"varint,3,opt,name=window_end,json=windowEnd,proto3" json:"window_end,omitempty"`       // ms since epoch, time of the last sample in the window
+	Samples       uint32                 `protobuf:"varint,4,opt,name=samples,proto3" json:"samples,omitempty"`
+	LostSamples   uint32                 `protobuf:"varint,5,opt,name=lost_samples,json=lostSamples,proto3" json:"lost_samples,omitempty"` // samples where every ping was lost
+	Latency       *MetricStats           `protobuf:"bytes,6,opt,name=latency,proto3" json:"latency,omitempty"`
+	Jitter        *MetricStats           `protobuf:"bytes,7,opt,name=jitter,proto3" json:"jitter,omitempty"`
+	PacketLoss    *MetricStats           `protobuf:"bytes,8,opt,name=packet_loss,json=packetLoss,proto3" json:"packet_loss,omitempty"`
+	Bandwidth     *MetricStats           `protobuf:"bytes,9,opt,name=bandwidth,proto3" json:"bandwidth,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *MetricsSummary) Reset() {
+	*x = MetricsSummary{}
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[8]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *MetricsSummary) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*MetricsSummary) ProtoMessage() {}
+
+func (x *MetricsSummary) ProtoReflect() protoreflect.Message {
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[8]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use MetricsSummary.ProtoReflect.Descriptor instead.
+func (*MetricsSummary) Descriptor() ([]byte, []int) {
+	return file_pkg_api_proto_metrics_proto_rawDescGZIP(), []int{8}
+}
+
+func (x *MetricsSummary) GetNodeId() string {
+	if x != nil {
+		return x.NodeId
+	}
+	return ""
+}
+
+func (x *MetricsSummary) GetWindowStart() int64 {
+	if x != nil {
+		return x.WindowStart
+	}
+	return 0
+}
+
+func (x *MetricsSummary) GetWindowEnd() int64 {
+	if x != nil {
+		return x.WindowEnd
+	}
+	return 0
+}
+
+func (x *MetricsSummary) GetSamples() uint32 {
+	if x != nil {
+		return x.Samples
+	}
+	return 0
+}
+
+func (x *MetricsSummary) GetLostSamples() uint32 {
+	if x != nil {
+		return x.LostSamples
+	}
+	return 0
+}
+
+func (x *MetricsSummary) GetLatency() *MetricStats {
+	if x != nil {
+		return x.Latency
+	}
+	return nil
+}
+
+func (x *MetricsSummary) GetJitter() *MetricStats {
+	if x != nil {
+		return x.Jitter
+	}
+	return nil
+}
+
+func (x *MetricsSummary) GetPacketLoss() *MetricStats {
+	if x != nil {
+		return x.PacketLoss
+	}
+	return nil
+}
+
+func (x *MetricsSummary) GetBandwidth() *MetricStats {
+	if x != nil {
+		return x.Bandwidth
+	}
+	return nil
+}
+
+type SummaryBatch struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Seq           uint64                 `protobuf:"varint,1,opt,name=seq,proto3" json:"seq,omitempty"`
+	Summaries     []*MetricsSummary      `protobuf:"bytes,2,rep,name=summaries,proto3" json:"summaries,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *SummaryBatch) Reset() {
+	*x = SummaryBatch{}
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[9]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *SummaryBatch) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*SummaryBatch) ProtoMessage() {}
+
+func (x *SummaryBatch) ProtoReflect() protoreflect.Message {
+	mi := &file_pkg_api_proto_metrics_proto_msgTypes[9]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use SummaryBatch.ProtoReflect.Descriptor instead.
+func (*SummaryBatch) Descriptor() ([]byte, []int) {
+	return file_pkg_api_proto_metrics_proto_rawDescGZIP(), []int{9}
+}
+
+func (x *SummaryBatch) GetSeq() uint64 {
+	if x != nil {
+		return x.Seq
+	}
+	return 0
+}
+
+func (x *SummaryBatch) GetSummaries() []*MetricsSummary {
+	if x != nil {
+		return x.Summaries
+	}
+	return nil
+}
+
 var File_pkg_api_proto_metrics_proto protoreflect.FileDescriptor
 
 const file_pkg_api_proto_metrics_proto_rawDesc = "" +
@@ -335,9 +739,15 @@ const file_pkg_api_proto_metrics_proto_rawDesc = "" +
 	"\tbandwidth\x18\x05 \x01(\x01R\tbandwidth\x12\x1c\n" +
 	"\ttimestamp\x18\x06 \x01(\x03R\ttimestamp\"+\n" +
 	"\x0fMetricsResponse\x12\x18\n" +
-	"\asuccess\x18\x01 \x01(\bR\asuccess\"'\n" +
+	"\asuccess\x18\x01 \x01(\bR\asuccess\"\xcd\x01\n" +
 	"\fFetchRequest\x12\x17\n" +
-	"\anode_id\x18\x01 \x01(\tR\x06nodeId\"\xb1\x01\n" +
+	"\anode_id\x18\x01 \x01(\tR\x06nodeId\x12\x19\n" +
+	"\bnode_ids\x18\x02 \x03(\tR\anodeIds\x12\x17\n" +
+	"\afrom_ms\x18\x03 \x01(\x03R\x06fromMs\x12\x13\n" +
+	"\x05to_ms\x18\x04 \x01(\x03R\x04toMs\x12\x1b\n" +
+	"\tpage_size\x18\x05 \x01(\rR\bpageSize\x12!\n" +
+	"\fresume_token\x18\x06 \x01(\tR\vresumeToken\x12\x1b\n" +
+	"\tbucket_ms\x18\a \x01(\x03R\bbucketMs\"\xb1\x01\n" +
 	"\aMetrics\x12\x17\n" +
 	"\anode_id\x18\x01 \x01(\tR\x06nodeId\x12\x18\n" +
 	"\alatency\x18\x02 \x01(\x01R\alatency\x12\x16\n" +
@@ -345,12 +755,44 @@ const file_pkg_api_proto_metrics_proto_rawDesc = "" +
 	"\vpacket_loss\x18\x04 \x01(\x01R\n" +
 	"packetLoss\x12\x1c\n" +
 	"\tbandwidth\x18\x05 \x01(\x01R\tbandwidth\x12\x1c\n" +
-	"\ttimestamp\x18\x06 \x01(\x03R\ttimestamp\"9\n" +
+	"\ttimestamp\x18\x06 \x01(\x03R\ttimestamp\"X\n" +
 	"\vMetricsList\x12*\n" +
-	"\aentries\x18\x01 \x03(\v2\x10.metrics.MetricsR\aentries2\x91\x01\n" +
+	"\aentries\x18\x01 \x03(\v2\x10.metrics.MetricsR\aentries\x12\x1d\n" +
+	"\n" +
+	"next_token\x18\x02 \x01(\tR\tnextToken\"S\n" +
+	"\fMetricsBatch\x12\x10\n" +
+	"\x03seq\x18\x01 \x01(\x04R\x03seq\x121\n" +
+	"\aentries\x18\x02 \x03(\v2\x17.metrics.MetricsRequestR\aentries\"N\n" +
+	"\bBatchAck\x12\x10\n" +
+	"\x03seq\x18\x01 \x01(\x04R\x03seq\x12\x18\n" +
+	"\asuccess\x18\x02 \x01(\bR\asuccess\x12\x16\n" +
+	"\x06stored\x18\x03 \x01(\x05R\x06stored\"m\n" +
+	"\vMetricStats\x12\x14\n" +
+	"\x05count\x18\x01 \x01(\rR\x05count\x12\x10\n" +
+	"\x03min\x18\x02 \x01(\x01R\x03min\x12\x10\n" +
+	"\x03max\x18\x03 \x01(\x01R\x03max\x12\x12\n" +
+	"\x04mean\x18\x04 \x01(\x01R\x04mean\x12\x10\n" +
+	"\x03p95\x18\x05 \x01(\x01R\x03p95\"\xf1\x02\n" +
+	"\x0eMetricsSummary\x12\x17\n" +
+	"\anode_id\x18\x01 \x01(\tR\x06nodeId\x12!\n" +
+	"\fwindow_start\x18\x02 \x01(\x03R\vwindowStart\x12\x1d\n" +
+	"\n" +
+	"window_end\x18\x03 \x01(\x03R\twindowEnd\x12\x18\n" +
+	"\asamples\x18\x04 \x01(\rR\asamples\x12!\n" +
+	"\flost_samples\x18\x05 \x01(\rR\vlostSamples\x12.\n" +
+	"\alatency\x18\x06 \x01(\v2\x14.metrics.MetricStatsR\alatency\x12,\n" +
+	"\x06jitter\x18\a \x01(\v2\x14.metrics.MetricStatsR\x06jitter\x125\n" +
+	"\vpacket_loss\x18\b \x01(\v2\x14.metrics.MetricStatsR\n" +
+	"packetLoss\x122\n" +
+	"\tbandwidth\x18\t \x01(\v2\x14.metrics.MetricStatsR\tbandwidth\"W\n" +
+	"\fSummaryBatch\x12\x10\n" +
+	"\x03seq\x18\x01 \x01(\x04R\x03seq\x125\n" +
+	"\tsummaries\x18\x02 \x03(\v2\x17.metrics.MetricsSummaryR\tsummaries2\x95\x02\n" +
 	"\x0eMetricsService\x12B\n" +
-	"\rSubmitMetrics\x12\x17.metrics.MetricsRequest\x1a\x18.metrics.MetricsResponse\x12;\n" +
-	"\fFetchMetrics\x12\x15.metrics.FetchRequest\x1a\x14.metrics.MetricsListB\x15Z\x13pkg/api/proto;protob\x06proto3"
+	"\rSubmitMetrics\x12\x17.metrics.MetricsRequest\x1a\x18.metrics.MetricsResponse\x12=\n" +
+	"\fFetchMetrics\x12\x15.metrics.FetchRequest\x1a\x14.metrics.MetricsList0\x01\x12C\n" +
+	"\x13SubmitMetricsStream\x12\x15.metrics.MetricsBatch\x1a\x11.metrics.BatchAck(\x010\x01\x12;\n" +
+	"\x0fSubmitSummaries\x12\x15.metrics.SummaryBatch\x1a\x11.metrics.BatchAckB\x15Z\x13pkg/api/proto;protob\x06proto3"
 
 var (
 	file_pkg_api_proto_metrics_proto_rawDescOnce sync.Once
@@ -364,25 +806,40 @@ func file_pkg_api_proto_metrics_proto_rawDescGZIP() []byte {
 	return file_pkg_api_proto_metrics_proto_rawDescData
 }
 
-var file_pkg_api_proto_metrics_proto_msgTypes = make([]protoimpl.MessageInfo, 5)
+var file_pkg_api_proto_metrics_proto_msgTypes = make([]protoimpl.MessageInfo, 10)
 var file_pkg_api_proto_metrics_proto_goTypes = []any{
 	(*MetricsRequest)(nil),  // 0: metrics.MetricsRequest
 	(*MetricsResponse)(nil), // 1: metrics.MetricsResponse
 	(*FetchRequest)(nil),    // 2: metrics.FetchRequest
 	(*Metrics)(nil),         // 3: metrics.Metrics
 	(*MetricsList)(nil),     // 4: metrics.MetricsList
+	(*MetricsBatch)(nil),    // 5: metrics.MetricsBatch
+	(*BatchAck)(nil),        // 6: metrics.BatchAck
+	(*MetricStats)(nil),     // 7: metrics.MetricStats
+	(*MetricsSummary)(nil),  // 8: metrics.MetricsSummary
+	(*SummaryBatch)(nil),    // 9: metrics.SummaryBatch
 }
 var file_pkg_api_proto_metrics_proto_depIdxs = []int32{
-	3, // 0: metrics.MetricsList.entries:type_name -> metrics.Metrics
-	0, // 1: metrics.MetricsService.SubmitMetrics:input_type -> metrics.MetricsRequest
-	2, // 2: metrics.MetricsService.FetchMetrics:input_type -> metrics.FetchRequest
-	1, // 3: metrics.MetricsService.SubmitMetrics:output_type -> metrics.MetricsResponse
-	4, // 4: metrics.MetricsService.FetchMetrics:output_type -> metrics.MetricsList
-	3, // [3:5] is the sub-list for method output_type
-	1, // [1:3] is the sub-list for method input_type
-	1, // [1:1] is the sub-list for extension type_name
-	1, // [1:1] is the sub-list for extension extendee
-	0, // [0:1] is the sub-list for field type_name
+	3,  // 0: metrics.MetricsList.entries:type_name -> metrics.Metrics
+	0,  // 1: metrics.MetricsBatch.entries:type_name -> metrics.MetricsRequest
+	7,  // 2: metrics.MetricsSummary.latency:type_name -> metrics.MetricStats
+	7,  // 3: metrics.MetricsSummary.jitter:type_name -> metrics.MetricStats
+	7,  // 4: metrics.MetricsSummary.packet_loss:type_name -> metrics.MetricStats
+	7,  // 5: metrics.MetricsSummary.bandwidth:type_name -> metrics.MetricStats
+	8,  // 6: metrics.SummaryBatch.summaries:type_name -> metrics.MetricsSummary
+	0,  // 7: metrics.MetricsService.SubmitMetrics:input_type -> metrics.MetricsRequest
+	2,  // 8: metrics.MetricsService.FetchMetrics:input_type -> metrics.FetchRequest
+	5,  // 9: metrics.MetricsService.SubmitMetricsStream:input_type -> metrics.MetricsBatch
+	9,  // 10: metrics.MetricsService.SubmitSummaries:input_type -> metrics.SummaryBatch
+	1,  // 11: metrics.MetricsService.SubmitMetrics:output_type -> metrics.MetricsResponse
+	4,  // 12: metrics.MetricsService.FetchMetrics:output_type -> metrics.MetricsList
+	6,  // 13: metrics.MetricsService.SubmitMetricsStream:output_type -> metrics.BatchAck
+	6,  // 14: metrics.MetricsService.SubmitSummaries:output_type -> metrics.BatchAck
+	11, // [11:15] is the sub-list for method output_type
+	7,  // [7:11] is the sub-list for method input_type
+	7,  // [7:7] is the sub-list for extension type_name
+	7,  // [7:7] is the sub-list for extension extendee
+	0,  // [0:7] is the sub-list for field type_name
 }
 
 func init() { file_pkg_api_proto_metrics_proto_init() }
@@ -396,7 +853,7 @@ func file_pkg_api_proto_metrics_proto_init() {
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: unsafe.Slice(unsafe.StringData(file_pkg_api_proto_metrics_proto_rawDesc), len(file_pkg_api_proto_metrics_proto_rawDesc)),
 			NumEnums:      0,
-			NumMessages:   5,
+			NumMessages:   10,
 			NumExtensions: 0,
 			NumServices:   1,
 		},
@@ -19,8 +19,10 @@ import (
 const _ = grpc.SupportPackageIsVersion9
 
 const (
-	MetricsService_SubmitMetrics_FullMethodName = "/metrics.MetricsService/SubmitMetrics"
-	MetricsService_FetchMetrics_FullMethodName  = "/metrics.MetricsService/FetchMetrics"
+	MetricsService_SubmitMetrics_FullMethodName       = "/metrics.MetricsService/SubmitMetrics"
+	MetricsService_FetchMetrics_FullMethodName        = "/metrics.MetricsService/FetchMetrics"
+	MetricsService_SubmitMetricsStream_FullMethodName = "/metrics.MetricsService/SubmitMetricsStream"
+	MetricsService_SubmitSummaries_FullMethodName     = "/metrics.MetricsService/SubmitSummaries"
 )
 
 // MetricsServiceClient is the client API for MetricsService service.
@@ -28,7 +30,12 @@ const (
 // For semantics around ctx use and closing/ending streaming RPCs, please refer to https://pkg.go.dev/google.golang.org/grpc/?tab=doc#ClientConn.NewStream.
 type MetricsServiceClient interface {
 	SubmitMetrics(ctx context.Context, in *MetricsRequest, opts ...grpc.CallOption) (*MetricsResponse, error)
-	FetchMetrics(ctx context.Context, in *FetchRequest, opts ...grpc.CallOption) (*MetricsList, error)
+	// Stored metrics in the requested range, ordered by node and time, one page per message.
+	FetchMetrics(ctx context.Context, in *FetchRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[MetricsList], error)
+	// Long-lived stream of batches; every batch is stored atomically and acked in order.
+	SubmitMetricsStream(ctx context.Context, opts ...grpc.CallOption) (grpc.BidiStreamingClient[MetricsBatch, BatchAck], error)
+	// Per-window aggregates from agents in summary mode; each batch is stored atomically.
+	SubmitSummaries(ctx context.Context, in *SummaryBatch, opts ...grpc.CallOption) (*BatchAck, error)
 }
 
 type metricsServiceClient struct {
@@ -49,10 +56,42 @@ func (c *metricsServiceClient) SubmitMetrics(ctx context.Context, in *MetricsReq
 	return out, nil
 }
 
-func (c *metricsServiceClient) FetchMetrics(ctx context.Context, in *FetchRequest, opts ...grpc.CallOption) (*MetricsList, error) {
+func (c *metricsServiceClient) FetchMetrics(ctx context.Context, in *FetchRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[MetricsList], error) {
 	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
-	out := new(MetricsList)
-	err := c.cc.Invoke(ctx, MetricsService_FetchMetrics_FullMethodName, in, out, cOpts...)
+	stream, err := c.cc.NewStream(ctx, &MetricsService_ServiceDesc.Streams[0], MetricsService_FetchMetrics_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[FetchRequest, MetricsList]{ClientStream: stream}
+	if err := x.ClientStream.SendMsg(in); err != nil {
+		return nil, err
+	}
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type MetricsService_FetchMetricsClient = grpc.ServerStreamingClient[MetricsList]
+
+func (c *metricsServiceClient) SubmitMetricsStream(ctx context.Context, opts ...grpc.CallOption) (grpc.BidiStreamingClient[MetricsBatch, BatchAck], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &MetricsService_ServiceDesc.Streams[1], MetricsService_SubmitMetricsStream_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[MetricsBatch, BatchAck]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type MetricsService_SubmitMetricsStreamClient = grpc.BidiStreamingClient[MetricsBatch, BatchAck]
+
+func (c *metricsServiceClient) SubmitSummaries(ctx context.Context, in *SummaryBatch, opts ...grpc.CallOption) (*BatchAck, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(BatchAck)
+	err := c.cc.Invoke(ctx, MetricsService_SubmitSummaries_FullMethodName, in, out, cOpts...)
 	if err != nil {
 		return nil, err
 	}
@@ -64,7 +103,12 @@ func (c *metricsServiceClient) FetchMetrics(ctx context.Context, in *FetchReques
 // for forward compatibility.
 type MetricsServiceServer interface {
 	SubmitMetrics(context.Context, *MetricsRequest) (*MetricsResponse, error)
-	FetchMetrics(context.Context, *FetchRequest) (*MetricsList, error)
+	// Stored metrics in the requested range, ordered by node and time, one page per message.
+	FetchMetrics(*FetchRequest, grpc.ServerStreamingServer[MetricsList]) error
+	// Long-lived stream of batches; every batch is stored atomically and acked in order.
+	SubmitMetricsStream(grpc.BidiStreamingServer[MetricsBatch, BatchAck]) error
+	// Per-window aggregates from agents in summary mode; each batch is stored atomically.
+	SubmitSummaries(context.Context, *SummaryBatch) (*BatchAck, error)
 	mustEmbedUnimplementedMetricsServiceServer()
 }
 
@@ -78,8 +122,14 @@ type UnimplementedMetricsServiceServer struct{}
 func (UnimplementedMetricsServiceServer) SubmitMetrics(context.Context, *MetricsRequest) (*MetricsResponse, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method SubmitMetrics not implemented")
 }
-func (UnimplementedMetricsServiceServer) FetchMetrics(context.Context, *FetchRequest) (*MetricsList, error) {
-	return nil, status.Errorf(codes.Unimplemented, "method FetchMetrics not implemented")
+func (UnimplementedMetricsServiceServer) FetchMetrics(*FetchRequest, grpc.ServerStreamingServer[MetricsList]) error {
+	return status.Errorf(codes.Unimplemented, "method FetchMetrics not implemented")
+}
+func (UnimplementedMetricsServiceServer) SubmitMetricsStream(grpc.BidiStreamingServer[MetricsBatch, BatchAck]) error {
+	return status.Errorf(codes.Unimplemented, "method SubmitMetricsStream not implemented")
+}
+func (UnimplementedMetricsServiceServer) SubmitSummaries(context.Context, *SummaryBatch) (*BatchAck, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method SubmitSummaries not implemented")
 }
 func (UnimplementedMetricsServiceServer) mustEmbedUnimplementedMetricsServiceServer() {}
 func (UnimplementedMetricsServiceServer) testEmbeddedByValue()                        {}
@@ -120,20 +170,38 @@ func _MetricsService_SubmitMetrics_Handler(srv interface{}, ctx context.Context,
 	return interceptor(ctx, in, info, handler)
 }
 
-func _MetricsService_FetchMetrics_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
-	in := new(FetchRequest)
+func _MetricsService_FetchMetrics_Handler(srv interface{}, stream grpc.ServerStream) error {
+	m := new(FetchRequest)
+	if err := stream.RecvMsg(m); err != nil {
+		return err
+	}
+	return srv.(MetricsServiceServer).FetchMetrics(m, &grpc.GenericServerStream[FetchRequest, MetricsList]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type MetricsService_FetchMetricsServer = grpc.ServerStreamingServer[MetricsList]
+
+func _MetricsService_SubmitMetricsStream_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(MetricsServiceServer).SubmitMetricsStream(&grpc.GenericServerStream[MetricsBatch, BatchAck]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type MetricsService_SubmitMetricsStreamServer = grpc.BidiStreamingServer[MetricsBatch, BatchAck]
+
+func _MetricsService_SubmitSummaries_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(SummaryBatch)
 	if err := dec(in); err != nil {
 		return nil, err
 	}
 	if interceptor == nil {
-		return srv.(MetricsServiceServer).FetchMetrics(ctx, in)
+		return srv.(MetricsServiceServer).SubmitSummaries(ctx, in)
 	}
 	info := &grpc.UnaryServerInfo{
 		Server:     srv,
-		FullMethod: MetricsService_FetchMetrics_FullMethodName,
+		FullMethod: MetricsService_SubmitSummaries_FullMethodName,
 	}
 	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
-		return srv.(MetricsServiceServer).FetchMetrics(ctx, req.(*FetchRequest))
+		return srv.(MetricsServiceServer).SubmitSummaries(ctx, req.(*SummaryBatch))
 	}
 	return interceptor(ctx, in, info, handler)
 }
@@ -150,10 +218,22 @@ var MetricsService_ServiceDesc = grpc.ServiceDesc{
 			Handler:    _MetricsService_SubmitMetrics_Handler,
 		},
 		{
-			MethodName: "FetchMetrics",
-			Handler:    _MetricsService_FetchMetrics_Handler,
+			MethodName: "SubmitSummaries",
+			Handler:    _MetricsService_SubmitSummaries_Handler,
+		},
+	},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "FetchMetrics",
+			Handler:       _MetricsService_FetchMetrics_Handler,
+			ServerStreams: true,
+		},
+		{
+			StreamName:    "SubmitMetricsStream",
+			Handler:       _MetricsService_SubmitMetricsStream_Handler,
+			ServerStreams: true,
+			ClientStreams: true,
 		},
 	},
-	Streams:  []grpc.StreamDesc{},
 	Metadata: "pkg/api/proto/metrics.proto",
 }
@@ -1,11 +1,230 @@
-DROP TABLE IF EXISTS metrics;
+-- Safe to run on every start: docker compose runs this before the server comes up.
+-- metrics is range-partitioned by day on timestamp (ms since epoch, UTC days);
+-- a table from an older, unpartitioned schema is migrated in place below.
+SET client_min_messages = warning;
 
-CREATE TABLE metrics (
-  id SERIAL PRIMARY KEY,
+-- 1) Move an old unpartitioned metrics table aside, keeping its id sequence
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'metrics' AND relkind = 'r') THEN
+    ALTER TABLE metrics RENAME TO metrics_legacy;
+    ALTER INDEX IF EXISTS metrics_pkey RENAME TO metrics_legacy_pkey;
+    ALTER INDEX IF EXISTS metrics_node_ts_idx RENAME TO metrics_legacy_node_ts_idx;
+    DROP TRIGGER IF EXISTS metrics_insert_notify ON metrics_legacy;
+    ALTER TABLE metrics_legacy ALTER COLUMN id DROP DEFAULT;
+    ALTER SEQUENCE metrics_id_seq OWNED BY NONE;
+    ALTER SEQUENCE metrics_id_seq AS BIGINT;
+  END IF;
+END $$;
+
+-- 2) Partitioned table. Ids keep coming from the same sequence, so consumers
+-- that track progress by id (rollups, chartgen) carry on across the migration.
+CREATE SEQUENCE IF NOT EXISTS metrics_id_seq AS BIGINT;
+
+CREATE TABLE IF NOT EXISTS metrics (
+  id BIGINT NOT NULL DEFAULT nextval('metrics_id_seq'),
   node_id TEXT,
   latency DOUBLE PRECISION,
   jitter DOUBLE PRECISION,
   packet_loss DOUBLE PRECISION,
   bandwidth DOUBLE PRECISION,
-  timestamp BIGINT NOT NULL
-);
\ No newline at end of file
+  timestamp BIGINT NOT NULL, -- ms since epoch; the server converts seconds from older agents on ingest
+  PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+ALTER SEQUENCE metrics_id_seq OWNED BY metrics.id;
+
+-- Catches rows outside every daily partition (clock skew, very old replays);
+-- metrics_ensure_partitions moves them into the right partition once it exists.
+CREATE TABLE IF NOT EXISTS metrics_default PARTITION OF metrics DEFAULT;
+
+-- Every dashboard/chartgen query filters on node and time range
+CREATE INDEX IF NOT EXISTS metrics_node_ts_idx ON metrics (node_id, timestamp);
+
+-- 3) Rollups: 1 minute / 1 hour aggregates per node and metric, maintained by
+-- dashboard/rollup.py. count/min/max/sum and the quantile sketch are all
+-- mergeable, so late rows fold into existing buckets; mean and p50/p95/p99 are
+-- derived on every write.
+CREATE TABLE IF NOT EXISTS metrics_rollup (
+  resolution_s INTEGER NOT NULL,
+  node_id TEXT NOT NULL,
+  metric TEXT NOT NULL,
+  bucket_start BIGINT NOT NULL, -- ms since epoch
+  count BIGINT NOT NULL,
+  min DOUBLE PRECISION,
+  max DOUBLE PRECISION,
+  sum DOUBLE PRECISION,
+  mean DOUBLE PRECISION,
+  p50 DOUBLE PRECISION,
+  p95 DOUBLE PRECISION,
+  p99 DOUBLE PRECISION,
+  sketch JSONB NOT NULL,
+  PRIMARY KEY (resolution_s, node_id, metric, bucket_start)
+);
+
+-- Highest metrics.id already folded into metrics_rollup
+CREATE TABLE IF NOT EXISTS rollup_state (
+  name TEXT PRIMARY KEY,
+  last_id BIGINT NOT NULL
+);
+
+-- Window summaries from agents in summary mode (client/aggregate.py), one row
+-- per window and metric. The ingest server also writes each window's means
+-- into metrics, so everything reading raw rows keeps working.
+CREATE TABLE IF NOT EXISTS metrics_summary (
+  node_id TEXT NOT NULL,
+  metric TEXT NOT NULL,
+  window_start BIGINT NOT NULL, -- ms since epoch
+  window_end BIGINT NOT NULL,   -- ms since epoch, last sample in the window
+  samples INTEGER NOT NULL,
+  lost_samples INTEGER NOT NULL,
+  count INTEGER NOT NULL,
+  min DOUBLE PRECISION,
+  max DOUBLE PRECISION,
+  mean DOUBLE PRECISION,
+  p95 DOUBLE PRECISION,
+  PRIMARY KEY (node_id, metric, window_start)
+);
+
+-- 4) Partition maintenance
+CREATE OR REPLACE FUNCTION metrics_day_ms(d DATE) RETURNS BIGINT AS $$
+  SELECT (extract(epoch FROM d::timestamp) * 1000)::BIGINT;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create the daily partitions for [from_day, to_day]; returns how many were new.
+CREATE OR REPLACE FUNCTION metrics_ensure_partitions(from_day DATE, to_day DATE) RETURNS INTEGER AS $$
+DECLARE
+  d DATE;
+  part TEXT;
+  lo BIGINT;
+  hi BIGINT;
+  created INTEGER := 0;
+BEGIN
+  FOR d IN SELECT generate_series(from_day, to_day, interval '1 day')::DATE LOOP
+    part := 'metrics_p' || to_char(d, 'YYYYMMDD');
+    CONTINUE WHEN to_regclass(part) IS NOT NULL;
+    lo := metrics_day_ms(d);
+    hi := metrics_day_ms(d + 1);
+
+    -- Rows for this day that already landed in the default partition would
+    -- block the new partition; park them, create it, then put them back.
+    IF to_regclass('pg_temp.metrics_moving') IS NULL THEN
+      CREATE TEMP TABLE metrics_moving (LIKE metrics) ON COMMIT DROP;
+    END IF;
+    WITH moved AS (
+      DELETE FROM metrics_default WHERE timestamp >= lo AND timestamp < hi RETURNING *
+    )
+    INSERT INTO metrics_moving SELECT * FROM moved;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF metrics FOR VALUES FROM (%s) TO (%s)', part, lo, hi);
+    -- These rows are not new: keep metrics_insert_notify from broadcasting them.
+    -- The row trigger is cloned onto every partition, so inserting into the
+    -- partition directly would fire it too.
+    PERFORM set_config('metrics.skip_notify', 'on', true);
+    INSERT INTO metrics SELECT * FROM metrics_moving;
+    PERFORM set_config('metrics.skip_notify', 'off', true);
+    TRUNCATE metrics_moving;
+    created := created + 1;
+  END LOOP;
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop daily partitions that ended more than raw_days ago, and 1-minute rollups
+-- older than minute_days (1-hour rollups are kept). A partition is only dropped
+-- once the rollup worker has folded all of its rows, so old raw data is always
+-- downsampled before it goes. Window summaries follow the raw retention.
+-- Returns the names of the dropped partitions.
+CREATE OR REPLACE FUNCTION metrics_apply_retention(raw_days INTEGER, minute_days INTEGER) RETURNS TEXT[] AS $$
+DECLARE
+  cutoff BIGINT := metrics_day_ms(current_date - raw_days);
+  folded BIGINT;
+  part RECORD;
+  max_id BIGINT;
+  dropped TEXT[] := '{}';
+BEGIN
+  SELECT last_id INTO folded FROM rollup_state WHERE name = 'metrics';
+  IF folded IS NULL THEN
+    RETURN dropped;
+  END IF;
+
+  FOR part IN
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'metrics'::regclass AND c.relname ~ '^metrics_p[0-9]{8}$'
+    ORDER BY c.relname
+  LOOP
+    CONTINUE WHEN metrics_day_ms(to_date(substr(part.relname, 10), 'YYYYMMDD') + 1) > cutoff;
+    EXECUTE format('SELECT max(id) FROM %I', part.relname) INTO max_id;
+    CONTINUE WHEN max_id > folded;
+    EXECUTE format('DROP TABLE %I', part.relname);
+    dropped := dropped || part.relname::TEXT;
+  END LOOP;
+
+  DELETE FROM metrics_default WHERE timestamp < cutoff AND id <= folded;
+  DELETE FROM metrics_rollup
+  WHERE resolution_s = 60 AND bucket_start < metrics_day_ms(current_date - minute_days);
+  DELETE FROM metrics_summary WHERE window_start < cutoff;
+  RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 5) Copy rows from the old table (normalizing second timestamps to ms), then drop it
+DO $$
+DECLARE
+  first_day DATE;
+  last_day DATE;
+BEGIN
+  IF to_regclass('metrics_legacy') IS NULL THEN
+    RETURN;
+  END IF;
+  -- UTC days, like metrics_day_ms and the partition bounds, whatever the session time zone
+  SELECT
+    (to_timestamp(min(CASE WHEN timestamp > 1000000000000 THEN timestamp / 1000 ELSE timestamp END)) AT TIME ZONE 'UTC')::DATE,
+    (to_timestamp(max(CASE WHEN timestamp > 1000000000000 THEN timestamp / 1000 ELSE timestamp END)) AT TIME ZONE 'UTC')::DATE
+  INTO first_day, last_day
+  FROM metrics_legacy;
+  IF first_day IS NOT NULL AND last_day - first_day <= 366 THEN
+    PERFORM metrics_ensure_partitions(first_day, last_day);
+  END IF;
+
+  INSERT INTO metrics (id, node_id, latency, jitter, packet_loss, bandwidth, timestamp)
+  SELECT id, node_id, latency, jitter, packet_loss, bandwidth,
+         CASE WHEN timestamp > 1000000000000 THEN timestamp ELSE timestamp * 1000 END
+  FROM metrics_legacy;
+  PERFORM setval('metrics_id_seq', GREATEST((SELECT max(id) FROM metrics), 1));
+  DROP TABLE metrics_legacy;
+END $$;
+
+-- Partitions for yesterday through the next few days; the rollup worker keeps this rolling
+SELECT metrics_ensure_partitions(current_date - 1, current_date + 3);
+
+-- 6) Push every new row to listeners (the dashboard's in-memory hot tier).
+-- Created after the legacy copy so migrated rows are not broadcast.
+-- metrics_ensure_partitions sets metrics.skip_notify while it moves parked rows.
+CREATE OR REPLACE FUNCTION notify_metrics_insert() RETURNS trigger AS $$
+BEGIN
+  IF current_setting('metrics.skip_notify', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  PERFORM pg_notify('metrics_insert', json_build_object(
+    'node_id', NEW.node_id,
+    'latency', NEW.latency,
+    'jitter', NEW.jitter,
+    'packet_loss', NEW.packet_loss,
+    'bandwidth', NEW.bandwidth,
+    'timestamp', NEW.timestamp
+  )::text);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER metrics_insert_notify
+  AFTER INSERT ON metrics
+  FOR EACH ROW EXECUTE FUNCTION notify_metrics_insert();
+
+-- 7) Ids for dashboard SSE events. Every gunicorn worker publishes through
+-- NOTIFY (dashboard/bus.py) and numbers events from this sequence, so a browser's
+-- Last-Event-ID means the same thing on whichever worker it reconnects to.
+CREATE SEQUENCE IF NOT EXISTS dashboard_event_id;
@@ -2,11 +2,38 @@ package db
 
 import (
 	"database/sql"
+	"os"
+	"strconv"
+	"time"
 
 	_ "github.com/lib/pq"
 )
 
+const defaultConnStr = "postgres://admin:admin@db:5432/metrics?sslmode=disable"
+
+// Connect opens the process-wide connection pool. Call it once at startup and
+// share the returned *sql.DB; it is safe for concurrent use.
 func Connect() (*sql.DB, error) {
-	connStr := "postgres://admin:admin@db:5432/metrics?sslmode=disable"
-	return sql.Open("postgres", connStr)
-}
\ No newline at end of file
+	connStr := os.Getenv("DATABASE_URL")
+	if connStr == "" {
+		connStr = defaultConnStr
+	}
+	conn, err := sql.Open("postgres", connStr)
+	if err != nil {
+		return nil, err
+	}
+
+	maxConns := envInt("DB_MAX_CONNS", 8)
+	conn.SetMaxOpenConns(maxConns)
+	conn.SetMaxIdleConns(maxConns)
+	conn.SetConnMaxIdleTime(5 * time.Minute)
+	conn.SetConnMaxLifetime(30 * time.Minute)
+	return conn, nil
+}
+
+func envInt(key string, fallback int) int {
+	if v, err := strconv.Atoi(os.Getenv(key)); err == nil && v > 0 {
+		return v
+	}
+	return fallback
+}
@@ -0,0 +1,202 @@
+package ingest
+
+import (
+	"context"
+	"database/sql"
+	"errors"
+	"log"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	pb "ECNetworkProject/server/pkg/api/proto"
+)
+
+var (
+	// ErrOverloaded is returned when the write queue stayed full for EnqueueTimeout,
+	// i.e. the database is not keeping up with the offered load.
+	ErrOverloaded = errors.New("ingest: write queue full")
+	ErrClosed     = errors.New("ingest: batcher closed")
+)
+
+type BatcherConfig struct {
+	MaxRows        int           // flush as soon as this many rows are pending
+	MaxDelay       time.Duration // ... or when the oldest pending row has waited this long
+	QueueSize      int           // submissions buffered ahead of the flushers
+	Flushers       int           // concurrent flushes, i.e. pool connections used for writes
+	EnqueueTimeout time.Duration // how long Submit blocks on a full queue before giving up
+}
+
+func DefaultBatcherConfig() BatcherConfig {
+	return BatcherConfig{
+		MaxRows:        500,
+		MaxDelay:       20 * time.Millisecond,
+		QueueSize:      1024,
+		Flushers:       2,
+		EnqueueTimeout: 2 * time.Second,
+	}
+}
+
+type submission struct {
+	rows []*pb.MetricsRequest
+	done chan error
+}
+
+// Batcher is a write-behind buffer in front of the metrics table. Concurrent
+// Submit calls are grouped into one multi-row INSERT per flush; each caller
+// still waits for its own rows to commit, so an OK response means stored.
+// When flushes fall behind, the bounded queue fills up and Submit blocks, then
+// fails with ErrOverloaded, pushing back on clients instead of growing memory.
+type Batcher struct {
+	conn  *sql.DB
+	cfg   BatcherConfig
+	queue chan submission
+	wg    sync.WaitGroup
+
+	mu     sync.RWMutex
+	closed bool
+
+	flushes  atomic.Int64
+	rows     atomic.Int64
+	failures atomic.Int64
+	rejected atomic.Int64
+}
+
+func NewBatcher(conn *sql.DB, cfg BatcherConfig) *Batcher {
+	def := DefaultBatcherConfig()
+	if cfg.MaxRows <= 0 {
+		cfg.MaxRows = def.MaxRows
+	}
+	if cfg.MaxDelay <= 0 {
+		cfg.MaxDelay = def.MaxDelay
+	}
+	if cfg.QueueSize <= 0 {
+		cfg.QueueSize = def.QueueSize
+	}
+	if cfg.Flushers <= 0 {
+		cfg.Flushers = def.Flushers
+	}
+	if cfg.EnqueueTimeout <= 0 {
+		cfg.EnqueueTimeout = def.EnqueueTimeout
+	}
+
+	b := &Batcher{conn: conn, cfg: cfg, queue: make(chan submission, cfg.QueueSize)}
+	for i := 0; i < cfg.Flushers; i++ {
+		b.wg.Add(1)
+		go b.run()
+	}
+	return b
+}
+
+// Submit queues rows for the next flush and waits until they are committed.
+func (b *Batcher) Submit(ctx context.Context, rows []*pb.MetricsRequest) error {
+	if len(rows) == 0 {
+		return nil
+	}
+	s := submission{rows: rows, done: make(chan error, 1)}
+
+	b.mu.RLock()
+	if b.closed {
+		b.mu.RUnlock()
+		return ErrClosed
+	}
+	timer := time.NewTimer(b.cfg.EnqueueTimeout)
+	select {
+	case b.queue <- s:
+		timer.Stop()
+	case <-timer.C:
+		b.mu.RUnlock()
+		b.rejected.Add(1)
+		return ErrOverloaded
+	case <-ctx.Done():
+		timer.Stop()
+		b.mu.RUnlock()
+		return ctx.Err()
+	}
+	b.mu.RUnlock()
+
+	select {
+	case err := <-s.done:
+		return err
+	case <-ctx.Done():
+		// The rows may still be written; the client will see a retryable error.
+		return ctx.Err()
+	}
+}
+
+func (b *Batcher) run() {
+	defer b.wg.Done()
+	for {
+		first, ok := <-b.queue
+		if !ok {
+			return
+		}
+		batch := []submission{first}
+		pending := len(first.rows)
+
+		timer := time.NewTimer(b.cfg.MaxDelay)
+	collect:
+		for pending < b.cfg.MaxRows {
+			select {
+			case s, ok := <-b.queue:
+				if !ok {
+					break collect
+				}
+				batch = append(batch, s)
+				pending += len(s.rows)
+			case <-timer.C:
+				break collect
+			}
+		}
+		timer.Stop()
+		b.flush(batch, pending)
+	}
+}
+
+func (b *Batcher) flush(batch []submission, pending int) {
+	rows := make([]*pb.MetricsRequest, 0, pending)
+	for _, s := range batch {
+		rows = append(rows, s.rows...)
+	}
+
+	err := StoreBatch(b.conn, rows)
+	b.flushes.Add(1)
+	if err != nil {
+		b.failures.Add(1)
+		log.Printf("flush of %d rows (%d submissions) failed: %v", len(rows), len(batch), err)
+	} else {
+		b.rows.Add(int64(len(rows)))
+	}
+	for _, s := range batch {
+		s.done <- err
+	}
+}
+
+// Close stops accepting submissions and returns once everything queued is flushed.
+func (b *Batcher) Close() {
+	b.mu.Lock()
+	if !b.closed {
+		b.closed = true
+		close(b.queue)
+	}
+	b.mu.Unlock()
+	b.wg.Wait()
+}
+
+type BatcherStats struct {
+	Flushes  int64
+	Rows     int64
+	Failures int64
+	Rejected int64
+	Queued   int
+}
+
+func (b *Batcher) Stats() BatcherStats {
+	return BatcherStats{
+		Flushes:  b.flushes.Load(),
+		Rows:     b.rows.Load(),
+		Failures: b.failures.Load(),
+		Rejected: b.rejected.Load(),
+		Queued:   len(b.queue),
+	}
+}
@@ -1,22 +1,64 @@
 package ingest
 
 import (
-	"ECNetworkProject/server/pkg/db"
+	"database/sql"
+	"fmt"
+	"strings"
+
 	pb "ECNetworkProject/server/pkg/api/proto"
 )
 
-func StoreMetrics(req *pb.MetricsRequest) error {
-	conn, err := db.Connect()
+// Agents and test tools report milliseconds, as does storage (and its daily
+// partitions). Agents from before that sent seconds, and their spools may still
+// replay them: anything below this is taken as seconds.
+const msThreshold = 1_000_000_000_000
+
+// Postgres caps a statement at 65535 bind parameters; 6 per row keeps us well below.
+const maxRowsPerInsert = 1000
+
+// StoreBatch writes all entries with multi-row INSERTs inside one transaction,
+// so a batch is either stored completely or not at all.
+func StoreBatch(conn *sql.DB, reqs []*pb.MetricsRequest) error {
+	if len(reqs) == 0 {
+		return nil
+	}
+
+	tx, err := conn.Begin()
 	if err != nil {
 		return err
 	}
-	defer conn.Close()
+	for start := 0; start < len(reqs); start += maxRowsPerInsert {
+		end := start + maxRowsPerInsert
+		if end > len(reqs) {
+			end = len(reqs)
+		}
+		query, args := buildInsert(reqs[start:end])
+		if _, err := tx.Exec(query, args...); err != nil {
+			tx.Rollback()
+			return err
+		}
+	}
+	return tx.Commit()
+}
 
-	_, err = conn.Exec(
-		`INSERT INTO metrics (node_id, latency, jitter, packet_loss, bandwidth, timestamp)
-		 VALUES ($1,$2,$3,$4,$5,$6)`,
-		req.NodeId, req.Latency, req.Jitter, req.PacketLoss, req.Bandwidth, req.Timestamp,
-	)
+func buildInsert(reqs []*pb.MetricsRequest) (string, []interface{}) {
+	var sb strings.Builder
+	sb.WriteString(`INSERT INTO metrics (node_id, latency, jitter, packet_loss, bandwidth, timestamp) VALUES `)
+	args := make([]interface{}, 0, len(reqs)*6)
+	for i, r := range reqs {
+		if i > 0 {
+			sb.WriteByte(',')
+		}
+		n := i * 6
+		fmt.Fprintf(&sb, "($%d,$%d,$%d,$%d,$%d,$%d)", n+1, n+2, n+3, n+4, n+5, n+6)
+		args = append(args, r.NodeId, r.Latency, r.Jitter, r.PacketLoss, r.Bandwidth, timestampMs(r.Timestamp))
+	}
+	return sb.String(), args
+}
 
-	return err
-}
\ No newline at end of file
+func timestampMs(ts int64) int64 {
+	if ts < msThreshold {
+		return ts * 1000
+	}
+	return ts
+}
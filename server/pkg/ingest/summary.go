@@ -0,0 +1,155 @@
+package ingest
+
+import (
+	"database/sql"
+	"fmt"
+	"strings"
+
+	pb "ECNetworkProject/server/pkg/api/proto"
+)
+
+// 4 metrics x 11 parameters per summary keeps a statement under the bind limit (65535)
+const maxSummariesPerInsert = 1000
+
+type summaryKey struct {
+	node  string
+	start int64
+}
+
+// StoreSummaries writes agent window summaries into metrics_summary and one
+// representative row per window (the means, at the window's last sample) into
+// metrics, so charts, rollups and the hot tier keep working for pods in summary
+// mode. A metric the window never measured (no bandwidth result yet) gets no
+// metrics_summary row and a NULL in metrics. A replayed window is ignored, which
+// makes retries safe. All or nothing.
+func StoreSummaries(conn *sql.DB, sums []*pb.MetricsSummary) (int, error) {
+	if len(sums) == 0 {
+		return 0, nil
+	}
+
+	tx, err := conn.Begin()
+	if err != nil {
+		return 0, err
+	}
+	stored := 0
+	for start := 0; start < len(sums); start += maxSummariesPerInsert {
+		end := start + maxSummariesPerInsert
+		if end > len(sums) {
+			end = len(sums)
+		}
+		chunk := sums[start:end]
+
+		query, args := buildSummaryInsert(chunk)
+		rows, err := tx.Query(query, args...)
+		if err != nil {
+			tx.Rollback()
+			return 0, err
+		}
+		fresh := make(map[summaryKey]bool)
+		for rows.Next() {
+			var k summaryKey
+			if err := rows.Scan(&k.node, &k.start); err != nil {
+				rows.Close()
+				tx.Rollback()
+				return 0, err
+			}
+			fresh[k] = true
+		}
+		if err := rows.Err(); err != nil {
+			tx.Rollback()
+			return 0, err
+		}
+
+		reps := make([]*pb.MetricsSummary, 0, len(fresh))
+		for _, s := range chunk {
+			k := summaryKey{s.NodeId, timestampMs(s.WindowStart)}
+			if !fresh[k] {
+				continue
+			}
+			delete(fresh, k) // a window repeated inside one batch is stored once
+			reps = append(reps, s)
+		}
+		if len(reps) > 0 {
+			query, args := buildRepresentativeInsert(reps)
+			if _, err := tx.Exec(query, args...); err != nil {
+				tx.Rollback()
+				return 0, err
+			}
+		}
+		stored += len(reps)
+	}
+	if err := tx.Commit(); err != nil {
+		return 0, err
+	}
+	return stored, nil
+}
+
+func buildSummaryInsert(sums []*pb.MetricsSummary) (string, []interface{}) {
+	var sb strings.Builder
+	sb.WriteString(`INSERT INTO metrics_summary
+		(node_id, window_start, window_end, samples, lost_samples, metric, count, min, max, mean, p95) VALUES `)
+	args := make([]interface{}, 0, len(sums)*4*11)
+	n := 0
+	for _, s := range sums {
+		for _, m := range summaryMetrics(s) {
+			if n > 0 {
+				sb.WriteByte(',')
+			}
+			fmt.Fprintf(&sb, "($%d,$%d,$%d,$%d,$%d,$%d,$%d,$%d,$%d,$%d,$%d)",
+				n+1, n+2, n+3, n+4, n+5, n+6, n+7, n+8, n+9, n+10, n+11)
+			st := m.stats
+			args = append(args, s.NodeId, timestampMs(s.WindowStart), timestampMs(s.WindowEnd),
+				s.Samples, s.LostSamples, m.name, st.GetCount(), st.GetMin(), st.GetMax(), st.GetMean(), st.GetP95())
+			n += 11
+		}
+	}
+	sb.WriteString(` ON CONFLICT (node_id, metric, window_start) DO NOTHING
+		RETURNING node_id, window_start`)
+	return `WITH ins AS (` + sb.String() + `) SELECT DISTINCT node_id, window_start FROM ins`, args
+}
+
+type namedStats struct {
+	name  string
+	stats *pb.MetricStats
+}
+
+// summaryMetrics lists the metrics the window measured at least once.
+func summaryMetrics(s *pb.MetricsSummary) []namedStats {
+	all := []namedStats{
+		{"latency", s.Latency},
+		{"jitter", s.Jitter},
+		{"packet_loss", s.PacketLoss},
+		{"bandwidth", s.Bandwidth},
+	}
+	measured := all[:0]
+	for _, m := range all {
+		if m.stats.GetCount() > 0 {
+			measured = append(measured, m)
+		}
+	}
+	return measured
+}
+
+func buildRepresentativeInsert(sums []*pb.MetricsSummary) (string, []interface{}) {
+	var sb strings.Builder
+	sb.WriteString(`INSERT INTO metrics (node_id, latency, jitter, packet_loss, bandwidth, timestamp) VALUES `)
+	args := make([]interface{}, 0, len(sums)*6)
+	for i, s := range sums {
+		if i > 0 {
+			sb.WriteByte(',')
+		}
+		n := i * 6
+		fmt.Fprintf(&sb, "($%d,$%d,$%d,$%d,$%d,$%d)", n+1, n+2, n+3, n+4, n+5, n+6)
+		args = append(args, s.NodeId, windowMean(s.Latency), windowMean(s.Jitter), windowMean(s.PacketLoss),
+			windowMean(s.Bandwidth), timestampMs(s.WindowEnd))
+	}
+	return sb.String(), args
+}
+
+// windowMean is the window's mean of one metric, or NULL if it was never measured.
+func windowMean(st *pb.MetricStats) interface{} {
+	if st.GetCount() == 0 {
+		return nil
+	}
+	return st.GetMean()
+}
@@ -0,0 +1,225 @@
+package query
+
+import (
+	"context"
+	"database/sql"
+	"encoding/base64"
+	"errors"
+	"fmt"
+	"math"
+	"strconv"
+	"strings"
+
+	"github.com/lib/pq"
+
+	pb "ECNetworkProject/server/pkg/api/proto"
+)
+
+const (
+	DefaultPageSize = 1000
+	MaxPageSize     = 10000
+)
+
+var ErrBadToken = errors.New("invalid resume token")
+
+// Cursor is a position in (node_id, timestamp, id) order; a page starts at the
+// first row after it. Bucketed pages point at the start of the next bucket with
+// ID 0, which the first row of that bucket is always after.
+type Cursor struct {
+	Node      string
+	Timestamp int64
+	ID        int64
+}
+
+// Token encodes the cursor as an opaque, URL-safe string.
+func (c *Cursor) Token() string {
+	raw := strconv.FormatInt(c.Timestamp, 10) + ":" + strconv.FormatInt(c.ID, 10) + ":" + c.Node
+	return base64.RawURLEncoding.EncodeToString([]byte(raw))
+}
+
+// ParseToken reverses Token. An empty token means "from the start" (nil).
+func ParseToken(token string) (*Cursor, error) {
+	if token == "" {
+		return nil, nil
+	}
+	raw, err := base64.RawURLEncoding.DecodeString(token)
+	if err != nil {
+		return nil, ErrBadToken
+	}
+	parts := strings.SplitN(string(raw), ":", 3)
+	if len(parts) != 3 {
+		return nil, ErrBadToken
+	}
+	ts, err1 := strconv.ParseInt(parts[0], 10, 64)
+	id, err2 := strconv.ParseInt(parts[1], 10, 64)
+	if err1 != nil || err2 != nil {
+		return nil, ErrBadToken
+	}
+	return &Cursor{Node: parts[2], Timestamp: ts, ID: id}, nil
+}
+
+// Fetch describes one FetchMetrics request.
+type Fetch struct {
+	Nodes    []string // empty: every node
+	From     int64    // ms, inclusive
+	To       int64    // ms, inclusive
+	PageSize int
+	BucketMs int64 // > 0: per-node means of each interval instead of raw rows
+}
+
+// FromRequest validates req and fills in the defaults.
+func FromRequest(req *pb.FetchRequest) (Fetch, error) {
+	f := Fetch{From: req.FromMs, To: req.ToMs, PageSize: int(req.PageSize), BucketMs: req.BucketMs}
+	if req.NodeId != "" {
+		f.Nodes = append(f.Nodes, req.NodeId)
+	}
+	f.Nodes = append(f.Nodes, req.NodeIds...)
+	if f.To == 0 {
+		f.To = math.MaxInt64
+	}
+	if f.To < f.From {
+		return f, fmt.Errorf("to_ms %d is before from_ms %d", f.To, f.From)
+	}
+	if f.BucketMs < 0 {
+		return f, fmt.Errorf("bucket_ms must not be negative")
+	}
+	if f.PageSize <= 0 {
+		f.PageSize = DefaultPageSize
+	}
+	if f.PageSize > MaxPageSize {
+		f.PageSize = MaxPageSize
+	}
+	return f, nil
+}
+
+// Page returns up to PageSize entries after cur (nil: from the start) and the
+// cursor to continue from, or nil once the range is exhausted. Every page is
+// its own keyset query on the (node_id, timestamp) index, so neither side holds
+// more than a page and no transaction stays open between pages.
+func (f Fetch) Page(ctx context.Context, conn *sql.DB, cur *Cursor) ([]*pb.Metrics, *Cursor, error) {
+	if f.BucketMs > 0 {
+		return f.bucketPage(ctx, conn, cur)
+	}
+	where, args := f.where(cur)
+	args = append(args, f.PageSize+1)
+	rows, err := conn.QueryContext(ctx, fmt.Sprintf(`
+		SELECT id, node_id, latency, jitter, packet_loss, bandwidth, timestamp
+		FROM metrics
+		WHERE %s
+		ORDER BY node_id, timestamp, id
+		LIMIT $%d`, where, len(args)), args...)
+	if err != nil {
+		return nil, nil, err
+	}
+	defer rows.Close()
+
+	entries := make([]*pb.Metrics, 0, f.PageSize)
+	var last Cursor
+	more := false
+	for rows.Next() {
+		if len(entries) == f.PageSize {
+			more = true // the extra row only tells us another page exists
+			break
+		}
+		m := &pb.Metrics{}
+		if err := rows.Scan(&last.ID, &m.NodeId, &m.Latency, &m.Jitter, &m.PacketLoss, &m.Bandwidth, &m.Timestamp); err != nil {
+			return nil, nil, err
+		}
+		last.Node, last.Timestamp = m.NodeId, m.Timestamp
+		entries = append(entries, m)
+	}
+	if err := rows.Err(); err != nil {
+		return nil, nil, err
+	}
+	if !more {
+		return entries, nil, nil
+	}
+	return entries, &last, nil
+}
+
+// bucketPage aggregates one node's buckets, starting at the first row after
+// cur and covering at most PageSize buckets, so a page is one bounded index
+// range scan. Sparse data gives pages with fewer entries, never empty ones.
+func (f Fetch) bucketPage(ctx context.Context, conn *sql.DB, cur *Cursor) ([]*pb.Metrics, *Cursor, error) {
+	first, err := f.seek(ctx, conn, cur)
+	if err != nil || first == nil {
+		return nil, nil, err
+	}
+	start := first.Timestamp - first.Timestamp%f.BucketMs
+	end := start + f.BucketMs*int64(f.PageSize)
+	if end < start { // overflow near MaxInt64
+		end = math.MaxInt64
+	}
+
+	rows, err := conn.QueryContext(ctx, `
+		SELECT timestamp - timestamp % $4 AS bucket,
+			avg(latency), avg(jitter), avg(packet_loss), avg(bandwidth)
+		FROM metrics
+		WHERE node_id = $1 AND timestamp >= $2 AND timestamp < $3
+			AND timestamp >= $5 AND timestamp <= $6
+		GROUP BY bucket
+		ORDER BY bucket`, first.Node, start, end, f.BucketMs, f.From, f.To)
+	if err != nil {
+		return nil, nil, err
+	}
+	defer rows.Close()
+
+	var entries []*pb.Metrics
+	for rows.Next() {
+		m := &pb.Metrics{NodeId: first.Node}
+		var latency, jitter, loss, bandwidth sql.NullFloat64
+		if err := rows.Scan(&m.Timestamp, &latency, &jitter, &loss, &bandwidth); err != nil {
+			return nil, nil, err
+		}
+		m.Latency, m.Jitter, m.PacketLoss, m.Bandwidth = latency.Float64, jitter.Float64, loss.Float64, bandwidth.Float64
+		entries = append(entries, m)
+	}
+	if err := rows.Err(); err != nil {
+		return nil, nil, err
+	}
+
+	next := &Cursor{Node: first.Node, Timestamp: end}
+	if end == math.MaxInt64 {
+		next.Timestamp, next.ID = end, math.MaxInt64
+	}
+	// Look ahead so the last page goes out without a token
+	if more, err := f.seek(ctx, conn, next); err != nil || more == nil {
+		return entries, nil, err
+	}
+	return entries, next, nil
+}
+
+// seek finds the first row after cur in (node_id, timestamp, id) order.
+func (f Fetch) seek(ctx context.Context, conn *sql.DB, cur *Cursor) (*Cursor, error) {
+	where, args := f.where(cur)
+	var c Cursor
+	err := conn.QueryRowContext(ctx, fmt.Sprintf(`
+		SELECT node_id, timestamp, id
+		FROM metrics
+		WHERE %s
+		ORDER BY node_id, timestamp, id
+		LIMIT 1`, where), args...).Scan(&c.Node, &c.Timestamp, &c.ID)
+	if err == sql.ErrNoRows {
+		return nil, nil
+	}
+	if err != nil {
+		return nil, err
+	}
+	return &c, nil
+}
+
+func (f Fetch) where(cur *Cursor) (string, []interface{}) {
+	// A NULL node_id never compares greater than a cursor; leave those rows out from the start
+	conds := []string{"node_id IS NOT NULL", "timestamp >= $1", "timestamp <= $2"}
+	args := []interface{}{f.From, f.To}
+	if len(f.Nodes) > 0 {
+		args = append(args, pq.Array(f.Nodes))
+		conds = append(conds, fmt.Sprintf("node_id = ANY($%d)", len(args)))
+	}
+	if cur != nil {
+		args = append(args, cur.Node, cur.Timestamp, cur.ID)
+		n := len(args)
+		conds = append(conds, fmt.Sprintf("(node_id, timestamp, id) > ($%d, $%d, $%d)", n-2, n-1, n))
+	}
+	return strings.Join(conds, " AND "), args
+}
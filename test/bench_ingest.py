@@ -0,0 +1,79 @@
+import argparse
+import queue
+import random
+import time
+
+import grpc
+import metrics_pb2
+import metrics_pb2_grpc
+
+SERVER_ADDRESS = "server:50051"   # inside Docker compose network
+
+
+def make_request(i: int) -> metrics_pb2.MetricsRequest:
+    return metrics_pb2.MetricsRequest(
+        node_id="bench-node",
+        latency=random.uniform(10, 150),
+        jitter=random.uniform(0, 20),
+        packet_loss=random.uniform(0, 5),
+        bandwidth=random.uniform(5, 150),
+        timestamp=time.time_ns() // 1_000_000 + i,
+    )
+
+
+def bench_unary(stub, total: int) -> float:
+    start = time.perf_counter()
+    for i in range(total):
+        stub.SubmitMetrics(make_request(i))
+    return time.perf_counter() - start
+
+
+def bench_stream(stub, total: int, batch_size: int) -> float:
+    """One long-lived stream; each batch waits for its ack like the pod agent does."""
+    requests: "queue.Queue" = queue.Queue()
+
+    def request_iter():
+        while True:
+            batch = requests.get()
+            if batch is None:
+                return
+            yield batch
+
+    start = time.perf_counter()
+    acks = stub.SubmitMetricsStream(request_iter())
+    seq = 0
+    for offset in range(0, total, batch_size):
+        seq += 1
+        n = min(batch_size, total - offset)
+        requests.put(metrics_pb2.MetricsBatch(
+            seq=seq, entries=[make_request(offset + i) for i in range(n)]))
+        ack = next(acks)
+        if not ack.success:
+            raise RuntimeError(f"batch {ack.seq} rejected")
+    requests.put(None)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare unary vs streaming ingest throughput.")
+    parser.add_argument("--target", default=SERVER_ADDRESS)
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--batch-sizes", default="10,50,100,500")
+    args = parser.parse_args()
+
+    channel = grpc.insecure_channel(args.target)
+    stub = metrics_pb2_grpc.MetricsServiceStub(channel)
+
+    print(f"Ingest benchmark against {args.target} ({args.samples} samples per run)")
+    elapsed = bench_unary(stub, args.samples)
+    base = args.samples / elapsed
+    print(f"  unary SubmitMetrics          {base:10.0f} samples/s")
+
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        elapsed = bench_stream(stub, args.samples, size)
+        rate = args.samples / elapsed
+        print(f"  SubmitMetricsStream batch={size:<4d} {rate:10.0f} samples/s  ({rate / base:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import statistics
+import time
+
+import psycopg2
+
+DATABASE_URL = "postgresql://admin:admin@db:5432/metrics"   # inside Docker compose network
+
+# The dashboard, hot tier and chartgen queries, as issued before the partitioned
+# schema (--legacy) and now. Parameters: now_ms, node (a busy node), last_id.
+QUERIES = {
+    "latest per node (/api/pods fallback)": {
+        "legacy": """
+            WITH latest AS (
+                SELECT node_id, MAX(timestamp) AS ts FROM metrics GROUP BY node_id
+            )
+            SELECT m.node_id, m.latency, m.jitter, m.packet_loss, m.bandwidth, m.timestamp
+            FROM metrics m INNER JOIN latest l ON m.node_id = l.node_id AND m.timestamp = l.ts
+        """,
+        "current": """
+            WITH RECURSIVE nodes AS (
+                (SELECT node_id FROM metrics ORDER BY node_id LIMIT 1)
+                UNION ALL
+                SELECT (SELECT m.node_id FROM metrics m WHERE m.node_id > n.node_id
+                        ORDER BY m.node_id LIMIT 1)
+                FROM nodes n WHERE n.node_id IS NOT NULL
+            )
+            SELECT l.* FROM nodes n CROSS JOIN LATERAL (
+                SELECT node_id, latency, jitter, packet_loss, bandwidth, timestamp
+                FROM metrics m WHERE m.node_id = n.node_id
+                ORDER BY m.timestamp DESC LIMIT 1
+            ) l
+            WHERE n.node_id IS NOT NULL
+        """,
+    },
+    "hot tier load (3600/node)": {
+        "legacy": """
+            SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth
+            FROM (
+                SELECT m.*, row_number() OVER (PARTITION BY node_id ORDER BY timestamp DESC) AS rn
+                FROM metrics m
+            ) recent
+            WHERE rn <= 3600 ORDER BY timestamp ASC
+        """,
+        "current": """
+            WITH RECURSIVE nodes AS (
+                (SELECT node_id FROM metrics ORDER BY node_id LIMIT 1)
+                UNION ALL
+                SELECT (SELECT m.node_id FROM metrics m WHERE m.node_id > n.node_id
+                        ORDER BY m.node_id LIMIT 1)
+                FROM nodes n WHERE n.node_id IS NOT NULL
+            )
+            SELECT r.* FROM nodes n CROSS JOIN LATERAL (
+                SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth
+                FROM metrics m WHERE m.node_id = n.node_id
+                ORDER BY m.timestamp DESC LIMIT 3600
+            ) r
+            WHERE n.node_id IS NOT NULL
+            ORDER BY r.timestamp ASC
+        """,
+    },
+    "/api/metrics 1 h, one node": {
+        "legacy": """
+            SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth FROM metrics
+            WHERE (timestamp BETWEEN %(now_ms)s - 3600000 AND %(now_ms)s
+                   OR timestamp BETWEEN %(now_ms)s / 1000 - 3600 AND %(now_ms)s / 1000)
+              AND node_id = ANY(ARRAY[%(node)s])
+            ORDER BY node_id, timestamp
+        """,
+        "current": """
+            SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth FROM metrics
+            WHERE timestamp BETWEEN %(now_ms)s - 3600000 AND %(now_ms)s
+              AND node_id = ANY(ARRAY[%(node)s])
+            ORDER BY node_id, timestamp
+        """,
+    },
+    "/api/metrics 24 h, all nodes": {
+        "legacy": """
+            SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth FROM metrics
+            WHERE (timestamp BETWEEN %(now_ms)s - 86400000 AND %(now_ms)s
+                   OR timestamp BETWEEN %(now_ms)s / 1000 - 86400 AND %(now_ms)s / 1000)
+            ORDER BY node_id, timestamp
+        """,
+        "current": """
+            SELECT node_id, timestamp, latency, jitter, packet_loss, bandwidth FROM metrics
+            WHERE timestamp BETWEEN %(now_ms)s - 86400000 AND %(now_ms)s
+            ORDER BY node_id, timestamp
+        """,
+    },
+    "chartgen poll (no new rows)": {
+        "legacy": """
+            SELECT id, node_id, timestamp, latency, jitter, packet_loss, bandwidth
+            FROM metrics WHERE id > %(last_id)s ORDER BY id DESC LIMIT 5000
+        """,
+        "current": """
+            SELECT id, node_id, timestamp, latency, jitter, packet_loss, bandwidth
+            FROM metrics WHERE id > %(last_id)s ORDER BY id DESC LIMIT 5000
+        """,
+    },
+}
+
+
+def run(cur, sql: str, params: dict, repeat: int):
+    cur.execute(sql, params)  # warm the cache and the plan
+    rows = len(cur.fetchall())
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return rows, statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the dashboard/chartgen queries against a metrics database.")
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy", action="store_true",
+                        help="use the pre-partitioning query forms (for the unpartitioned schema)")
+    parser.add_argument("--node", default="podOne")
+    args = parser.parse_args()
+
+    with psycopg2.connect(args.dsn) as conn, conn.cursor() as cur:
+        cur.execute("SELECT count(*), COALESCE(max(id), 0) FROM metrics")
+        total, last_id = cur.fetchone()
+        cur.execute("SELECT max(timestamp) FROM metrics WHERE timestamp > 1000000000000")
+        now_ms = cur.fetchone()[0] or int(time.time() * 1000)
+        params = {"now_ms": now_ms, "node": args.node, "last_id": last_id}
+
+        variant = "legacy" if args.legacy else "current"
+        print(f"{variant} queries, {total} rows, median/max of {args.repeat} runs")
+        for name, forms in QUERIES.items():
+            rows, median_ms, max_ms = run(cur, forms[variant], params, args.repeat)
+            print(f"  {name:<38} {median_ms:9.1f} ms {max_ms:9.1f} ms  ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
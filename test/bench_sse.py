@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+DASHBOARD_URL = "http://localhost:8080"
+
+
+def split_url(url: str) -> Tuple[str, int]:
+    hostport = url.split("://", 1)[-1].rstrip("/")
+    host, _, port = hostport.partition(":")
+    return host, int(port or 80)
+
+
+async def http_get(host: str, port: int, path: str) -> Tuple[int, bytes]:
+    """One-shot HTTP/1.0 GET; the server closes the connection after the body."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), body
+
+
+async def subscribe(host: str, port: int, path: str, received: Dict[int, int], idx: int,
+                    connected: asyncio.Event, stop: asyncio.Event):
+    """Holds one SSE stream open and counts the data frames it receives."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(f"{path}: {status.decode().strip()}")
+        connected.set()
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b"data:"):
+                received[idx] += 1
+    finally:
+        writer.close()
+
+
+async def time_pods(host: str, port: int, seconds: float, rate: float,
+                    timeout: float) -> Tuple[List[float], int]:
+    """GET /api/pods at `rate` per second for `seconds`; returns latencies (ms) and errors (incl. timeouts)."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(http_get(host, port, "/api/pods"), timeout)
+        except (OSError, asyncio.TimeoutError):
+            errors += 1
+            return
+        if status != 200:
+            errors += 1
+            return
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    tasks = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+    return latencies, errors
+
+
+async def publish(host: str, port: int, interval: float, stop: asyncio.Event) -> int:
+    """Plays chartgen: announce a chart update every `interval` seconds."""
+    sent = 0
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(http_get(host, port, "/event/chart-updated"), interval * 5)
+            sent += 1
+        except (OSError, asyncio.TimeoutError):
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+    return sent
+
+
+def summarize(latencies: List[float]) -> str:
+    if not latencies:
+        return "no successful requests"
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return f"p50 {q[49]:7.1f} ms  p95 {q[94]:7.1f} ms  p99 {q[98]:7.1f} ms  max {max(latencies):7.1f} ms  (n={len(latencies)})"
+
+
+async def run(args) -> int:
+    host, port = split_url(args.url)
+    # First requests start the dashboard's background workers; keep that out of the numbers
+    await http_get(host, port, "/api/pods")
+    await asyncio.sleep(args.warmup)
+
+    print(f"baseline: /api/pods at {args.rate:g}/s for {args.seconds:g}s, no subscribers")
+    base, base_errors = await time_pods(host, port, args.seconds, args.rate, args.timeout)
+    print(f"  {summarize(base)}  errors {base_errors}")
+
+    stop = asyncio.Event()
+    received = {i: 0 for i in range(args.subscribers)}
+    paths = {}
+    events: List[asyncio.Event] = []
+    subs = []
+    opened = time.perf_counter()
+    for i in range(args.subscribers):
+        connected = asyncio.Event()
+        events.append(connected)
+        path = "/logs" if args.logs_share and i % args.logs_share == 0 else "/events"
+        paths[i] = path
+        subs.append(asyncio.create_task(subscribe(host, port, path, received, i, connected, stop)))
+    waiting = [asyncio.create_task(e.wait()) for e in events]
+    done, pending = await asyncio.wait(waiting, timeout=30)
+    for p in pending:
+        p.cancel()
+    print(f"{len(done)}/{args.subscribers} subscribers connected in {time.perf_counter() - opened:.1f}s")
+
+    publisher = asyncio.create_task(publish(host, port, args.publish_interval, stop))
+    print(f"loaded: same /api/pods load, chart update every {args.publish_interval:g}s")
+    loaded, loaded_errors = await time_pods(host, port, args.seconds, args.rate, args.timeout)
+    print(f"  {summarize(loaded)}  errors {loaded_errors}")
+
+    try:
+        status, body = await asyncio.wait_for(http_get(host, port, "/api/stats"), args.timeout)
+    except asyncio.TimeoutError:
+        status, body = 0, b""
+    stop.set()
+    published = await publisher
+    for task in subs:
+        task.cancel()
+    await asyncio.gather(*subs, return_exceptions=True)
+
+    print(f"published {published} chart updates")
+    for path in sorted(set(paths.values())):
+        counts = sorted(n for i, n in received.items() if paths[i] == path)
+        print(f"  {path}: {len(counts)} streams, frames per stream "
+              f"min {counts[0]}, median {counts[len(counts) // 2]}, max {counts[-1]}")
+    if status == 200:
+        sse: Optional[dict] = json.loads(body).get("sse")
+        print(f"server view: {sse}")
+
+    if not loaded:
+        return 1
+    base_p95 = statistics.quantiles(base, n=20)[18] if len(base) > 1 else base[0]
+    loaded_p95 = statistics.quantiles(loaded, n=20)[18] if len(loaded) > 1 else loaded[0]
+    print(f"/api/pods p95: {base_p95:.1f} ms idle -> {loaded_p95:.1f} ms with {len(done)} open streams")
+    return 0 if loaded_errors == 0 and len(done) == args.subscribers else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Hold many SSE streams open against the dashboard and check /api/pods stays fast.")
+    parser.add_argument("--url", default=DASHBOARD_URL)
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--logs-share", type=int, default=4,
+                        help="every Nth subscriber opens /logs instead of /events (0: none)")
+    parser.add_argument("--rate", type=float, default=20, help="/api/pods requests per second")
+    parser.add_argument("--seconds", type=float, default=10, help="length of each measurement phase")
+    parser.add_argument("--publish-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=5.0, help="per-request timeout for /api/pods")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds to wait after the first request")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The agent is the `client` package, but its generated gRPC stubs import
+# metrics_pb2 by top-level name; dashboard modules import each other (and
+# client/telemetry.py) that way too.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "client"), os.path.join(ROOT, "dashboard")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
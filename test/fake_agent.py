@@ -1,46 +1,228 @@
-import grpc
-import time
+import argparse
+import asyncio
+import bisect
+import math
 import random
+import time
+from collections import Counter
+from typing import List, Optional
+
+import grpc
 import metrics_pb2
 import metrics_pb2_grpc
 
 SERVER_ADDRESS = "server:50051"   # inside Docker compose network
 
-def generate_fake_metrics():
-    return {
-        "node_id": "test-node-python",
-        "latency": random.uniform(10, 150),
-        "jitter": random.uniform(0, 20),
-        "packet_loss": random.uniform(0, 5),
-        "bandwidth": random.uniform(5, 150),
-        "timestamp": time.time_ns() // 1_000_000,   # <-- REALTIME timestamps
-    }
 
-def main():
-    channel = grpc.insecure_channel(SERVER_ADDRESS)
-    client = metrics_pb2_grpc.MetricsServiceStub(channel)
+class LatencyHistogram:
+    """Log-bucketed latency histogram (~2% resolution, 10 us to 60 s) with bounded memory."""
+
+    GROWTH = 1.02
+    LOWEST_MS = 0.01
+
+    def __init__(self):
+        top = math.ceil(math.log(60_000 / self.LOWEST_MS, self.GROWTH))
+        self.bounds = [self.LOWEST_MS * self.GROWTH ** i for i in range(top + 1)]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.max_ms = 0.0
 
-print("Python Test Agent started. Sending metrics every 100ms...")
+    def record(self, ms: float):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
 
-    while True:
-        data = generate_fake_metrics()
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[min(i, len(self.bounds) - 1)], self.max_ms)
+        return self.max_ms
 
-        req = metrics_pb2.MetricsRequest(
-            node_id=data["node_id"],
-            latency=data["latency"],
-            jitter=data["jitter"],
-            packet_loss=data["packet_loss"],
-            bandwidth=data["bandwidth"],
-            timestamp=data["timestamp"],
+
+class StepStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.ok = 0
+        self.rejected = 0  # server answered success=false
+        self.errors: Counter = Counter()  # grpc status code -> count
+        self.skipped = 0  # not sent because the pod already had max_inflight calls pending
+
+    @property
+    def failed(self) -> int:
+        return self.rejected + sum(self.errors.values())
+
+
+class VirtualPod:
+    """
+    One simulated pod with its own send rate and link profile. Latency is
+    lognormal around a per-pod baseline, jitter scales with it, loss is usually
+    zero with occasional bursts, and bandwidth wanders around a per-pod mean.
+    """
+
+    def __init__(self, node_id: str, rate: float, rng: random.Random):
+        self.node_id = node_id
+        self.rate = rate
+        self.rng = rng
+        self.base_latency = rng.uniform(5, 80)
+        self.base_bandwidth = rng.uniform(20, 150)
+        self.burst_left = 0
+
+    def sample(self) -> metrics_pb2.MetricsRequest:
+        rng = self.rng
+        latency = self.base_latency * rng.lognormvariate(0, 0.25)
+        if self.burst_left == 0 and rng.random() < 0.002:
+            self.burst_left = rng.randint(5, 30)
+        if self.burst_left:
+            self.burst_left -= 1
+            loss = rng.uniform(5, 40)
+            latency *= rng.uniform(1.5, 4)
+        else:
+            loss = 0.0 if rng.random() < 0.97 else rng.uniform(0, 3)
+        return metrics_pb2.MetricsRequest(
+            node_id=self.node_id,
+            latency=latency,
+            jitter=abs(rng.gauss(0, latency * 0.1)),
+            packet_loss=loss,
+            bandwidth=max(rng.gauss(self.base_bandwidth, self.base_bandwidth * 0.1), 0.1),
+            timestamp=time.time_ns() // 1_000_000,   # <-- REALTIME timestamps
         )
 
+
+async def run_pod(stub, pod: VirtualPod, stats: StepStats, stop_at: float,
+                  max_inflight: int, timeout: float, verbose: bool):
+    """
+    Open-loop sender: requests go out on the pod's own cadence whether or not the
+    previous ones have returned, so a slow server shows up as latency and errors
+    instead of silently lowering the offered load.
+    """
+    inflight = set()
+
+    async def call(req):
+        started = time.perf_counter()
         try:
-            resp = client.SubmitMetrics(req)
-            print(f"[OK] sent: {data['timestamp']} success={resp.success}")
-        except Exception as e:
-            print(f"[X] grpc error: {e}")
+            resp = await stub.SubmitMetrics(req, timeout=timeout)
+        except grpc.aio.AioRpcError as e:
+            stats.errors[e.code().name] += 1
+            if verbose:
+                print(f"[X] {pod.node_id} grpc error: {e.code().name}")
+            return
+        stats.latency.record((time.perf_counter() - started) * 1000)
+        if resp.success:
+            stats.ok += 1
+        else:
+            stats.rejected += 1
+        if verbose:
+            print(f"[OK] {pod.node_id} sent: {req.timestamp} success={resp.success}")
+
+    period = 1.0 / pod.rate
+    # Spread pod start times so N pods do not fire in lockstep
+    deadline = time.monotonic() + pod.rng.uniform(0, period)
+    while deadline < stop_at:
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:
+            stats.skipped += 1
+        else:
+            task = asyncio.create_task(call(pod.sample()))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        deadline += period
+    if inflight:
+        await asyncio.wait(inflight)
+
+
+async def run_step(stub, pods: List[VirtualPod], seconds: float, args) -> StepStats:
+    stats = StepStats()
+    stop_at = time.monotonic() + seconds
+    await asyncio.gather(*(
+        run_pod(stub, pod, stats, stop_at, args.max_inflight, args.timeout, args.verbose)
+        for pod in pods
+    ))
+    return stats
+
+
+def _fmt_ms(value: Optional[float]) -> str:
+    return f"{value:9.2f}" if value is not None else f"{'-':>9}"
+
+
+async def load_test(args):
+    rng = random.Random(args.seed)
+    steps = [int(s) for s in args.steps.split(",")] if args.steps else [args.pods]
+    pods = [
+        VirtualPod(
+            f"{args.node_prefix}-{i:03d}" if max(steps) > 1 else args.node_prefix,
+            args.rate * (rng.uniform(0.5, 1.5) if args.vary_rate else 1.0),
+            random.Random(rng.random()),
+        )
+        for i in range(max(steps))
+    ]
+
+    async with grpc.aio.insecure_channel(args.target) as channel:
+        stub = metrics_pb2_grpc.MetricsServiceStub(channel)
+        if not args.steps and not args.duration:
+            # Default (docker compose): behave like a set of agents sending forever
+            print(f"Python Test Agent started. {len(pods)} pod(s) at {args.rate:g} samples/s each...")
+            stats = StepStats()
+            await asyncio.gather(*(
+                run_pod(stub, pod, stats, math.inf, args.max_inflight, args.timeout, True)
+                for pod in pods
+            ))
+            return
+
+        print(f"Load test against {args.target}: steps={steps} pods, "
+              f"{args.rate:g} samples/s per pod{' (varied)' if args.vary_rate else ''}, "
+              f"{args.step_seconds if args.steps else args.duration:g}s per step")
+        header = (f"{'pods':>5} {'offered/s':>10} {'ok/s':>9} {'err %':>7} {'skipped':>8} "
+                  f"{'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}  errors")
+        print(header)
+        print("-" * len(header))
+        for count in steps:
+            active = pods[:count]
+            seconds = args.step_seconds if args.steps else args.duration
+            started = time.perf_counter()
+            stats = await run_step(stub, active, seconds, args)
+            elapsed = time.perf_counter() - started
+            attempted = stats.ok + stats.failed
+            err_pct = 100.0 * stats.failed / attempted if attempted else 0.0
+            errors = ", ".join(f"{code}={n}" for code, n in stats.errors.most_common())
+            if stats.rejected:
+                errors = ", ".join(filter(None, [errors, f"rejected={stats.rejected}"]))
+            print(f"{count:5d} {sum(p.rate for p in active):10.1f} {stats.ok / elapsed:9.1f} "
+                  f"{err_pct:7.2f} {stats.skipped:8d} {_fmt_ms(stats.latency.percentile(0.50))} "
+                  f"{_fmt_ms(stats.latency.percentile(0.99))} {_fmt_ms(stats.latency.max_ms or None)}  "
+                  f"{errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fake pod agents. With no options: one pod sending 10 samples/s forever. "
+                    "With --steps or --duration: a ramped load test with a throughput report.")
+    parser.add_argument("--target", default=SERVER_ADDRESS)
+    parser.add_argument("--pods", type=int, default=1, help="virtual pods (without --steps)")
+    parser.add_argument("--rate", type=float, default=10.0, help="mean samples/s per pod")
+    parser.add_argument("--vary-rate", action="store_true",
+                        help="give each pod a rate between 0.5x and 1.5x --rate")
+    parser.add_argument("--steps", help="comma-separated pod counts to ramp through, e.g. 10,50,100,200")
+    parser.add_argument("--step-seconds", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, help="run --pods for this long and report once")
+    parser.add_argument("--max-inflight", type=int, default=64, help="pending calls per pod before skipping")
+    parser.add_argument("--timeout", type=float, default=5.0, help="per-call deadline in seconds")
+    parser.add_argument("--node-prefix", default="test-node-python")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="print every call during a load test")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(load_test(args))
+    except KeyboardInterrupt:
+        pass
 
-        time.sleep(0.1)   # <-- send 10 metrics/sec
 
 if __name__ == "__main__":
     main()
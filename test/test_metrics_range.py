@@ -0,0 +1,41 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("ROLLUP_ENABLED", "0")
+os.environ.setdefault("EVENT_BUS_ENABLED", "0")
+os.environ.setdefault("HOT_TIER_ENABLED", "0")
+
+import app as dashboard  # noqa: E402
+
+
+def strict_json(body: bytes):
+    def reject(constant):
+        raise ValueError(f"invalid JSON constant {constant}")
+    return json.loads(body, parse_constant=reject)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(dashboard.health_prober, "start", lambda: None)
+    monkeypatch.setattr(dashboard.event_bus, "start", lambda: None)
+    return dashboard.app.test_client()
+
+
+def test_null_columns_serialize_as_null(client, monkeypatch):
+    nan = float("nan")
+    rows = np.array([
+        [1000, 12.5, 1.0, 0.0, nan],   # bandwidth not measured yet
+        [2000, nan, nan, 100.0, 94.2],  # ping lost: no latency or jitter
+        [3000, 13.25, 0.5, 0.0, 93.1],
+    ])
+    monkeypatch.setattr(dashboard, "fetch_metric_range", lambda nodes, lo, hi: {"podOne": rows})
+
+    resp = client.get("/api/metrics?node=podOne&from=0&to=5000&tier=raw")
+    assert resp.status_code == 200
+    pod = strict_json(resp.data)["nodes"]["podOne"]
+    assert pod["bandwidth"]["v"] == [None, 94.2, 93.1]
+    assert pod["latency"]["v"] == [12.5, None, 13.25]
+    assert pod["latency"]["t"] == [1000, 2000, 3000]
@@ -0,0 +1,25 @@
+import json
+import os
+
+from client.scheduler import build_probes
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "client", "config.json")
+
+
+def shipped_config() -> dict:
+    with open(CONFIG_PATH) as fh:
+        return json.load(fh)
+
+
+def test_interval_seconds_sets_ping_period():
+    # What start_pod_agent.sh writes for INTERVAL_SECONDS=5
+    config = dict(shipped_config(), interval_seconds=5)
+    assert build_probes(config)["ping"].period == 5.0
+
+
+def test_probe_period_overrides_interval():
+    config = shipped_config()
+    config["interval_seconds"] = 5
+    config["probes"]["ping"]["period_seconds"] = 2
+    assert build_probes(config)["ping"].period == 2.0
@@ -0,0 +1,114 @@
+import os
+
+from client.spool import Spool
+
+
+def open_spool(tmp_path, **kw) -> Spool:
+    kw.setdefault("segment_bytes", 256)
+    kw.setdefault("sync", False)
+    return Spool(str(tmp_path), **kw)
+
+
+def record(i: int) -> bytes:
+    return b"%03d" % i + b"x" * 40  # 51 bytes framed: five fill a 256-byte segment
+
+
+def test_has_pending_at_end_of_sealed_segment(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(5):
+        spool.append(record(i))
+    spool.commit(spool.read_batch(5)[-1][1])
+    spool.close()
+    # Crash right after a roll created the next segment, before anything landed in it
+    open(os.path.join(str(tmp_path), "seg-000000000001.log"), "wb").close()
+
+    spool = open_spool(tmp_path)
+    assert not spool.has_pending()
+    spool.append(record(5))
+    assert spool.has_pending()
+    batch = spool.read_batch(10)
+    assert [p for p, _ in batch] == [record(5)]
+    spool.commit(batch[-1][1])
+    assert not spool.has_pending()
+    spool.close()
+
+
+def test_reopen_after_partial_commit(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(4):
+        spool.append(record(i))
+    spool.commit(spool.read_batch(2)[-1][1])
+    spool.close()
+
+    spool = open_spool(tmp_path)
+    assert spool.has_pending()
+    assert [p for p, _ in spool.read_batch(10)] == [record(2), record(3)]
+    spool.append(record(4))
+    assert [p for p, _ in spool.read_batch(10)] == [record(2), record(3), record(4)]
+    spool.close()
+
+
+def test_commit_across_roll_reclaims_segments(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(12):  # three segments: 5 + 5 + 2 records
+        spool.append(record(i))
+    assert len(os.listdir(str(tmp_path))) == 3
+
+    batch = spool.read_batch(7)
+    assert [p for p, _ in batch] == [record(i) for i in range(7)]
+    spool.commit(batch[-1][1])
+    segments = sorted(n for n in os.listdir(str(tmp_path)) if n.startswith("seg-"))
+    assert segments == ["seg-000000000001.log", "seg-000000000002.log"]
+    assert [p for p, _ in spool.read_batch(10)] == [record(i) for i in range(7, 12)]
+    spool.close()
+
+    spool = open_spool(tmp_path)
+    assert [p for p, _ in spool.read_batch(10)] == [record(i) for i in range(7, 12)]
+    spool.close()
+
+
+def test_drops_oldest_segment_when_full(tmp_path):
+    spool = open_spool(tmp_path, max_segments=2)
+    for i in range(15):  # needs three segments, the budget is two
+        spool.append(record(i))
+    assert spool.dropped_segments == 1
+    assert [p for p, _ in spool.read_batch(20)] == [record(i) for i in range(5, 15)]
+    spool.close()
+
+    spool = open_spool(tmp_path, max_segments=2)
+    assert [p for p, _ in spool.read_batch(20)] == [record(i) for i in range(5, 15)]
+    spool.close()
+
+
+def test_torn_tail_record_is_discarded(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(3):
+        spool.append(record(i))
+    spool.close()
+    path = os.path.join(str(tmp_path), "seg-000000000000.log")
+    with open(path, "r+b") as f:
+        f.seek(2 * 51 + 20)  # inside the last record's payload: its crc no longer matches
+        f.write(b"\xff")
+
+    spool = open_spool(tmp_path)
+    assert [p for p, _ in spool.read_batch(10)] == [record(0), record(1)]
+    spool.append(record(3))  # overwrites the torn record
+    assert [p for p, _ in spool.read_batch(10)] == [record(0), record(1), record(3)]
+    spool.close()
+
+
+def test_truncated_segment_file(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(3):
+        spool.append(record(i))
+    spool.close()
+    path = os.path.join(str(tmp_path), "seg-000000000000.log")
+    os.truncate(path, 2 * 51 + 10)  # the third record lost all but its header and two bytes
+
+    spool = open_spool(tmp_path)
+    assert [p for p, _ in spool.read_batch(10)] == [record(0), record(1)]
+    spool.append(record(3))
+    spool.close()
+    spool = open_spool(tmp_path)
+    assert [p for p, _ in spool.read_batch(10)] == [record(0), record(1), record(3)]
+    spool.close()